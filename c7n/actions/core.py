@@ -8,6 +8,7 @@ import logging
 from c7n.element import Element
 from c7n.exceptions import PolicyValidationError, ClientError
 from c7n.registry import PluginRegistry
+from c7n.resources import load_element
 
 
 class ActionRegistry(PluginRegistry):
@@ -35,6 +36,8 @@ class ActionRegistry(PluginRegistry):
             data = {}
 
         action_class = self.get(action_type)
+        if action_class is None and load_element(action_type):
+            action_class = self.get(action_type)
         if action_class is None:
             raise PolicyValidationError(
                 "Invalid action type %s, valid actions %s" % (
@@ -1,6 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 
+import time
+
 try:
     from botocore.config import Config
 except ImportError:
@@ -26,8 +28,14 @@ class LambdaInvoke(EventAction):
 
     We automatically batch into sets of 250 for invocation,
     We try to utilize async invocation by default, this imposes
-    some greater size limits of 128kb which means we batch
-    invoke.
+    some greater size limits of 256kb which means we batch
+    invoke. Batches are also packed by serialized size to stay
+    within the invocation payload limit (256kb async, 6mb sync).
+
+    Batches are invoked one at a time by default, `concurrency`
+    invokes up to that many batches at once. Invoke latency and
+    errors are recorded as the `InvokeLatency` and `InvokeErrors`
+    metrics.
 
     Example::
 
@@ -55,6 +63,7 @@ class LambdaInvoke(EventAction):
             'async': {'type': 'boolean'},
             'qualifier': {'type': 'string'},
             'batch_size': {'type': 'integer'},
+            'concurrency': {'type': 'integer', 'minimum': 1},
             'timeout': {'type': 'integer'},
             'vars': {'type': 'object'},
         }
@@ -63,10 +72,17 @@ class LambdaInvoke(EventAction):
     permissions = ('lambda:InvokeFunction',
                'iam:ListAccountAliases',)
 
+    # invocation payload limits in bytes
+    async_payload_limit = 256 * 1024
+    sync_payload_limit = 6 * 1024 * 1024
+
     def process(self, resources, event=None):
 
-        config = Config(read_timeout=self.data.get(
-            'timeout', 90), region_name=self.data.get('region', None))
+        concurrency = self.data.get('concurrency', 1)
+        config = Config(
+            read_timeout=self.data.get('timeout', 90),
+            region_name=self.data.get('region', None),
+            max_pool_connections=max(10, concurrency))
         session = utils.local_session(self.manager.session_factory)
         assumed_role = self.data.get('assume-role', '')
 
@@ -80,10 +96,13 @@ class LambdaInvoke(EventAction):
 
         params = dict(FunctionName=self.data['function'])
         if self.data.get('qualifier'):
-            params['Qualifier'] = self.data['Qualifier']
+            params['Qualifier'] = self.data['qualifier']
 
         if self.data.get('async', True):
             params['InvocationType'] = 'Event'
+            payload_limit = self.async_payload_limit
+        else:
+            payload_limit = self.sync_payload_limit
 
         alias = utils.get_account_alias_from_sts(
             utils.local_session(self.manager.session_factory))
@@ -95,18 +114,58 @@ class LambdaInvoke(EventAction):
             'account': alias,
             'region': self.manager.config.region,
             'action': self.data,
-            'policy': self.manager.data}
-
-        results = []
-        for resource_set in utils.chunks(resources, self.data.get('batch_size', 250)):
-            payload['resources'] = resource_set
-            params['Payload'] = utils.dumps(payload)
-            result = client.invoke(**params)
+            'policy': self.manager.data,
+            'resources': []}
+
+        # the envelope is serialized once, each batch only encodes its resources
+        envelope = utils.dumps(payload)
+        rbegin_idx = envelope.rfind('[')
+        prefix, suffix = envelope[:rbegin_idx + 1], envelope[rbegin_idx + 1:]
+
+        stats = utils.CallStats()
+
+        def invoke(batch):
+            t = time.time()
+            try:
+                result = client.invoke(
+                    Payload="%s%s%s" % (prefix, ",".join(batch), suffix), **params)
+            except Exception:
+                stats.record('invoke', time.time() - t, error=True)
+                raise
+            stats.record('invoke', time.time() - t, error='FunctionError' in result)
             result['Payload'] = result['Payload'].read()
             if isinstance(result['Payload'], bytes):
                 result['Payload'] = result['Payload'].decode('utf-8')
-            results.append(result)
-        return results
+            return result
+
+        batches = self.get_batches(
+            resources, self.data.get('batch_size', 250),
+            payload_limit - len(envelope.encode('utf8')))
+        try:
+            if concurrency > 1:
+                with self.manager.executor_factory(max_workers=concurrency) as w:
+                    return list(w.map(invoke, batches))
+            return [invoke(b) for b in batches]
+        finally:
+            stats.report(self.manager.ctx.metrics, 'Invoke')
+
+    def get_batches(self, resources, batch_size, size_limit):
+        """Pack serialized resources into batches by count and payload size.
+
+        A resource too large for any batch is sent on its own.
+        """
+        batch, batch_bytes = [], 0
+        for r in resources:
+            data = utils.dumps(r)
+            # account for the separating comma and multibyte characters
+            rsize = len(data.encode('utf8')) + 1
+            if batch and (len(batch) == batch_size or batch_bytes + rsize > size_limit):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(data)
+            batch_bytes += rsize
+        if batch:
+            yield batch
 
     @classmethod
     def register_resources(klass, registry, resource_class):
@@ -5,6 +5,7 @@
 import base64
 import copy
 import zlib
+from collections import deque
 
 from .core import EventAction
 from c7n import utils
@@ -40,8 +41,11 @@ class ResourceMessageBuffer:
         self.fill_sizes = []
 
     def add(self, resource):
+        if self.resource_parts and self.full:
+            return False
         self.resource_parts.append(utils.dumps(resource))
         self.raw_size += len(self.resource_parts[-1])
+        return True
 
     def __len__(self):
         return len(self.resource_parts)
@@ -113,9 +117,89 @@ class ResourceMessageBuffer:
         return serialized_payload
 
 
+def compress_bound(size):
+    """Upper bound on the deflated size of size bytes, per zlib's compressBound.
+
+    Includes headroom for the sync flush marker and stream trailer.
+    """
+    return size + (size >> 12) + (size >> 14) + (size >> 25) + 24
+
+
+class CompressedMessageBuffer:
+    """Resource message buffer compressing resources as they're added.
+
+    The compressed stream is sync flushed after each resource, so the
+    exact encoded size of the payload is known and buffers fill up to
+    the max size without estimating. Resources which may not fit are
+    trial compressed on a copy of the compressor and rejected if they
+    would overflow the buffer.
+    """
+
+    def __init__(self, envelope, buffer_max_size):
+        self.buffer_max_size = buffer_max_size
+        serialized = utils.dumps(dict(envelope, resources=[]))
+        rbegin_idx = serialized.rfind('[')
+        self.prefix = serialized[:rbegin_idx + 1].encode('utf8')
+        self.suffix = serialized[rbegin_idx + 1:].encode('utf8')
+        self.fill_sizes = []
+        self.reset()
+
+    def reset(self):
+        self.compressor = zlib.compressobj()
+        self.parts = [
+            self.compressor.compress(self.prefix) + self.compressor.flush(zlib.Z_SYNC_FLUSH)]
+        self.size = len(self.parts[0])
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return (f"<CompressedBuffer count:{len(self)} size:{self.encoded_size(self.size)}"
+                f" max:{self.buffer_max_size}>")
+
+    @staticmethod
+    def encoded_size(size):
+        return 4 * ((size + 2) // 3)
+
+    def fits(self, size):
+        return self.encoded_size(
+            size + compress_bound(len(self.suffix))) <= self.buffer_max_size
+
+    def add(self, resource):
+        """Add a resource, returns False if it doesn't fit in the buffer.
+
+        An empty buffer always accepts a resource, oversize payloads
+        are reported on consume.
+        """
+        data = ((self.count and ',' or '') + utils.dumps(resource)).encode('utf8')
+        compressor = self.compressor
+        if self.count and not self.fits(self.size + compress_bound(len(data))):
+            compressor = compressor.copy()
+        part = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.count and not self.fits(self.size + len(part)):
+            return False
+        self.compressor = compressor
+        self.parts.append(part)
+        self.size += len(part)
+        self.count += 1
+        return True
+
+    def consume(self):
+        self.parts.append(self.compressor.compress(self.suffix) + self.compressor.flush())
+        serialized_payload = base64.b64encode(b''.join(self.parts)).decode('ascii')
+        if len(serialized_payload) > self.buffer_max_size:
+            raise AssertionError(
+                f"{self} payload over max size:{len(serialized_payload)}"
+            )
+        self.fill_sizes.append(len(serialized_payload))
+        self.reset()
+        return serialized_payload
+
+
 class BaseNotify(EventAction):
 
-    message_buffer_class = ResourceMessageBuffer
+    message_buffer_class = CompressedMessageBuffer
     buffer_max_size = 262144
 
     def expand_variables(self, message):
@@ -213,6 +297,15 @@ class Notify(BaseNotify):
 
     C7N_DATA_MESSAGE = "maidmsg/1.0"
 
+    # concurrent message sends
+    max_workers = 4
+
+    # sqs send_message_batch limits, and an allowance per entry
+    # for its id and message attributes
+    sqs_batch_count = 10
+    sqs_batch_size = 262144
+    batch_entry_overhead = 128
+
     schema_alias = True
     schema = {
         'type': 'object',
@@ -285,21 +378,63 @@ class Notify(BaseNotify):
         message['action'] = self.expand_variables(message)
 
         rbuffer = self.message_buffer_class(message, self.buffer_max_size)
-        for r in self.prepare_resources(resources):
-            rbuffer.add(r)
-            if rbuffer.full:
-                self.consume_buffer(message, rbuffer)
+        self.send_payloads(
+            message, self.get_payloads(rbuffer, self.prepare_resources(resources)))
 
+    def get_payloads(self, rbuffer, resources):
+        """Yield (payload, resource count) for each buffer of resources filled."""
+        for r in resources:
+            if rbuffer.add(r):
+                continue
+            rcount = len(rbuffer)
+            yield rbuffer.consume(), rcount
+            rbuffer.add(r)
         if len(rbuffer):
-            self.consume_buffer(message, rbuffer)
+            rcount = len(rbuffer)
+            yield rbuffer.consume(), rcount
 
-    def consume_buffer(self, message, rbuffer):
-        rcount = len(rbuffer)
-        payload = rbuffer.consume()
-        receipt = self.send_data_message(message, payload)
-        self.log.info("sent message:%s policy:%s template:%s count:%s" % (
-            receipt, self.manager.data['name'],
-            self.data.get('template', 'default'), rcount))
+    def send_payloads(self, message, payloads):
+        """Send payloads concurrently as they're produced.
+
+        Compression of the next payloads continues while earlier ones
+        are sent, with at most two sends per worker pending.
+        """
+        pending = deque()
+        with self.manager.executor_factory(max_workers=self.max_workers) as w:
+            for group in self.group_payloads(message, payloads):
+                pending.append(w.submit(self.send_group, message, group))
+                if len(pending) > self.max_workers * 2:
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+
+    def group_payloads(self, message, payloads):
+        """Group consecutive sqs payloads which fit in one batch send."""
+        if self.data['transport']['type'] != 'sqs':
+            for p in payloads:
+                yield [p]
+            return
+        group, size = [], 0
+        for payload, rcount in payloads:
+            psize = len(payload) + self.batch_entry_overhead
+            if group and (len(group) == self.sqs_batch_count or
+                          size + psize > self.sqs_batch_size):
+                yield group
+                group, size = [], 0
+            group.append((payload, rcount))
+            size += psize
+        if group:
+            yield group
+
+    def send_group(self, message, group):
+        if len(group) == 1:
+            receipts = [self.send_data_message(message, group[0][0])]
+        else:
+            receipts = self.send_sqs_batch(message, [payload for payload, _ in group])
+        for receipt, (_, rcount) in zip(receipts, group):
+            self.log.info("sent message:%s policy:%s template:%s count:%s" % (
+                receipt, self.manager.data['name'],
+                self.data.get('template', 'default'), rcount))
 
     def prepare_resources(self, resources):
         """Resources preparation for transport.
@@ -387,7 +522,8 @@ class Notify(BaseNotify):
         )
         return result['MessageId']
 
-    def send_sqs(self, message, payload):
+    def get_queue(self, message):
+        """Return the region and url of the transport's queue."""
         queue = self.data['transport']['queue'].format(**message)
         if queue.startswith('https://queue.amazonaws.com'):
             region = 'us-east-1'
@@ -411,19 +547,47 @@ class Notify(BaseNotify):
             queue_name = queue
             queue_url = "https://sqs.%s.amazonaws.com/%s/%s" % (
                 region, owner_id, queue_name)
+        return region, queue_url
+
+    def send_sqs(self, message, payload):
+        region, queue_url = self.get_queue(message)
         client = self.manager.session_factory(
             region=region, assume=self.assume_role).client('sqs')
-        attrs = {
+        result = client.send_message(
+            QueueUrl=queue_url,
+            MessageBody=payload,
+            MessageAttributes=self.get_sqs_attributes())
+        return result['MessageId']
+
+    def send_sqs_batch(self, message, payloads):
+        """Send payloads in one batch, returning their message ids in order.
+
+        Entries the batch fails to send are sent individually.
+        """
+        region, queue_url = self.get_queue(message)
+        client = self.manager.session_factory(
+            region=region, assume=self.assume_role).client('sqs')
+        result = client.send_message_batch(
+            QueueUrl=queue_url,
+            Entries=[{'Id': str(idx), 'MessageBody': payload,
+                      'MessageAttributes': self.get_sqs_attributes()}
+                     for idx, payload in enumerate(payloads)])
+        receipts = {int(e['Id']): e['MessageId'] for e in result.get('Successful', ())}
+        for e in result.get('Failed', ()):
+            idx = int(e['Id'])
+            receipts[idx] = client.send_message(
+                QueueUrl=queue_url,
+                MessageBody=payloads[idx],
+                MessageAttributes=self.get_sqs_attributes())['MessageId']
+        return [receipts[idx] for idx in range(len(payloads))]
+
+    def get_sqs_attributes(self):
+        return {
             'mtype': {
                 'DataType': 'String',
                 'StringValue': self.C7N_DATA_MESSAGE,
             },
         }
-        result = client.send_message(
-            QueueUrl=queue_url,
-            MessageBody=payload,
-            MessageAttributes=attrs)
-        return result['MessageId']
 
     @classmethod
     def register_resource(cls, registry, resource_class):
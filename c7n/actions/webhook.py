@@ -6,6 +6,9 @@ try:
 except ImportError:
     certifi = None
 
+import time
+
+import jmespath
 import urllib3
 from urllib import parse
 
@@ -30,6 +33,28 @@ class Webhook(EventAction):
                  query-params:
                     resource_name: resource.name
                     policy_name: policy.name
+
+    Deliveries are made one at a time by default, `concurrency` sends
+    up to that many requests at once over a shared connection pool.
+    Throttled (429) and unavailable (503) responses carrying a
+    `Retry-After` header are retried up to `retries` times, waiting as
+    the header asks. Other error responses aren't retried, as the
+    endpoint may have already acted on the request. Failed connections
+    are retried, as are read errors for idempotent methods. Latency and
+    failed deliveries (including 4xx and 5xx responses) per endpoint are
+    recorded as the `WebhookLatency` and `WebhookErrors` metrics.
+
+        .. code-block:: yaml
+
+          policies:
+            - name: post-findings
+              resource: ec2
+              actions:
+               - type: webhook
+                 url: https://collector.example.com/findings
+                 body: resource
+                 concurrency: 8
+                 retries: 5
     """
 
     schema_alias = True
@@ -42,6 +67,8 @@ class Webhook(EventAction):
             'batch': {'type': 'boolean'},
             'batch-size': {'type': 'number'},
             'method': {'type': 'string', 'enum': ['PUT', 'POST', 'GET', 'PATCH', 'DELETE']},
+            'concurrency': {'type': 'integer', 'minimum': 1},
+            'retries': {'type': 'integer', 'minimum': 0},
             'query-params': {
                 "type": "object",
                 "additionalProperties": {
@@ -69,7 +96,19 @@ class Webhook(EventAction):
         self.query_params = self.data.get('query-params', {})
         self.headers = self.data.get('headers', {})
         self.method = self.data.get('method', 'POST')
+        self.concurrency = self.data.get('concurrency', 1)
+        self.retries = self.data.get('retries', 3)
         self.lookup_data = None
+        self.stats = None
+
+        # expressions are compiled once and evaluated per call
+        self.search_options = jmespath.Options(
+            custom_functions=utils.C7NJmespathFunctions())
+        self.headers_expr = self._compile(self.headers)
+        self.params_expr = self._compile(self.query_params)
+        self.body_expr = self.body and utils.jmespath_compile(self.body) or None
+        url_parts = parse.urlparse(self.url or '')
+        self.url_parts = (list(url_parts), dict(parse.parse_qsl(url_parts[4])))
 
     def process(self, resources, event=None):
         self.lookup_data = {
@@ -82,17 +121,23 @@ class Webhook(EventAction):
         }
 
         self.http = self._build_http_manager()
+        self.stats = utils.CallStats()
 
         if self.batch:
-            for chunk in utils.chunks(resources, self.batch_size):
-                resource_data = self.lookup_data
-                resource_data['resources'] = chunk
-                self._process_call(resource_data)
+            calls = [dict(self.lookup_data, resources=chunk)
+                     for chunk in utils.chunks(resources, self.batch_size)]
         else:
-            for r in resources:
-                resource_data = self.lookup_data
-                resource_data['resource'] = r
-                self._process_call(resource_data)
+            calls = [dict(self.lookup_data, resource=r) for r in resources]
+
+        if self.concurrency > 1 and len(calls) > 1:
+            # the executor's workers bound the requests in flight
+            with self.manager.executor_factory(
+                    max_workers=min(self.concurrency, len(calls))) as w:
+                list(w.map(self._process_call, calls))
+        else:
+            for c in calls:
+                self._process_call(c)
+        self.stats.report(self.manager.ctx.metrics, 'Webhook', 'Endpoint')
 
     def _process_call(self, resource):
         prepared_url = self._build_url(resource)
@@ -102,6 +147,7 @@ class Webhook(EventAction):
         if prepared_body:
             prepared_headers['Content-Type'] = 'application/json'
 
+        t = time.time()
         try:
             res = self.http.request(
                 method=self.method,
@@ -111,13 +157,21 @@ class Webhook(EventAction):
 
             self.log.info("%s got response %s with URL %s" %
                           (self.method, res.status, prepared_url))
+            error = res.status >= 400
         except urllib3.exceptions.HTTPError as e:
-            self.log.error("Error calling %s. Code: %s" % (prepared_url, e.reason))
+            self.log.error("Error calling %s. Code: %s" % (
+                prepared_url, getattr(e, 'reason', e)))
+            error = True
+        if self.stats is not None:
+            self.stats.record(parse.urlparse(prepared_url).netloc, time.time() - t, error)
 
     def _build_http_manager(self):
         pool_kwargs = {
             'cert_reqs': 'CERT_REQUIRED',
-            'ca_certs': certifi and certifi.where() or None
+            'ca_certs': certifi and certifi.where() or None,
+            # one connection per concurrent request
+            'maxsize': self.concurrency,
+            'retries': RetryAfter(total=self.retries, backoff_factor=0.5)
         }
 
         proxy_url = utils.get_proxy_url(self.url)
@@ -126,8 +180,12 @@ class Webhook(EventAction):
         else:
             return urllib3.PoolManager(**pool_kwargs)
 
+    def _compile(self, expressions):
+        return {k: utils.jmespath_compile(v) for k, v in expressions.items()}
+
     def _build_headers(self, resource):
-        return {k: utils.jmespath_search(v, resource) for k, v in self.headers.items()}
+        return {k: e.search(resource, self.search_options)
+                for k, e in self.headers_expr.items()}
 
     def _build_url(self, resource):
         """
@@ -141,11 +199,13 @@ class Webhook(EventAction):
             return self.url
 
         evaluated_params = {
-            k: utils.jmespath_search(v, resource) for k, v in self.query_params.items()
+            k: e.search(resource, self.search_options)
+            for k, e in self.params_expr.items()
         }
 
-        url_parts = list(parse.urlparse(self.url))
-        query = dict(parse.parse_qsl(url_parts[4]))
+        url_parts, query = self.url_parts
+        url_parts = list(url_parts)
+        query = dict(query)
         query.update(evaluated_params)
         url_parts[4] = parse.urlencode(query)
 
@@ -157,4 +217,20 @@ class Webhook(EventAction):
         if not self.body:
             return None
 
-        return utils.dumps(utils.jmespath_search(self.body, resource)).encode('utf-8')
+        return utils.dumps(
+            self.body_expr.search(resource, self.search_options)).encode('utf-8')
+
+
+class RetryAfter(urllib3.util.Retry):
+    """Retry responses only when the server asks to be called back.
+
+    Throttled and unavailable responses with a Retry-After header
+    weren't acted on, so they're safe to resend for any method.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset((429, 503))
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        return bool(
+            self.total and has_retry_after and
+            status_code in self.RETRY_AFTER_STATUS_CODES)
@@ -6,9 +6,13 @@ multiple policies on the same resource type.
 import pickle  # nosec nosemgrep
 
 from datetime import datetime, timedelta
+import hashlib
 import os
 import logging
 import sqlite3
+import threading
+import time
+import zlib
 
 log = logging.getLogger('custodian.cache')
 
@@ -32,6 +36,8 @@ def factory(config):
             log.debug("Using in-memory cache")
             CACHE_NOTIFY = True
         return InMemoryCache(config)
+    elif str(config.cache).startswith(SharedSqlKvCache.prefix):
+        return SharedSqlKvCache(config)
     return SqlKvCache(config)
 
 
@@ -169,3 +175,211 @@ class SqlKvCache(Cache):
         if self.conn:
             self.conn.close()
             self.conn = None
+
+
+class SharedSqlKvCache(Cache):
+    """A sqlite cache safe for concurrent use by multiple processes.
+
+    Selected by prefixing the cache path with ``shared:``, ie.
+    ``--cache shared:~/.cache/custodian-shared.db``.
+
+    The database runs in write-ahead-log mode so readers never block
+    on writers, entries carry their own expiration so we never sweep
+    the table on open, values are zlib compressed, and total size is
+    bounded by evicting least recently used entries, with access times
+    updated at most every `access_resolution` seconds.
+    """
+
+    prefix = 'shared:'
+
+    # default upper bound on compressed values in bytes, configurable
+    # in megabytes with cache_max_size
+    max_size = 512 * 1024 * 1024
+
+    # seconds an entry's last access time is kept before a read updates
+    # it, so reads don't each take the write lock
+    access_resolution = 60
+
+    # seconds to wait on a locked database before erroring
+    busy_timeout = 30
+
+    create_table = """
+    create table if not exists c7n_shared_cache (
+        key blob primary key,
+        value blob,
+        size integer,
+        expires real,
+        accessed real
+    )
+    """
+
+    create_index = """
+    create index if not exists c7n_shared_cache_accessed
+        on c7n_shared_cache (accessed)
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.cache_period = config.cache_period
+        self.cache_path = resolve_path(str(config.cache)[len(self.prefix):])
+        max_size = getattr(config, 'cache_max_size', None)
+        self.max_size = max_size and max_size * 1024 * 1024 or self.max_size
+        self.conn = None
+        self.pid = None
+        self.lock = threading.RLock()
+
+    def init(self):
+        if not os.path.exists(os.path.dirname(self.cache_path)):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.cache_path, timeout=self.busy_timeout,
+            isolation_level=None, check_same_thread=False)
+        self.conn.execute('pragma journal_mode=wal')
+        self.conn.execute('pragma synchronous=normal')
+        self.conn.execute(self.create_table)
+        self.conn.execute(self.create_index)
+        self.pid = os.getpid()
+
+    def load(self):
+        # sqlite connections must not be shared across a fork, if we've
+        # been inherited by a child process open a fresh connection.
+        if self.conn and self.pid != os.getpid():
+            self.conn = None
+        if not self.conn:
+            self.init()
+        return True
+
+    def get(self, key):
+        now = time.time()
+        encoded = sqlite3.Binary(encode(key))
+        with self.lock:
+            row = self.conn.execute(
+                'select value, accessed from c7n_shared_cache where key = ? and expires > ?',
+                [encoded, now]).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.access_resolution:
+                self.conn.execute(
+                    'update c7n_shared_cache set accessed = ? where key = ?', [now, encoded])
+        return pickle.loads(zlib.decompress(row[0]))  # nosec nosemgrep
+
+    def save(self, key, data, ttl=None):
+        """Store a value, with an optional per entry ttl in minutes."""
+        now = time.time()
+        ttl = self.cache_period if ttl is None else ttl
+        value = zlib.compress(encode(data))
+        with self.lock:
+            self.conn.execute('begin immediate')
+            try:
+                self.conn.execute(
+                    'replace into c7n_shared_cache (key, value, size, expires, accessed) '
+                    'values (?, ?, ?, ?, ?)',
+                    (sqlite3.Binary(encode(key)), sqlite3.Binary(value),
+                     len(value), now + ttl * 60, now))
+                self.evict(now)
+            except Exception:
+                self.conn.execute('rollback')
+                raise
+            self.conn.execute('commit')
+
+    def evict(self, now):
+        result = self.conn.execute(
+            'delete from c7n_shared_cache where expires <= ?', [now])
+        if result.rowcount:
+            log.debug('expired %d stale cache entries', result.rowcount)
+        total = self.conn.execute(
+            'select coalesce(sum(size), 0) from c7n_shared_cache').fetchone()[0]
+        if total <= self.max_size:
+            return
+        evicted = 0
+        for key, size in self.conn.execute(
+                'select key, size from c7n_shared_cache order by accessed').fetchall():
+            if total <= self.max_size:
+                break
+            self.conn.execute('delete from c7n_shared_cache where key = ?', [key])
+            total -= size
+            evicted += 1
+        log.debug('evicted %d least recently used cache entries', evicted)
+
+    def size(self):
+        if not self.conn:
+            return 0
+        with self.lock:
+            return self.conn.execute(
+                'select coalesce(sum(size), 0) from c7n_shared_cache').fetchone()[0]
+
+    def close(self):
+        if self.conn and self.pid == os.getpid():
+            self.conn.close()
+        self.conn = None
+
+
+class SnapshotStore:
+    """Resource populations persisted across runs for incremental fetches.
+
+    Unlike cache entries, snapshots don't expire with the cache period,
+    each one records the time its resources were current as of, which
+    is the watermark for fetching the changes since.
+    """
+
+    def __init__(self, path):
+        self.path = resolve_path(path)
+
+    def get_path(self, key):
+        return os.path.join(
+            self.path, "%s.snapshot" % hashlib.sha256(encode(key)).hexdigest())
+
+    def get(self, key):
+        """Return a (watermark, resources) tuple, or None."""
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as fh:
+                return pickle.loads(zlib.decompress(fh.read()))  # nosec nosemgrep
+        except Exception as e:
+            log.warning("ignoring unreadable snapshot %s: %s", path, e)
+            return None
+
+    def save(self, key, watermark, resources):
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        path = self.get_path(key)
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, 'wb') as fh:
+            fh.write(zlib.compress(encode((watermark, resources))))
+        os.replace(tmp_path, path)
+
+
+class RunIndex:
+    """Base for in memory indexes shared by the filters of a run.
+
+    Indexes are per index type, cache, account and region, and kept for
+    the run's cache period, expired indexes of any key are purged when an
+    index is requested so long lived workers don't accumulate them.
+    Without a cache period an index is local to its caller.
+    """
+
+    indexes = {}
+    lock = threading.Lock()
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self.created = time.time()
+
+    @classmethod
+    def get_index(cls, manager):
+        config = manager.config
+        ttl = (config.get('cache_period') or 0) * 60
+        if not ttl:
+            return cls()
+        key = (cls, config.get('cache'), config.get('account_id'), config.get('region'))
+        with RunIndex.lock:
+            for k in [k for k, idx in RunIndex.indexes.items() if idx.expired()]:
+                del RunIndex.indexes[k]
+            index = RunIndex.indexes.get(key)
+            if index is None:
+                index = RunIndex.indexes[key] = cls(ttl)
+        return index
+
+    def expired(self):
+        return time.time() - self.created > self.ttl
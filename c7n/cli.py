@@ -93,10 +93,14 @@ def _default_options(p, exclude=[]):
     if 'cache' not in exclude:
         p.add_argument(
             "-f", "--cache", default="~/.cache/cloud-custodian.cache",
-            help="Cache file (default %(default)s)")
+            help="Cache file, prefix with 'shared:' for a cache usable "
+            "across concurrent processes (default %(default)s)")
         p.add_argument(
             "--cache-period", default=15, type=int,
             help="Cache validity in minutes (default %(default)i)")
+        p.add_argument(
+            "--cache-max-size", default=None, type=int,
+            help="Size limit in megabytes of a 'shared:' cache (default 512)")
     else:
         p.add_argument("--cache", default=None, help=argparse.SUPPRESS)
     if 'session-policy' not in exclude:
@@ -231,6 +235,27 @@ def setup_parser():
         "--skip-validation",
         action="store_true",
         help="Skips validation of policies (assumes you've run the validate command seperately).")
+    run.add_argument(
+        "--stream", action="store_true",
+        help="Stream resources through filters page by page to bound memory usage.")
+    run.add_argument(
+        "--incremental", nargs="?", const="~/.cache/cloud-custodian-snapshots",
+        default=None, metavar="SNAPSHOT_DIR",
+        help="Keep resource snapshots between runs in SNAPSHOT_DIR, and only "
+        "describe resources AWS Config reports as changed since the last run.")
+    parallel = run.add_mutually_exclusive_group()
+    parallel.add_argument(
+        "--parallel", type=int, default=0, metavar="N",
+        help="Execute up to N policies concurrently, with at most 4 policies "
+        "running at once in any one region.")
+    parallel.add_argument(
+        "--parallel-regions", type=int, default=0, metavar="N",
+        help="Execute the policies of up to N regions concurrently, with "
+        "each region's policies running in order.")
+    run.add_argument(
+        "--parent-workers", type=int, default=0, metavar="N",
+        help="Enumerate the children of up to N parent resources concurrently, "
+        "ie. ecs services across clusters.")
 
     metrics_help = ("Emit metrics to provider metrics. Specify 'aws', 'gcp', or 'azure'. "
             "For more details on aws metrics options, see: "
@@ -1,6 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, wait
 from datetime import timedelta, datetime
 from functools import wraps
 import json
@@ -9,6 +10,8 @@ import logging
 import argparse
 import os
 import sys
+import threading
+import time
 from typing import List
 
 import yaml
@@ -16,7 +19,9 @@ from yaml.constructor import ConstructorError
 
 from c7n import deprecated
 from c7n.exceptions import ClientError, PolicyValidationError
+from c7n.executor import ThreadPoolExecutor
 from c7n.loader import SourceLocator
+from c7n.planner import FetchPlan
 from c7n.provider import clouds
 from c7n.policy import Policy, PolicyCollection, load as policy_load
 from c7n.schema import ElementSchema, StructureParser, generate
@@ -226,7 +231,8 @@ def validate(options):
             all_errors[config_file] = e
             continue
 
-        load_resources(structure.get_resource_types(data))
+        load_resources(
+            structure.get_resource_types(data), structure.get_element_types(data))
         schm = schema.generate()
         errors += schema.validate(data, schm)
         conf_policy_names = {
@@ -302,24 +308,147 @@ def run(options, policies: List[Policy]) -> None:
             log.exception("Unable to assume role %s", options.assume_role)
             sys.exit(1)
 
-    errored_policies: List[str] = []
-    for policy in policies:
-        try:
-            policy()
-        except Exception:
-            exit_code = 2
-            errored_policies.append(policy.name)
-            if options.debug:
-                raise
-            log.exception(
-                "Error while executing policy %s, continuing" % (
-                    policy.name))
+    # Policies with the same resource query share a single fetch of
+    # their resources, unless caching has been disabled.
+    plan = FetchPlan(getattr(options, 'cache_period', 0) and policies or ())
+
+    summary = RunSummary()
+    parallel = getattr(options, 'parallel', 0) or 0
+    parallel_regions = getattr(options, 'parallel_regions', 0) or 0
+    if parallel > 1:
+        errored = run_parallel(options, policies, plan, parallel, summary)
+    elif parallel_regions > 1:
+        errored = run_regions(options, policies, plan, parallel_regions, summary)
+    else:
+        errored = {id(p) for p in policies if not run_policy(options, p, plan, summary)}
+    summary.report()
+
+    errored_policies: List[str] = [p.name for p in policies if id(p) in errored]
+    if errored_policies:
+        exit_code = 2
     if exit_code != 0:
         log.error("The following policies had errors while executing\n - %s" % (
             "\n - ".join(errored_policies)))
         sys.exit(exit_code)
 
 
+def run_policy(options, policy, plan, summary=None):
+    """Execute a policy, returning False if it errored."""
+    resources, ok, t = None, False, time.time()
+    try:
+        resources = policy()
+        ok = True
+    except Exception:
+        if options.debug:
+            raise
+        log.exception(
+            "Error while executing policy %s, continuing" % (
+                policy.name))
+    finally:
+        plan.release(policy)
+        if summary is not None:
+            summary.add(policy, resources, ok, time.time() - t)
+    return ok
+
+
+class RunSummary:
+    """Policy execution totals per region, reported at the end of a run."""
+
+    def __init__(self):
+        self.regions = defaultdict(Counter)
+        self.lock = threading.Lock()
+
+    def add(self, policy, resources, ok, duration):
+        with self.lock:
+            stats = self.regions[policy.options.region or '']
+            stats['policies'] += 1
+            stats['errors'] += int(not ok)
+            stats['resources'] += isinstance(resources, list) and len(resources) or 0
+            stats['time'] += duration
+
+    def report(self):
+        if len(self.regions) < 2:
+            return
+        total = Counter()
+        for region, stats in sorted(self.regions.items()):
+            total.update(stats)
+            log.info(
+                "region:%s policies:%d errors:%d resources:%d time:%0.2f",
+                region, stats['policies'], stats['errors'],
+                stats['resources'], stats['time'])
+        log.info(
+            "regions:%d policies:%d errors:%d resources:%d",
+            len(self.regions), total['policies'], total['errors'], total['resources'])
+
+
+# Maximum number of policies executing concurrently against a region.
+REGION_CONCURRENCY = 4
+
+
+def run_parallel(options, policies, plan, workers, summary=None):
+    """Execute policies concurrently over a thread pool.
+
+    Policies sharing a planned resource fetch are chained and run in
+    order on a single worker, and at most REGION_CONCURRENCY chains run
+    against any one provider region at a time. Returns the ids of
+    errored policies.
+    """
+    chains = {}
+    for p in policies:
+        key = plan.get_group_key(p)
+        chains.setdefault(key in plan.pending and key or id(p), []).append(p)
+
+    def get_region(chain):
+        return (chain[0].provider_name, chain[0].options.region)
+
+    def run_chain(chain):
+        return {id(p) for p in chain if not run_policy(options, p, plan, summary)}
+
+    errored = set()
+    pending = deque(chains.values())
+    running = {}
+    active = Counter()
+    with ThreadPoolExecutor(max_workers=workers) as w:
+        while pending or running:
+            for chain in list(pending):
+                if len(running) >= workers:
+                    break
+                region = get_region(chain)
+                if active[region] >= REGION_CONCURRENCY:
+                    continue
+                pending.remove(chain)
+                active[region] += 1
+                running[w.submit(run_chain, chain)] = chain
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                active[get_region(running.pop(f))] -= 1
+                errored.update(f.result())
+    return errored
+
+
+def run_regions(options, policies, plan, workers, summary=None):
+    """Execute the policies of up to `workers` regions concurrently.
+
+    A region's policies run in order on a single worker, so they share
+    the worker's thread local session for the region (see
+    c7n.utils.local_session) rather than creating one per policy.
+    Returns the ids of errored policies.
+    """
+    regions = {}
+    for p in policies:
+        regions.setdefault((p.provider_name, p.options.region), []).append(p)
+
+    def run_region(region_policies):
+        return {id(p) for p in region_policies
+                if not run_policy(options, p, plan, summary)}
+
+    errored = set()
+    with ThreadPoolExecutor(max_workers=workers) as w:
+        for region_errors in w.map(run_region, regions.values()):
+            errored.update(region_errors)
+    return errored
+
+
 @policy_command
 def report(options, policies):
     from c7n.reports import report as do_report
@@ -407,7 +536,7 @@ def schema_cmd(options):
     if components[0] in PROVIDER_NAMES:
         cloud_provider = components.pop(0)
         components[0] = '%s.%s' % (cloud_provider, components[0])
-        load_resources((components[0],))
+        load_resources((components[0],), ('*',))
         resource_mapping = schema.resource_vocabulary(
             cloud_provider, aliases=True)
     elif components[0] == 'mode':
@@ -415,7 +544,7 @@ def schema_cmd(options):
         resource_mapping = schema.resource_vocabulary()
     else:  # compatibility, aws is default for provider
         components[0] = 'aws.%s' % components[0]
-        load_resources((components[0],))
+        load_resources((components[0],), ('*',))
         resource_mapping = schema.resource_vocabulary('aws', aliases=True)
 
     #
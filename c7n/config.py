@@ -43,7 +43,10 @@ class Config(Bag):
             'metrics': None,
             'output_dir': '',
             'cache_period': 0,
+            'cache_max_size': None,
             'dryrun': False,
+            'stream': False,
+            'incremental': None,
             'authorization_file': None})
         d.update(kw)
         return cls(d)
@@ -3,6 +3,10 @@
 """
 Authentication utilities
 """
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import functools
+import hashlib
 import threading
 import os
 
@@ -11,6 +15,12 @@ from botocore.session import get_session
 from boto3 import Session
 import json
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from c7n.ratelimit import limiter
 from c7n.version import version
 from c7n.utils import get_retry
 
@@ -20,6 +30,10 @@ from c7n.utils import get_retry
 USE_STS_REGIONAL = os.environ.get(
     'C7N_USE_STS_REGIONAL', '').lower() in ('yes', 'true')
 
+# Directory of assumed role credentials shared across processes, see
+# CredentialCache.
+CREDENTIAL_CACHE_ENV = 'C7N_CREDENTIAL_CACHE'
+
 
 class CustodianSession(Session):
 
@@ -101,6 +115,8 @@ class SessionFactory:
         if self._policy_name:
             session._session.user_agent_extra = f"c7n/policy#{self._policy_name}"
 
+        limiter.register(session, limiter.get_account_key(self))
+
         for s in self._subscribers:
             s(session)
 
@@ -130,6 +146,7 @@ def assumed_session(
         session = Session()
 
     retry = get_retry(('Throttling',))
+    cache = get_credential_cache()
 
     def refresh():
 
@@ -150,9 +167,21 @@ def assumed_session(
             # Silly that we basically stringify so it can be parsed again
             expiry_time=credentials['Expiration'].isoformat())
 
+    source, fetch = None, refresh
+    if cache is not None:
+        # credentials are cached per role and the identity assuming it,
+        # so each role of a chain is assumed once across processes.
+        source = getattr(session, 'c7n_credential_source', None)
+        if source is None:
+            base_credentials = session.get_credentials()
+            source = base_credentials and base_credentials.access_key
+        source = CredentialCache.get_key(
+            role_arn, session_name, session_policy, external_id, source)
+        fetch = functools.partial(cache.get, source, refresh)
+
     session_credentials = RefreshableCredentials.create_from_metadata(
-        metadata=refresh(),
-        refresh_using=refresh,
+        metadata=fetch(),
+        refresh_using=fetch,
         method='sts-assume-role')
 
     # so dirty.. it hurts, no clean way to set this outside of the
@@ -166,7 +195,138 @@ def assumed_session(
     if region is None:
         region = s.get_config_variable('region') or 'us-east-1'
     s.set_config_variable('region', region)
-    return Session(botocore_session=s)
+    session = Session(botocore_session=s)
+    session.c7n_credential_source = source
+    return session
+
+
+def get_credential_cache():
+    """Return the credential cache configured by environment, if any."""
+    path = os.environ.get(CREDENTIAL_CACHE_ENV)
+    if not path:
+        return None
+    cache = CredentialCache.caches.get(path)
+    if cache is None:
+        cache = CredentialCache.caches.setdefault(path, CredentialCache(path))
+    return cache
+
+
+class CredentialCache:
+    """Assumed role credentials shared by processes through a directory.
+
+    Enabled by setting the C7N_CREDENTIAL_CACHE environment variable to a
+    directory. Credentials are refreshed ahead of botocore's own refresh
+    windows, and a file lock per entry ensures only one process assumes
+    a role at a time while others wait for and reuse its credentials.
+
+    The directory must only be accessible by its owner, entries are
+    removed once expired or when the run clears the cache.
+    """
+
+    caches = {}
+
+    # seconds of validity remaining below which credentials are refreshed,
+    # botocore refreshes credentials within 15m of expiration.
+    refresh_ahead = 20 * 60
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        self.check_permissions()
+        self.credentials = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.clear(expired=True)
+
+    @staticmethod
+    def get_key(*parts):
+        return hashlib.sha256(
+            json.dumps(parts, sort_keys=True, default=str).encode('utf8')).hexdigest()
+
+    def check_permissions(self):
+        if not hasattr(os, 'getuid'):  # pragma: no cover
+            return
+        # makedirs doesn't change the mode of an existing directory
+        st = os.stat(self.path)
+        if st.st_uid == os.getuid():
+            os.chmod(self.path, 0o700)
+            st = os.stat(self.path)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise PermissionError(
+                "credential cache directory %s must be owned by and only "
+                "accessible to the current user" % self.path)
+
+    def expired(self, credentials):
+        expiry = datetime.fromisoformat(credentials['expiry_time'])
+        return expiry <= datetime.now(timezone.utc)
+
+    def clear(self, expired=False):
+        """Remove cached credentials, or only those that have expired."""
+        for name in os.listdir(self.path):
+            key, ext = os.path.splitext(name)
+            if ext != '.json':
+                continue
+            if expired:
+                credentials = self.read(key)
+                if credentials and not self.expired(credentials):
+                    continue
+            for suffix in ('.json', '.lock'):
+                try:
+                    os.remove(os.path.join(self.path, key + suffix))
+                except FileNotFoundError:
+                    pass
+        if not expired:
+            self.credentials.clear()
+
+    def valid(self, credentials):
+        if not credentials:
+            return False
+        expiry = datetime.fromisoformat(credentials['expiry_time'])
+        remaining = expiry - datetime.now(timezone.utc)
+        return remaining.total_seconds() > self.refresh_ahead
+
+    def get(self, key, refresh):
+        credentials = self.credentials.get(key)
+        if self.valid(credentials):
+            return credentials
+        with self.lock:
+            lock = self.locks.setdefault(key, threading.Lock())
+        with lock, self.file_lock(key):
+            credentials = self.read(key)
+            if not self.valid(credentials):
+                credentials = refresh()
+                self.write(key, credentials)
+            self.credentials[key] = credentials
+        return credentials
+
+    @contextmanager
+    def file_lock(self, key):
+        if fcntl is None:  # pragma: no cover
+            yield
+            return
+        fd = os.open(
+            os.path.join(self.path, '%s.lock' % key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def read(self, key):
+        try:
+            with open(os.path.join(self.path, '%s.json' % key)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, key, credentials):
+        path = os.path.join(self.path, '%s.json' % key)
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as fh:
+            json.dump(credentials, fh)
+        os.replace(tmp_path, path)
 
 
 def get_sts_client(session, region):
@@ -1,9 +1,41 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor)  # noqa
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor  # noqa
 
 import threading
 
+# thread ident to the ident of the policy thread its log records belong
+# to, see c7n.output.LogOutput.
+log_owners = {}
+
+
+class ThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """Thread pool whose workers log on behalf of the submitting thread.
+
+    When policies execute concurrently, records a worker logs while
+    running a submitted call go to the log of the submitting policy.
+    """
+
+    def submit(self, fn, *args, **kw):
+        owner = log_owners.get(threading.get_ident())
+        if owner is None:
+            return super().submit(fn, *args, **kw)
+        return super().submit(run_as_owner, owner, fn, *args, **kw)
+
+
+def run_as_owner(owner, fn, *args, **kw):
+    ident = threading.get_ident()
+    previous = log_owners.get(ident)
+    log_owners[ident] = owner
+    try:
+        return fn(*args, **kw)
+    finally:
+        if previous is None:
+            log_owners.pop(ident, None)
+        else:
+            log_owners[ident] = previous
+
 
 class MainThreadExecutor:
     """ For running tests.
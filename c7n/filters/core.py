@@ -7,6 +7,7 @@ import copy
 import datetime
 from datetime import timedelta
 import fnmatch
+import functools
 import ipaddress
 import logging
 import operator
@@ -22,7 +23,9 @@ from c7n.exceptions import PolicyValidationError, PolicyExecutionError
 from c7n.manager import ResourceManager
 from c7n.registry import PluginRegistry
 from c7n.resolver import ValuesFrom
+from c7n.resources import load_element
 from c7n.utils import (
+    get_tag_map,
     set_annotation,
     type_schema,
     parse_cidr,
@@ -161,6 +164,8 @@ class FilterRegistry(PluginRegistry):
                 "%s Invalid Filter %s" % (
                     self.plugin_type, data))
         filter_class = self.get(filter_type)
+        if filter_class is None and load_element(filter_type):
+            filter_class = self.get(filter_type)
         if filter_class is not None:
             return filter_class(data, manager)
         else:
@@ -192,6 +197,23 @@ def trim_runtime(filters):
 # Really should be an abstract base class (abc) or
 # zope.interface
 
+KEY_ROOT = re.compile(r'^(?:"([^"]+)"|([A-Za-z_][\w:\-]*))(?:$|[.\[])')
+
+
+def get_key_root(key):
+    """Return the top level resource key of a value filter key.
+
+    Returns None for keys not rooted in a resource key, ie. jmespath
+    functions, projections or literals.
+    """
+    if key.startswith('tag:'):
+        return 'Tags'
+    match = KEY_ROOT.match(key)
+    if match is None:
+        return None
+    return match.group(1) or match.group(2)
+
+
 class Filter(Element):
 
     log = logging.getLogger('custodian.filters')
@@ -204,6 +226,32 @@ class Filter(Element):
         """ Bulk process resources and return filtered set."""
         return list(filter(self, resources))
 
+    def process_stream(self, resources, event=None):
+        """Process an iterator of resources.
+
+        Filters that match resources individually return a lazy iterator,
+        anything overriding set processing materializes the stream.
+        """
+        if type(self).process is Filter.process:
+            return filter(self, resources)
+        return self.process(list(resources), event)
+
+    def compile_predicate(self):
+        """Return a per resource predicate equivalent to process, if possible.
+
+        Used to evaluate boolean blocks in a single pass over resources,
+        filters which operate on sets of resources return None.
+        """
+        return None
+
+    def get_resource_keys(self):
+        """Return the top level resource keys the filter reads, if known.
+
+        Used to skip augmentation a policy doesn't need, filters which
+        don't know what they read return None.
+        """
+        return None
+
     def get_block_operator(self):
         """Determine the immediate parent boolean operator for a filter"""
         # Top level operator is `and`
@@ -247,10 +295,7 @@ class BaseValueFilter(Filter):
         if k.startswith('tag:'):
             tk = k.split(':', 1)[1]
             if 'Tags' in i:
-                for t in i.get("Tags", []):
-                    if t.get('Key') == tk:
-                        r = t.get('Value')
-                        break
+                r = get_tag_map(i).get(tk)
             # GCP schema: 'labels': {'key': 'value'}
             elif 'labels' in i:
                 r = i.get('labels', {}).get(tk, None)
@@ -314,19 +359,65 @@ def union_list(a, b):
     return res
 
 
+_missing = object()
+
+
+def _snapshot_matched(r):
+    matched = r.get(ANNOTATION_KEY, _missing)
+    if isinstance(matched, list):
+        matched = list(matched)
+    return matched
+
+
+def _restore_matched(r, matched):
+    if matched is _missing:
+        r.pop(ANNOTATION_KEY, None)
+    else:
+        r[ANNOTATION_KEY] = matched
+
+
 class BooleanGroupFilter(Filter):
 
+    _predicate = _missing
+
     def __init__(self, data, registry, manager):
         super(BooleanGroupFilter, self).__init__(data)
         self.registry = registry
         self.filters = registry.parse(list(self.data.values())[0], manager)
         self.manager = manager
 
+    def get_predicate(self):
+        if self._predicate is _missing:
+            self._predicate = self.compile_predicate()
+        return self._predicate
+
+    def process_stream(self, resources, event=None):
+        predicate = self.manager and self.get_predicate()
+        if predicate:
+            return filter(predicate, resources)
+        return super().process_stream(resources, event)
+
+    def compile_filters(self):
+        predicates = [
+            getattr(f, 'compile_predicate', lambda: None)() for f in self.filters]
+        if not predicates or None in predicates:
+            return None
+        return predicates
+
     def validate(self):
         for f in self.filters:
             f.validate()
         return self
 
+    def get_resource_keys(self):
+        keys = set()
+        for f in self.filters:
+            fkeys = f.get_resource_keys()
+            if fkeys is None:
+                return None
+            keys.update(fkeys)
+        return keys
+
     def get_resource_type_id(self):
         resource_type = self.manager.get_model()
         return resource_type.id
@@ -349,9 +440,26 @@ class Or(BooleanGroupFilter):
 
     def process(self, resources, event=None):
         if self.manager:
+            predicate = self.get_predicate()
+            if predicate:
+                return [r for r in resources if predicate(r)]
             return self.process_set(resources, event)
         return super(Or, self).process(resources, event)
 
+    def compile_predicate(self):
+        predicates = self.compile_filters()
+        if predicates is None:
+            return None
+
+        # every branch is evaluated to accumulate match annotations
+        def match_any(r):
+            matched = False
+            for p in predicates:
+                if p(r):
+                    matched = True
+            return matched
+        return match_any
+
     def __call__(self, r):
         """Fallback for older unit tests that don't utilize a query manager"""
         for f in self.filters:
@@ -382,6 +490,9 @@ class And(BooleanGroupFilter):
 
     def process(self, resources, events=None):
         if self.manager:
+            predicate = self.get_predicate()
+            if predicate:
+                return [r for r in resources if predicate(r)]
             sweeper = AnnotationSweeper(self.get_resource_type_id(), resources)
 
         for f in self.filters:
@@ -394,14 +505,47 @@ class And(BooleanGroupFilter):
 
         return resources
 
+    def compile_predicate(self):
+        predicates = self.compile_filters()
+        if predicates is None:
+            return None
+
+        def match_all(r):
+            matched = _snapshot_matched(r)
+            for p in predicates:
+                if not p(r):
+                    _restore_matched(r, matched)
+                    return False
+            return True
+        return match_all
+
 
 class Not(BooleanGroupFilter):
 
     def process(self, resources, event=None):
         if self.manager:
+            predicate = self.get_predicate()
+            if predicate:
+                return [r for r in resources if predicate(r)]
             return self.process_set(resources, event)
         return super(Not, self).process(resources, event)
 
+    def compile_predicate(self):
+        predicates = self.compile_filters()
+        if predicates is None:
+            return None
+
+        def match_none(r):
+            matched = _snapshot_matched(r)
+            result = True
+            for p in predicates:
+                if not p(r):
+                    result = False
+                    break
+            _restore_matched(r, matched)
+            return not result
+        return match_none
+
     def __call__(self, r):
         """Fallback for older unit tests that don't utilize a query manager"""
 
@@ -491,6 +635,10 @@ class ValueFilter(BaseValueFilter):
     """Generic value filter using jmespath
     """
     op = v = vtype = None
+    _matcher = None
+
+    # value types which leave the filter value untouched
+    static_value_types = (None, 'normalize', 'integer', 'float', 'size', 'unique_size')
 
     schema = {
         'type': 'object',
@@ -514,6 +662,30 @@ class ValueFilter(BaseValueFilter):
     annotate = True
     required_keys = {'value', 'key'}
 
+    def get_resource_keys(self):
+        # subclasses give keys their own meaning
+        if type(self) is not ValueFilter:
+            return None
+        if self.data.get('value_type') == 'resource_count':
+            return set()
+        if len(self.data) == 1:
+            [(key, _)] = self.data.items()
+            keys = [key]
+        else:
+            keys = [self.data.get('key', '')]
+            # expression values and value paths are also read from the resource
+            if self.data.get('value_type') == 'expr':
+                keys.append(self.data.get('value'))
+            if 'value_path' in self.data:
+                keys.append(self.data['value_path'])
+        roots = set()
+        for key in keys:
+            root = isinstance(key, str) and get_key_root(key) or None
+            if root is None:
+                return None
+            roots.add(root)
+        return roots
+
     def _validate_resource_count(self):
         """ Specific validation for `resource_count` type
 
@@ -599,6 +771,19 @@ class ValueFilter(BaseValueFilter):
 
         return super(ValueFilter, self).process(resources, event)
 
+    def process_stream(self, resources, event=None):
+        if (type(self).process is ValueFilter.process and
+                self.data.get('value_type') != 'resource_count'):
+            return filter(self, resources)
+        return super().process_stream(resources, event)
+
+    def compile_predicate(self):
+        if (type(self).process is not ValueFilter.process or
+                type(self).__call__ is not ValueFilter.__call__ or
+                self.data.get('value_type') == 'resource_count'):
+            return None
+        return self
+
     def get_resource_value(self, k, i):
         return super(ValueFilter, self).get_resource_value(k, i, self.data.get('value_regex'))
 
@@ -647,36 +832,229 @@ class ValueFilter(BaseValueFilter):
         if i is None:
             return False
 
-        # value extract
-        r = self.get_resource_value(self.k, i)
-        if self.op in ('in', 'not-in') and r is None:
-            r = ()
+        if self._matcher is None:
+            self._matcher = self.compile_match()
+        return self._matcher(i)
+
+    def compile_match(self):
+        """Compile the initialized filter into a resource predicate.
 
-        # value type conversion
-        if self.vtype is not None:
-            v, r = self.process_value_type(self.v, r, i)
+        The key lookup, value type conversion and comparison are each
+        resolved once to a specialized closure, with constant operands
+        (the filter value, dates, cidrs, versions, regexes) pre-parsed.
+        """
+        get_value = self._compile_value_getter()
+        convert = self._compile_value_type()
+        compare = self._compile_comparison(
+            type(self).process_value_type is ValueFilter.process_value_type and
+            self.vtype in self.static_value_types)
+        empty_in = self.op in ('in', 'not-in')
+        v = self.v
+
+        if convert is None:
+            def matcher(i):
+                r = get_value(i)
+                if empty_in and r is None:
+                    r = ()
+                return compare(r, v)
         else:
-            v = self.v
+            def matcher(i):
+                r = get_value(i)
+                if empty_in and r is None:
+                    r = ()
+                v, r = convert(r, i)
+                return compare(r, v)
+        return matcher
+
+    def _compile_value_getter(self):
+        k = self.k
+        if type(self).get_resource_value is not ValueFilter.get_resource_value:
+            return functools.partial(self.get_resource_value, k)
+
+        regex = self.data.get('value_regex')
+        extract = regex and ValueRegex(regex).get_resource_value or None
 
-        # Value match
-        if r is None and v == 'absent':
-            return True
-        elif r is not None and v == 'present':
-            return True
-        elif v == 'not-null' and r:
-            return True
-        elif v == 'empty' and not r:
-            return True
-        elif self.op:
-            op = OPERATORS[self.op]
+        if k.startswith('tag:'):
+            tk = k.split(':', 1)[1]
+
+            def get_value(i):
+                r = None
+                if 'Tags' in i:
+                    r = get_tag_map(i).get(tk)
+                elif 'labels' in i:
+                    r = i.get('labels', {}).get(tk, None)
+                elif 'tags' in i:
+                    r = (i.get('tags', {}) or {}).get(tk, None)
+                return r
+        else:
+            # keys which aren't valid expressions (ie. c7n:AliasName) are
+            # only ever looked up directly, so compile on first use.
+            expr = self.expr
+
+            def get_value(i):
+                if k in i:
+                    return i.get(k)
+                if k not in expr:
+                    expr[k] = jmespath_compile(k)
+                return expr[k].search(i)
+
+        if extract is None:
+            return get_value
+        return lambda i: extract(get_value(i))
+
+    def _compile_value_type(self):
+        """Return a function of (resource value, resource) -> (sentinel, value)
+
+        or None when the filter value is used as is.
+        """
+        vtype, sentinel = self.vtype, self.v
+        if vtype is None:
+            return None
+        if type(self).process_value_type is not ValueFilter.process_value_type:
+            return lambda r, i: self.process_value_type(sentinel, r, i)
+
+        if vtype == 'normalize':
+            def convert(value, i):
+                if isinstance(value, str):
+                    return sentinel, value.strip().lower()
+                return sentinel, value
+        elif vtype == 'expr':
+            def convert(value, i):
+                return self.get_resource_value(sentinel, i), value
+        elif vtype in ('integer', 'float'):
+            cast, default = vtype == 'integer' and (int, 0) or (float, 0.0)
+
+            def convert(value, i):
+                try:
+                    return sentinel, cast(str(value).strip())
+                except ValueError:
+                    return sentinel, default
+        elif vtype in ('size', 'unique_size'):
+            measure = vtype == 'size' and len or (lambda v: len(set(v)))
+
+            def convert(value, i):
+                try:
+                    return sentinel, measure(value)
+                except TypeError:
+                    return sentinel, 0
+        elif vtype == 'swap':
+            def convert(value, i):
+                return value, sentinel
+        elif vtype == 'date':
+            date_sentinel = parse_date(sentinel)
+
+            def convert(value, i):
+                return date_sentinel, parse_date(value)
+        elif vtype in ('age', 'expiration'):
+            delta = None
+            if not isinstance(sentinel, datetime.datetime):
+                delta = timedelta(sentinel)
+            # Reverse the age comparison, we want to compare the value being
+            # greater than the sentinel typically. Else the syntax for age
+            # comparisons is intuitively wrong.
+            reverse = vtype == 'age'
+
+            def convert(value, i):
+                date_sentinel = sentinel
+                if delta is not None:
+                    now = datetime.datetime.now(tz=tzutc())
+                    date_sentinel = reverse and now - delta or now + delta
+                value = parse_date(value)
+                if value is None:
+                    value = 0
+                if reverse:
+                    return value, date_sentinel
+                return date_sentinel, value
+        elif vtype == 'cidr':
+            cidr_sentinel = parse_cidr(sentinel)
+            sentinel_address = isinstance(cidr_sentinel, ipaddress._BaseAddress)
+
+            def convert(value, i):
+                v = parse_cidr(value)
+                if sentinel_address and isinstance(v, ipaddress._BaseNetwork):
+                    return v, cidr_sentinel
+                return cidr_sentinel, v
+        elif vtype == 'cidr_size':
+            def convert(value, i):
+                cidr = parse_cidr(value)
+                if cidr:
+                    return sentinel, cidr.prefixlen
+                return sentinel, 0
+        elif vtype == 'version':
+            version_sentinel = ComparableVersion(sentinel)
+
+            def convert(value, i):
+                return version_sentinel, ComparableVersion(value)
+        else:
+            def convert(value, i):
+                return sentinel, value
+        return convert
+
+    def _compile_comparison(self, static_value):
+        """Return a function of (resource value, filter value) -> bool
+
+        When the filter value isn't transformed per resource, value
+        sentinels and operand parsing are resolved up front.
+        """
+        op = self.op and OPERATORS[self.op] or None
+        if static_value:
+            op = self._compile_operator(op, self.v)
+
+        def compare(r, v):
+            if r is None and v == 'absent':
+                return True
+            elif r is not None and v == 'present':
+                return True
+            elif v == 'not-null' and r:
+                return True
+            elif v == 'empty' and not r:
+                return True
+            elif op:
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            elif r == v:
+                return True
+            return False
+
+        if not static_value or self.v in ('absent', 'present', 'not-null', 'empty'):
+            return compare
+
+        if op:
+            def compare_op(r, v):
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            return compare_op
+        return operator.eq
+
+    def _compile_operator(self, op, value):
+        if op in (regex_match, regex_case_sensitive_match) and isinstance(value, str):
+            pattern = re.compile(
+                value, flags=op is regex_match and re.IGNORECASE or 0)
+
+            def match_regex(r, v):
+                if not isinstance(r, str):
+                    return False
+                return bool(pattern.match(r))
+            return match_regex
+        elif op in (operator_in, operator_ni) and isinstance(value, list):
             try:
-                return op(r, v)
+                members = frozenset(value)
             except TypeError:
-                return False
-        elif r == v:
-            return True
+                return op
+            negate = op is operator_ni
 
-        return False
+            def match_members(r, v):
+                try:
+                    found = r in members
+                except TypeError:
+                    found = r in v
+                return found is not negate
+            return match_members
+        return op
 
     def process_value_type(self, sentinel, value, resource):
         if self.vtype == 'normalize' and isinstance(value, str):
@@ -809,6 +1187,9 @@ class EventFilter(ValueFilter):
     schema = type_schema('event', rinherit=ValueFilter.schema)
     schema_alias = True
 
+    def get_resource_keys(self):
+        return set()
+
     def validate(self):
         if 'mode' not in self.manager.data:
             raise PolicyValidationError(
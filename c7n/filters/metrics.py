@@ -67,6 +67,11 @@ class MetricsFilter(Filter):
     policy to treat their request counts as 0.
 
     Note the default statistic for metrics is Average.
+
+    When filtering more than ``batch_threshold`` resources, statistics
+    are retrieved in bulk with GetMetricData, packing many resources'
+    queries into each api call. Identical queries issued by multiple
+    metrics filters within a policy are only retrieved once.
     """
 
     schema = type_schema(
@@ -88,11 +93,14 @@ class MetricsFilter(Filter):
            'missing-value': {'type': 'number'},
            'required': ('value', 'name')})
     schema_alias = True
-    permissions = ("cloudwatch:GetMetricStatistics",)
+    permissions = ("cloudwatch:GetMetricStatistics", "cloudwatch:GetMetricData")
 
     MAX_QUERY_POINTS = 50850
     MAX_RESULT_POINTS = 1440
 
+    # resource count above which we retrieve metrics with GetMetricData
+    batch_threshold = 50
+
     # Default per service, for overloaded services like ec2
     # we do type specific default namespace annotation
     # specifically AWS/EBS and AWS/EC2Spot
@@ -193,6 +201,10 @@ class MetricsFilter(Filter):
         self.namespace = ns
 
         self.log.debug("Querying metrics for %d", len(resources))
+        if (len(resources) > self.batch_threshold and
+                type(self).process_resource_set is MetricsFilter.process_resource_set):
+            return self.process_batch(resources)
+
         matched = []
         with self.executor_factory(max_workers=3) as w:
             futures = []
@@ -234,11 +246,7 @@ class MetricsFilter(Filter):
             dimensions.extend(self.get_user_dimensions())
 
             collected_metrics = r.setdefault('c7n.metrics', {})
-            # Note this annotation cache is policy scoped, not across
-            # policies, still the lack of full qualification on the key
-            # means multiple filters within a policy using the same metric
-            # across different periods or dimensions would be problematic.
-            key = "%s.%s.%s.%s" % (self.namespace, self.metric, self.statistics, str(self.days))
+            key = self.get_annotation_key()
 
             params = dict(
                 Namespace=self.namespace,
@@ -257,42 +265,149 @@ class MetricsFilter(Filter):
                 collected_metrics[key] = client.get_metric_statistics(
                     **params)['Datapoints']
 
-            # In certain cases CloudWatch reports no data for a metric.
-            # If the policy specifies a fill value for missing data, add
-            # that here before testing for matches. Otherwise, skip
-            # matching entirely.
-            if len(collected_metrics[key]) == 0:
-                if 'missing-value' not in self.data:
+            if self.match_resource(r, collected_metrics[key]):
+                matched.append(r)
+        return matched
+
+    def get_annotation_key(self):
+        # Note this annotation cache is policy scoped, not across
+        # policies, still the lack of full qualification on the key
+        # means multiple filters within a policy using the same metric
+        # across different periods or dimensions would be problematic.
+        return "%s.%s.%s.%s" % (self.namespace, self.metric, self.statistics, str(self.days))
+
+    def match_resource(self, r, datapoints):
+        # In certain cases CloudWatch reports no data for a metric.
+        # If the policy specifies a fill value for missing data, add
+        # that here before testing for matches. Otherwise, skip
+        # matching entirely.
+        if len(datapoints) == 0:
+            if 'missing-value' not in self.data:
+                return False
+            datapoints.append({
+                'Timestamp': self.start,
+                self.statistics: self.data['missing-value'],
+                'c7n:detail': 'Fill value for missing data'
+            })
+
+        if self.data.get('percent-attr'):
+            rvalue = r[self.data.get('percent-attr')]
+            if self.data.get('attr-multiplier'):
+                rvalue = rvalue * self.data['attr-multiplier']
+            for data_point in datapoints:
+                percent = (data_point[self.statistics] / rvalue * 100)
+                if not self.op(percent, self.value):
+                    return False
+            return True
+
+        for data_point in datapoints:
+            if not self.op(data_point[self.statistics], self.value):
+                return False
+        return True
+
+    def get_metric_data_cache(self):
+        # shared across the metrics filters of a policy's resource manager
+        # so identical queries are only retrieved once.
+        cache = getattr(self.manager, '_metric_data_cache', None)
+        if cache is None:
+            cache = self.manager._metric_data_cache = {}
+        return cache
+
+    def process_batch(self, resources):
+        key = self.get_annotation_key()
+        cache = self.get_metric_data_cache()
+        batch = MetricDataBatch(
+            self.start, self.end, self.period, self.statistics, cache)
+
+        resource_queries = []
+        for r in resources:
+            collected_metrics = r.setdefault('c7n.metrics', {})
+            if key in collected_metrics:
+                resource_queries.append((r, None))
+                continue
+            dimensions = self.get_dimensions(r)
+            dimensions.extend(self.get_user_dimensions())
+            resource_queries.append(
+                (r, batch.add(self.namespace, self.metric, dimensions)))
+
+        client = local_session(self.manager.session_factory).client('cloudwatch')
+        with self.executor_factory(max_workers=3) as w:
+            futures = {w.submit(batch.execute, client, query_set): query_set
+                       for query_set in batch.get_query_sets()}
+            for f in as_completed(futures):
+                if f.exception():
+                    self.log.warning("CW Retrieval error: %s" % f.exception())
+
+        matched = []
+        for r, query_key in resource_queries:
+            collected_metrics = r['c7n.metrics']
+            if query_key is not None:
+                if query_key not in cache:
                     continue
-                collected_metrics[key].append({
-                    'Timestamp': self.start,
-                    self.statistics: self.data['missing-value'],
-                    'c7n:detail': 'Fill value for missing data'
-                })
-
-            if self.data.get('percent-attr'):
-                rvalue = r[self.data.get('percent-attr')]
-                if self.data.get('attr-multiplier'):
-                    rvalue = rvalue * self.data['attr-multiplier']
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    percent = (data_point[self.statistics] / rvalue * 100)
-                    if not self.op(percent, self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
-            else:
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    if not self.op(data_point[self.statistics], self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
+                collected_metrics[key] = [dict(dp) for dp in cache[query_key]]
+            if self.match_resource(r, collected_metrics[key]):
+                matched.append(r)
         return matched
 
 
+class MetricDataBatch:
+    """Bulk retrieval of metric statistics with GetMetricData.
+
+    Queries are deduplicated on their full key (namespace, metric,
+    dimensions, statistic, period and window) against a result cache,
+    and packed up to the api's per request query and datapoint limits.
+    Results are stored in the cache as GetMetricStatistics style
+    datapoints.
+    """
+
+    max_queries = 500
+    max_datapoints = 100800
+
+    def __init__(self, start, end, period, statistic, cache):
+        self.start = start
+        self.end = end
+        self.period = period
+        self.statistic = statistic
+        self.cache = cache
+        self.queries = {}
+
+    def add(self, namespace, metric, dimensions):
+        key = (namespace, metric, self.statistic, self.period, self.start, self.end,
+               tuple(sorted((d['Name'], d['Value']) for d in dimensions)))
+        if key not in self.cache and key not in self.queries:
+            self.queries[key] = {
+                'Namespace': namespace, 'MetricName': metric, 'Dimensions': dimensions}
+        return key
+
+    def get_query_sets(self):
+        points = max(1, int((self.end - self.start).total_seconds() // self.period))
+        size = max(1, min(self.max_queries, self.max_datapoints // points))
+        return list(chunks(list(self.queries), size))
+
+    def execute(self, client, query_keys):
+        queries = []
+        for idx, key in enumerate(query_keys):
+            queries.append({
+                'Id': 'm%d' % idx,
+                'MetricStat': {
+                    'Metric': self.queries[key],
+                    'Period': self.period,
+                    'Stat': self.statistic},
+                'ReturnData': True})
+
+        datapoints = {q['Id']: [] for q in queries}
+        pager = client.get_paginator('get_metric_data')
+        for page in pager.paginate(
+                MetricDataQueries=queries, StartTime=self.start, EndTime=self.end):
+            for result in page.get('MetricDataResults', ()):
+                datapoints[result['Id']].extend(
+                    {'Timestamp': ts, self.statistic: v}
+                    for ts, v in zip(result['Timestamps'], result['Values']))
+
+        for idx, key in enumerate(query_keys):
+            self.cache[key] = datapoints['m%d' % idx]
+
+
 class ShieldMetrics(MetricsFilter):
     """Specialized metrics filter for shield
     """
@@ -257,7 +257,7 @@ from dateutil import zoneinfo, tz as tzutil
 
 from c7n.exceptions import PolicyValidationError
 from c7n.filters import Filter
-from c7n.utils import type_schema, dumps
+from c7n.utils import type_schema, dumps, get_tag_map
 from c7n.resolver import ValuesFrom
 
 log = logging.getLogger('custodian.offhours')
@@ -361,6 +361,12 @@ class Time(Filter):
         self.parse_errors = []
         self.enabled_count = 0
 
+        # resolved once per run, see process
+        self.skip_days = None
+        self.run_now = None
+        # schedule and timezone by normalized tag value
+        self.schedules = {}
+
     def validate(self):
         if self.get_tz(self.default_tz) is None:
             raise PolicyValidationError(
@@ -377,7 +383,12 @@ class Time(Filter):
         return self
 
     def process(self, resources, event=None):
-        resources = super(Time, self).process(resources)
+        self.skip_days = None
+        self.run_now = {}
+        try:
+            resources = super(Time, self).process(resources)
+        finally:
+            self.run_now = None
         if self.parse_errors and self.manager and self.manager.ctx.log_dir:
             self.log.warning("parse errors %d", len(self.parse_errors))
             with open(join(
@@ -429,6 +440,26 @@ class Time(Filter):
         # dateutil.parser.parse to process: value='off=(m-f,1);' properly.
         # before this normalization, some cases would silently fail.
         value = ';'.join(filter(None, value.split(';')))
+        if (value, time_type) not in self.schedules:
+            self.schedules[(value, time_type)] = self.get_schedule(value, time_type)
+        schedule, tz = self.schedules[(value, time_type)]
+        if schedule is None:
+            log.warning(
+                "Invalid schedule on resource:%s value:%s", rid, value)
+            self.parse_errors.append((rid, value))
+            return False
+        if not tz:
+            log.warning(
+                "Could not resolve tz on resource:%s value:%s", rid, value)
+            self.parse_errors.append((rid, value))
+            return False
+        now = self.get_now(schedule['tz'], tz)
+        if now.strftime("%Y-%m-%d") in self.get_skip_days():
+            return False
+        return self.match(now, schedule)
+
+    def get_schedule(self, value, time_type):
+        """Parse a normalized tag value to its schedule and timezone."""
         if self.parser.has_resource_schedule(value, time_type):
             schedule = self.parser.parse(value)
         elif self.parser.keys_are_valid(value):
@@ -442,27 +473,27 @@ class Time(Filter):
         else:
             schedule = None
         if schedule is None:
-            log.warning(
-                "Invalid schedule on resource:%s value:%s", rid, value)
-            self.parse_errors.append((rid, value))
-            return False
-        tz = self.get_tz(schedule['tz'])
-        if not tz:
-            log.warning(
-                "Could not resolve tz on resource:%s value:%s", rid, value)
-            self.parse_errors.append((rid, value))
-            return False
+            return None, None
+        return schedule, self.get_tz(schedule['tz'])
+
+    def get_now(self, tz_name, tz):
+        """Current hour in a timezone, fixed for the duration of a run."""
+        if self.run_now is not None and tz_name in self.run_now:
+            return self.run_now[tz_name]
         now = datetime.datetime.now(tz).replace(
             minute=0, second=0, microsecond=0)
-        now_str = now.strftime("%Y-%m-%d")
-        if 'skip-days-from' in self.data:
-            values = ValuesFrom(self.data['skip-days-from'], self.manager)
-            self.skip_days = values.get_values()
-        else:
-            self.skip_days = self.data.get('skip-days', [])
-        if now_str in self.skip_days:
-            return False
-        return self.match(now, schedule)
+        if self.run_now is not None:
+            self.run_now[tz_name] = now
+        return now
+
+    def get_skip_days(self):
+        if self.skip_days is None:
+            if 'skip-days-from' in self.data:
+                values = ValuesFrom(self.data['skip-days-from'], self.manager)
+                self.skip_days = set(values.get_values())
+            else:
+                self.skip_days = set(self.data.get('skip-days', []))
+        return self.skip_days
 
     def match(self, now, schedule):
         time = schedule.get(self.time_type, ())
@@ -475,11 +506,7 @@ class Time(Filter):
     def get_tag_value(self, i):
         """Get the resource's tag value specifying its schedule."""
         # Look for the tag, Normalize tag key and tag value
-        found = self.fallback_schedule
-        for t in i.get('Tags', ()):
-            if t['Key'].lower() == self.tag_key:
-                found = t['Value']
-                break
+        found = get_tag_map(i, lower=True).get(self.tag_key, self.fallback_schedule)
         # NOTE for GCP resources, eg sql-instance
         if found == self.fallback_schedule and 'labels' in i:
             found = i.get('labels', {}).get(self.tag_key) or found
@@ -1,11 +1,108 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import importlib
-from functools import lru_cache
+import threading
+from collections import OrderedDict
 
-from .core import ValueFilter, OPERATORS
+from .core import ValueFilter, OPERATORS, get_key_root
+from c7n.cache import RunIndex
 from c7n.query import ChildResourceQuery
-from c7n.utils import jmespath_search
+from c7n.utils import jmespath_compile, jmespath_search
+
+
+class RelatedResourceIndex(RunIndex):
+    """Related resources by id, shared by the related filters of a run.
+
+    Holds the related resources fetched so far for each related resource
+    type.
+
+    Ids are resolved from the index first, and the rest are fetched
+    either by id or by enumerating the full population. As an
+    enumeration serves every later lookup of the type in the run, it is
+    preferred once the ids requested for a type across the run reach the
+    filter's fetch threshold. At most `MaxTypes` related types are held
+    per index, least recently used first out.
+    """
+
+    MaxTypes = 32
+
+    def __init__(self, ttl=0):
+        super().__init__(ttl)
+        self.populations = OrderedDict()
+        self.type_lock = threading.Lock()
+
+    def get_population(self, resource_type):
+        with self.type_lock:
+            population = self.populations.get(resource_type)
+            if population is None:
+                population = self.populations[resource_type] = RelatedPopulation()
+            self.populations.move_to_end(resource_type)
+            while len(self.populations) > self.MaxTypes:
+                self.populations.popitem(last=False)
+        return population
+
+    def get_related(self, resource_type, resource_manager, related_ids, threshold):
+        """Return a map of id to resource for the given related ids."""
+        population = self.get_population(resource_type)
+        with population.lock:
+            population.fetch(resource_manager, related_ids, threshold)
+            return {rid: population.resources[rid] for rid in related_ids
+                    if rid in population.resources}
+
+    def get_related_by(self, resource_type, resource_manager, related_ids, expression):
+        """Return a map of id to the resources referencing it by expression."""
+        population = self.get_population(resource_type)
+        with population.lock:
+            refs = population.get_references(resource_manager, expression)
+            return {rid: refs[rid] for rid in related_ids if rid in refs}
+
+
+class RelatedPopulation:
+    """Resources of one related type fetched so far in a run."""
+
+    def __init__(self):
+        self.resources = {}
+        self.complete = False
+        self.requested = 0
+        self.references = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, resource_manager, related_ids, threshold):
+        if self.complete:
+            return
+        missing = [rid for rid in related_ids if rid not in self.resources]
+        if not missing:
+            return
+        self.requested += len(missing)
+        if self.requested < threshold:
+            self.add(resource_manager, resource_manager.get_resources(missing))
+        else:
+            self.enumerate(resource_manager)
+
+    def enumerate(self, resource_manager):
+        if not self.complete:
+            self.add(resource_manager, resource_manager.resources())
+            self.complete = True
+
+    def add(self, resource_manager, resources):
+        model_id = resource_manager.get_model().id
+        for r in resources or ():
+            self.resources[r[model_id]] = r
+
+    def get_references(self, resource_manager, expression):
+        refs = self.references.get(expression)
+        if refs is not None:
+            return refs
+        self.enumerate(resource_manager)
+        expr = jmespath_compile(expression)
+        refs = self.references[expression] = {}
+        for r in self.resources.values():
+            ids = expr.search(r)
+            if isinstance(ids, str):
+                ids = [ids]
+            for rid in set(ids or ()):
+                refs.setdefault(rid, []).append(r)
+        return refs
 
 
 class RelatedResourceFilter(ValueFilter):
@@ -34,31 +131,39 @@ class RelatedResourceFilter(ValueFilter):
                 "%s Filter requires resource manager spec" % name)
         return super(RelatedResourceFilter, self).validate()
 
+    def get_resource_keys(self):
+        # only the stock id lookup is known, subclasses may read anything
+        klass = type(self)
+        for m in ('get_related_ids', 'process_resource', 'process'):
+            if getattr(klass, m) is not getattr(RelatedResourceFilter, m):
+                return None
+        keys = {get_key_root(self.RelatedIdsExpression)}
+        if self.data.get('match-resource') is True:
+            keys.add(get_key_root(self.data.get('key', '')))
+        if None in keys:
+            return None
+        return keys
+
     def get_related_ids(self, resources):
         return set(jmespath_search(
             "[].%s" % self.RelatedIdsExpression, resources))
 
     def get_related(self, resources):
-        resource_manager = self.get_resource_manager()
         related_ids = self.get_related_ids(resources)
-        model = resource_manager.get_model()
-        if len(related_ids) < self.FetchThreshold:
-            related = resource_manager.get_resources(list(related_ids))
-        else:
-            related = resource_manager.resources()
-
-        if related is None:
+        if not related_ids:
             return {}
+        return RelatedResourceIndex.get_index(self.manager).get_related(
+            self.RelatedResource, self.get_resource_manager(),
+            related_ids, self.FetchThreshold)
 
-        return {r[model.id]: r for r in related
-                if r[model.id] in related_ids}
-
-    @lru_cache(maxsize=None)
     def get_resource_manager(self):
-        mod_path, class_name = self.RelatedResource.rsplit('.', 1)
-        module = importlib.import_module(mod_path)
-        manager_class = getattr(module, class_name)
-        return manager_class(self.manager.ctx, {})
+        resource_manager = getattr(self, '_related_manager', None)
+        if resource_manager is None:
+            mod_path, class_name = self.RelatedResource.rsplit('.', 1)
+            module = importlib.import_module(mod_path)
+            manager_class = getattr(module, class_name)
+            resource_manager = self._related_manager = manager_class(self.manager.ctx, {})
+        return resource_manager
 
     def process_resource(self, resource, related):
         related_ids = self.get_related_ids([resource])
@@ -123,18 +228,12 @@ class RelatedResourceByIdFilter(RelatedResourceFilter):
     RelatedResourceByIdExpression = None
 
     def get_related(self, resources):
-        resource_manager = self.get_resource_manager()
         related_ids = self.get_related_ids(resources)
-
-        related = {}
-        for r in resource_manager.resources():
-            matched_vpc = self.get_related_by_ids(r) & related_ids
-            if matched_vpc:
-                for vpc in matched_vpc:
-                    related_resources = related.get(vpc, [])
-                    related_resources.append(r)
-                    related[vpc] = related_resources
-        return related
+        if not related_ids:
+            return {}
+        return RelatedResourceIndex.get_index(self.manager).get_related_by(
+            self.RelatedResource, self.get_resource_manager(), related_ids,
+            self.RelatedResourceByIdExpression or self.RelatedIdsExpression)
 
     def get_related_by_ids(self, resources):
         RelatedResourceKey = self.RelatedResourceByIdExpression or self.RelatedIdsExpression
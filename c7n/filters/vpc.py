@@ -1,5 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import threading
+
+from c7n.cache import RunIndex
 from c7n.exceptions import PolicyValidationError
 from c7n.utils import local_session, type_schema
 
@@ -160,6 +163,36 @@ class DefaultVpcBase(Filter):
         return vpc_id == self.default_vpc and True or False
 
 
+class SecurityGroupReferenceIndex(RunIndex):
+    """Populations of resources referencing security groups.
+
+    Shared by the filters of a run, so that security group usage and
+    location checks across policies fetch each referencing resource type
+    once.
+    """
+
+    def __init__(self, ttl=0):
+        super().__init__(ttl)
+        self.populations = {}
+        self.fetch_locks = {}
+        self.fetch_lock = threading.Lock()
+
+    def get(self, resource_type, augment=True):
+        """Return an already fetched population, or None."""
+        return self.populations.get((resource_type, augment))
+
+    def resources(self, manager, resource_type, augment=True):
+        """Return the population of a resource type, fetching it once."""
+        key = (resource_type, augment)
+        with self.fetch_lock:
+            lock = self.fetch_locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self.populations:
+                self.populations[key] = manager.get_resource_manager(
+                    resource_type).resources(augment=augment)
+        return self.populations[key]
+
+
 class NetworkLocation(Filter):
     """On a network attached resource, determine intersection of
     security-group attributes, subnet attributes, and resource attributes.
@@ -234,7 +267,7 @@ class NetworkLocation(Filter):
 
     def process(self, resources, event=None):
         self.sg = self.manager.filter_registry.get('security-group')({}, self.manager)
-        related_sg = self.sg.get_related(resources)
+        related_sg = self.get_related_groups(resources)
 
         self.subnet = self.manager.filter_registry.get('subnet')({}, self.manager)
         related_subnet = self.subnet.get_related(resources)
@@ -263,6 +296,17 @@ class NetworkLocation(Filter):
 
         return results
 
+    def get_related_groups(self, resources):
+        index = SecurityGroupReferenceIndex.get_index(self.manager)
+        related_ids = self.sg.get_related_ids(resources)
+        groups = index.get('security-group')
+        if groups is None:
+            # only fetch the full population when the filter would anyway
+            if not index.ttl or len(related_ids) < self.sg.FetchThreshold:
+                return self.sg.get_related(resources)
+            groups = index.resources(self.manager, 'security-group')
+        return {g['GroupId']: g for g in groups if g['GroupId'] in related_ids}
+
     def filter_ignored(self, resources):
         ignores = self.data.get('ignore', ())
         results = []
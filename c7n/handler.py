@@ -152,7 +152,10 @@ def dispatch_event(event, context):
         with open('config.json') as f:
             policy_data = json.load(f)
         policy_config = init_config(policy_data)
-        load_resources(StructureParser().get_resource_types(policy_data))
+        structure = StructureParser()
+        load_resources(
+            structure.get_resource_types(policy_data),
+            structure.get_element_types(policy_data))
 
     if C7N_DEBUG_EVENT:
         event['debug'] = True
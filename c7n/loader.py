@@ -119,7 +119,8 @@ class PolicyLoader:
         # track policy resource types and only load if needed.
         rtypes = set(self.structure.get_resource_types(policy_data))
 
-        missing = load_resources(list(rtypes))
+        missing = load_resources(
+            list(rtypes), self.structure.get_element_types(policy_data))
         if missing:
             self._handle_missing_resources(policy_data, missing)
 
@@ -186,7 +187,7 @@ class DirectoryLoader(PolicyLoader):
                 errors.append(e)
                 return errors
             rtypes = structure.get_resource_types(data)
-            load_resources(rtypes)
+            load_resources(rtypes, structure.get_element_types(data))
             schm = schema.generate(rtypes)
             errors += schema.validate(data, schm)
             return errors
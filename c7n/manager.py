@@ -120,6 +120,21 @@ class ResourceManager:
             original, len(resources), self.__class__.__name__.lower()))
         return resources
 
+    def filter_resource_stream(self, resources, event=None):
+        """Filter an iterator of resources, returning the matched list.
+
+        Filters which evaluate each resource independently are chained
+        lazily, set based filters materialize the stream.
+        """
+        for f in self.filters:
+            if isinstance(resources, list) and not resources:
+                break
+            resources = f.process_stream(resources, event)
+        resources = list(resources)
+        self.log.debug("Filtered stream to %d %s" % (
+            len(resources), self.__class__.__name__.lower()))
+        return resources
+
     def get_model(self):
         """Returns the resource meta-model.
         """
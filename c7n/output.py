@@ -14,12 +14,14 @@ import logging
 import os
 import shutil
 import tempfile
+import threading
 import time
 import uuid
 
 from abc import ABC, abstractmethod
 
 from c7n.exceptions import InvalidOutputConfig
+from c7n.executor import log_owners
 from c7n.registry import PluginRegistry
 from c7n.utils import parse_url_config, join_output_path
 
@@ -318,10 +320,18 @@ class LogOutput:
 
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
+    # threads with a policy log joined, when policies execute concurrently
+    # a policy's log only receives records from its own thread and from
+    # pool workers running calls it submitted (see c7n.executor). Records
+    # from other threads only reach a policy log when it's the only one.
+    log_threads = set()
+
     def __init__(self, ctx, config=None):
         self.ctx = ctx
         self.config = config or {}
         self.handler = None
+        self.thread = None
+        self.owner = None
 
     def get_handler(self):
         raise NotImplementedError()
@@ -342,12 +352,28 @@ class LogOutput:
             return
         self.handler.setLevel(logging.DEBUG)
         self.handler.setFormatter(logging.Formatter(self.log_format))
+        self.thread = threading.get_ident()
+        self.owner = log_owners.get(self.thread)
+        log_owners[self.thread] = self.thread
+        self.log_threads.add(self.thread)
+        self.handler.addFilter(self.filter_thread)
         mlog = logging.getLogger('custodian')
         mlog.addHandler(self.handler)
 
+    def filter_thread(self, record):
+        owner = log_owners.get(record.thread, record.thread)
+        if owner in self.log_threads:
+            return owner == self.thread
+        return len(self.log_threads) == 1
+
     def leave_log(self):
         if self.handler is None:
             return
+        self.log_threads.discard(self.thread)
+        if self.owner is None:
+            log_owners.pop(self.thread, None)
+        else:
+            log_owners[self.thread] = self.owner
         mlog = logging.getLogger('custodian')
         mlog.removeHandler(self.handler)
         self.handler.flush()
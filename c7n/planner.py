@@ -0,0 +1,116 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""Plan resource fetches across the policies of a run.
+
+Policies in a run which share a provider, region, resource type, source
+and query are grouped so that the group's resource population is
+fetched and augmented once, with every policy of the group receiving its
+own copy of the shared result.
+"""
+import copy
+import json
+import logging
+import threading
+
+from c7n.cache import Cache, encode
+
+log = logging.getLogger('custodian.planner')
+
+
+class FetchPlan:
+    """Share resource fetches between policies with the same query.
+
+    Policies are attached to the plan up front, the first policy of a
+    group to run fetches and augments the population, subsequent policies
+    get a copy of it. A group's resources are released once all of its
+    policies have run.
+    """
+
+    def __init__(self, policies=()):
+        self.groups = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.plan(policies)
+
+    @staticmethod
+    def get_group_key(policy):
+        if policy.execution_mode != 'pull':
+            return None
+        manager = policy.resource_manager
+        if getattr(manager, 'get_cache_key', None) is None or getattr(
+                manager, 'streaming', False):
+            return None
+        stages = getattr(manager, 'select_augment_stages', lambda: None)()
+        return (
+            policy.provider_name,
+            policy.options.region,
+            policy.resource_type,
+            policy.data.get('source'),
+            json.dumps(policy.data.get('query'), sort_keys=True, default=str),
+            None if stages is None else tuple(sorted(stages)))
+
+    def plan(self, policies):
+        candidates = {}
+        for p in policies:
+            key = self.get_group_key(p)
+            if key is not None:
+                candidates.setdefault(key, []).append(p)
+
+        for key, group in candidates.items():
+            if len(group) < 2:
+                continue
+            shared = self.groups.setdefault(key, {})
+            self.pending[key] = self.pending.get(key, 0) + len(group)
+            for p in group:
+                p.resource_manager._cache = SharedFetchCache(
+                    shared, p.resource_manager._cache)
+
+        if self.groups:
+            log.debug(
+                "Planned %d shared resource fetches for %d policies",
+                len(self.groups), sum(self.pending.values()))
+
+    def release(self, policy):
+        """Note a policy has run, dropping its group's data after the last."""
+        key = self.get_group_key(policy)
+        with self.lock:
+            if key not in self.pending:
+                return
+            self.pending[key] -= 1
+            if not self.pending[key]:
+                self.pending.pop(key)
+                self.groups.pop(key).clear()
+
+
+class SharedFetchCache(Cache):
+    """Cache shared by a group of policies in front of a policy's cache.
+
+    Saved resources are held in memory for the rest of the group, gets
+    return a copy so annotations made by one policy's filters and actions
+    are not visible to other policies.
+    """
+
+    def __init__(self, shared, cache):
+        super().__init__(cache.config)
+        self.shared = shared
+        self.cache = cache
+
+    def load(self):
+        self.cache.load()
+        return True
+
+    def get(self, key):
+        data = self.shared.get(encode(key))
+        if data is not None:
+            return copy.deepcopy(data)
+        return self.cache.get(key)
+
+    def save(self, key, data):
+        self.shared[encode(key)] = copy.deepcopy(data)
+        self.cache.save(key, data)
+
+    def size(self):
+        return self.cache.size()
+
+    def close(self):
+        self.cache.close()
@@ -17,7 +17,7 @@ from c7n.exceptions import PolicyValidationError, ClientError, ResourceLimitExce
 from c7n.filters import FilterRegistry, And, Or, Not
 from c7n.manager import iter_filters
 from c7n.output import DEFAULT_NAMESPACE
-from c7n.resources import load_resources
+from c7n.resources import load_element, load_resources
 from c7n.registry import PluginRegistry
 from c7n.provider import clouds, get_resource_class
 from c7n import deprecated, utils
@@ -48,7 +48,7 @@ def load(options, path, format=None, validate=True, vars=None):
     structure = StructureParser()
     structure.validate(data)
     rtypes = structure.get_resource_types(data)
-    load_resources(rtypes)
+    load_resources(rtypes, structure.get_element_types(data))
 
     if isinstance(data, list):
         log.warning('yaml in invalid format. The "policies:" line is probably missing.')
@@ -1230,9 +1230,10 @@ class Policy:
         return self.data.get('mode', {'type': 'pull'})['type']
 
     def get_execution_mode(self):
-        try:
-            exec_mode = execution[self.execution_mode]
-        except KeyError:
+        exec_mode = execution.get(self.execution_mode)
+        if exec_mode is None and load_element(self.execution_mode):
+            exec_mode = execution.get(self.execution_mode)
+        if exec_mode is None:
             return None
         return exec_mode(self)
 
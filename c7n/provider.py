@@ -32,6 +32,10 @@ class Provider(metaclass=abc.ABCMeta):
     def resource_map(self):
         """resource qualified name to python dotted path mapping."""
 
+    # filter and action type names to the python module registering them
+    # across the provider's resource types, imported when referenced.
+    element_map = {}
+
     @abc.abstractmethod
     def initialize(self, options):
         """Perform any provider specific initialization
@@ -58,6 +62,36 @@ class Provider(metaclass=abc.ABCMeta):
             cls.resources.notify(r)
         return resource_classes, not_found
 
+    @classmethod
+    def load_elements(cls, element_types):
+        """Import the modules providing the given shared filters and actions"""
+        return import_element_modules(cls.resources, cls.element_map, element_types)
+
+
+# element modules imported via a provider's element map
+LOADED_ELEMENTS = set()
+
+
+def import_element_modules(registry, element_map, element_types):
+    if '*' in element_types:
+        modules = set(element_map.values())
+    else:
+        modules = {element_map[e] for e in element_types if e in element_map}
+
+    loaded = []
+    for emod in sorted(modules.difference(LOADED_ELEMENTS)):
+        importlib.import_module(emod)
+        # the module's subscribers only see resource classes registered after
+        # import, so catch up those already loaded.
+        for subscriber in list(registry._subscribers):
+            if getattr(subscriber, '__module__', None) != emod:
+                continue
+            for rclass in list(registry.values()):
+                subscriber(registry, rclass)
+        LOADED_ELEMENTS.add(emod)
+        loaded.append(emod)
+    return loaded
+
 
 def import_resource_classes(resource_map, resource_types):
     if '*' in resource_types:
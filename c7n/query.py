@@ -5,22 +5,28 @@ Query capability built on skew metamodel
 
 tags_spec -> s3, elb, rds
 """
-from concurrent.futures import as_completed
+from collections import deque
+from concurrent.futures import as_completed, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
 import functools
 import itertools
 import json
 from typing import List
 
 import os
+import time
 
 from c7n.actions import ActionRegistry
+from c7n.cache import SnapshotStore
 from c7n.exceptions import ClientError, ResourceLimitExceeded, PolicyExecutionError
 from c7n.filters import FilterRegistry, MetricsFilter
 from c7n.manager import ResourceManager
+from c7n.ratelimit import limiter, THROTTLE_ERRORS
 from c7n.registry import PluginRegistry
 from c7n.tags import register_ec2_tags, register_universal_tags, universal_augment
 from c7n.utils import (
-    local_session, generate_arn, get_retry, chunks, camelResource, jmespath_compile, get_path)
+    local_session, generate_arn, get_retry, chunks, camelResource, jmespath_compile, get_path,
+    backoff_delays, CallStats)
 
 try:
     from botocore.paginate import PageIterator, Paginator
@@ -61,8 +67,22 @@ class ResourceQuery:
 
         return data
 
-    def filter(self, resource_manager, **params):
-        """Query a set of resources."""
+    def _iter_client_enum(self, client, enum_op, params, path, retry=None):
+        """Yield enumerated resources a page at a time."""
+        if not client.can_paginate(enum_op):
+            yield from self._invoke_client_enum(client, enum_op, params, path) or ()
+            return
+
+        p = client.get_paginator(enum_op)
+        if retry:
+            p.PAGE_ITERATOR_CLS = RetryPageIterator
+        path = path and jmespath_compile(path) or None
+        for page in p.paginate(**params):
+            page.pop('ResponseMetadata', None)
+            data = path.search(page) if path else page
+            yield from data or ()
+
+    def _get_enum_params(self, resource_manager, params):
         m = self.resolve(resource_manager.resource_type)
         if resource_manager.get_client:
             client = resource_manager.get_client()
@@ -72,10 +92,22 @@ class ResourceQuery:
         enum_op, path, extra_args = m.enum_spec
         if extra_args:
             params = {**extra_args, **params}
+        return client, enum_op, params, path
+
+    def filter(self, resource_manager, **params):
+        """Query a set of resources."""
+        client, enum_op, params, path = self._get_enum_params(resource_manager, params)
         return self._invoke_client_enum(
             client, enum_op, params, path,
             getattr(resource_manager, 'retry', None)) or []
 
+    def filter_iter(self, resource_manager, **params):
+        """Query a set of resources, yielding them as pages are retrieved."""
+        client, enum_op, params, path = self._get_enum_params(resource_manager, params)
+        return self._iter_client_enum(
+            client, enum_op, params, path,
+            getattr(resource_manager, 'retry', None))
+
     def get(self, resource_manager, identities):
         """Get resources by identities
         """
@@ -118,10 +150,16 @@ class ChildResourceQuery(ResourceQuery):
 
     parent_key = 'c7n:parent-id'
 
+    # attempts per parent when throttled
+    max_attempts = 8
+
     def __init__(self, session_factory, manager, capture_parent_id=False):
         self.session_factory = session_factory
         self.manager = manager
         self.capture_parent_id = capture_parent_id
+        # number of parents whose children are enumerated concurrently
+        self.max_workers = manager.config.get('parent_workers') or getattr(
+            manager, 'parent_workers', 1)
 
     def filter(self, resource_manager, parent_ids=None, **params):
         """Query a set of resources."""
@@ -155,11 +193,18 @@ class ChildResourceQuery(ResourceQuery):
             return self._invoke_client_enum(client, enum_op, params, path)
 
         # Have to query separately for each parent's children.
+        if self.max_workers > 1 and len(parent_ids) > 1:
+            subsets = self.fanout(client, enum_op, params, path, parent_ids, parent_key)
+        else:
+            subsets = (
+                self._invoke_client_enum(
+                    client, enum_op,
+                    self.get_parent_parameters(params, parent_id, parent_key),
+                    path, retry=self.manager.retry)
+                for parent_id in parent_ids)
+
         results = []
-        for parent_id in parent_ids:
-            merged_params = self.get_parent_parameters(params, parent_id, parent_key)
-            subset = self._invoke_client_enum(
-                client, enum_op, merged_params, path, retry=self.manager.retry)
+        for parent_id, subset in zip(parent_ids, subsets):
             if annotate_parent:
                 for r in subset:
                     r[self.parent_key] = parent_id
@@ -170,9 +215,67 @@ class ChildResourceQuery(ResourceQuery):
                     results.extend(subset)
         return results
 
+    def fanout(self, client, enum_op, params, path, parent_ids, parent_key):
+        """Enumerate children of multiple parents concurrently.
+
+        Returns the children of each parent in parent order. Throttled
+        parent queries are requeued after a backoff delay, while the
+        number of concurrent queries is halved on throttling and
+        additively increased back to max_workers as queries succeed.
+        """
+        results = {}
+        throttles = {}
+        pending = deque(range(len(parent_ids)))
+        inflight = {}
+        width = limiter.get_workers(
+            self.manager.session_factory, self.manager.config.region,
+            self.resolve(self.manager.resource_type).service, self.max_workers)
+        successes = 0
+        delays = backoff_delays(1, 2 ** self.max_attempts, jitter=True)
+
+        def fetch(parent_id):
+            return self._invoke_client_enum(
+                client, enum_op,
+                self.get_parent_parameters(params, parent_id, parent_key),
+                path, retry=self.manager.retry)
+
+        with self.manager.executor_factory(max_workers=self.max_workers) as w:
+            while pending or inflight:
+                while pending and len(inflight) < width:
+                    idx = pending.popleft()
+                    inflight[w.submit(fetch, parent_ids[idx])] = idx
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                throttled = False
+                for f in done:
+                    idx = inflight.pop(f)
+                    if f.exception() is None:
+                        results[idx] = f.result()
+                        successes += 1
+                        continue
+                    e = f.exception()
+                    if not isinstance(e, ClientError) or e.response[
+                            'Error']['Code'] not in THROTTLE_ERRORS:
+                        raise e
+                    throttles[idx] = throttles.get(idx, 0) + 1
+                    if throttles[idx] >= self.max_attempts:
+                        raise e
+                    pending.appendleft(idx)
+                    throttled = True
+                if throttled:
+                    width, successes = max(1, width // 2), 0
+                    self.manager.log.debug(
+                        "throttled enumerating children, concurrency:%d", width)
+                    time.sleep(next(delays, 2 ** self.max_attempts))
+                elif successes >= width and width < self.max_workers:
+                    width, successes = width + 1, 0
+        return [results[idx] for idx in range(len(parent_ids))]
+
     def get_parent_parameters(self, params, parent_id, parent_key):
         return dict(params, **{parent_key: parent_id})
 
+    def filter_iter(self, resource_manager, **params):
+        return iter(self.filter(resource_manager, **params))
+
 
 class QueryMeta(type):
 
@@ -229,6 +332,16 @@ class DescribeSource:
     def resources(self, query):
         return self.query.filter(self.manager, **query)
 
+    def iter_resources(self, query):
+        """Iterate over resources as they are retrieved.
+
+        Sources which customize enumeration fall back to iterating
+        over their fully retrieved resource set.
+        """
+        if type(self).resources is not DescribeSource.resources:
+            return iter(self.resources(query))
+        return self.query.filter_iter(self.manager, **query)
+
     def get_query(self):
         return self.resource_query_factory(self.manager.session_factory)
 
@@ -253,6 +366,22 @@ class DescribeSource:
             perms.append("%s:%s" % (prefix, _napi(m.batch_detail_spec[0])))
         return perms
 
+    def get_augment_stages(self):
+        """Return the optional augment stages and the resource keys each provides.
+
+        Stages not needed by a policy's filters are deferred until after
+        filtering, see :py:meth:`QueryResourceManager.select_augment_stages`.
+        """
+        return {}
+
+    def run_augment_stage(self, name):
+        stages = getattr(self.manager, 'augment_stages', None)
+        return stages is None or name in stages
+
+    def complete_augment(self, resources, stages):
+        """Run deferred augment stages over the resources that matched."""
+        return resources
+
     def augment(self, resources):
         model = self.manager.get_model()
         if getattr(model, 'detail_spec', None):
@@ -263,24 +392,72 @@ class DescribeSource:
             _augment = _batch_augment
         else:
             return resources
+        if not resources:
+            return resources
         if self.manager.get_client:
             client = self.manager.get_client()
         else:
             client = local_session(self.manager.session_factory).client(
                 model.service, region_name=self.manager.config.region)
+        timer = CallTimer()
         _augment = functools.partial(
-            _augment, self.manager, model, detail_spec, client)
-        with self.manager.executor_factory(
-                max_workers=self.manager.max_workers) as w:
-            results = list(w.map(
-                _augment, chunks(resources, self.manager.chunk_size)))
-            return list(itertools.chain(*results))
+            _augment, self.manager, model, detail_spec, client, timer=timer)
+        max_workers = limiter.get_workers(
+            self.manager.session_factory, self.manager.config.region,
+            model.service, self.manager.max_workers)
+        if _augment.func is _batch_augment:
+            batch_size = get_batch_size(self.manager, client, detail_spec[0], detail_spec[1])
+        else:
+            # calls are per resource, spread them evenly over the workers
+            batch_size = max(1, min(
+                self.manager.chunk_size, -(-len(resources) // max_workers)))
+        with self.manager.executor_factory(max_workers=max_workers) as w:
+            results = list(w.map(_augment, chunks(resources, batch_size)))
+        timer.report(self.manager)
+        return list(itertools.chain(*results))
+
+
+def get_batch_size(manager, client, detail_op, param_name):
+    """Return the number of resources to describe per batch detail call.
+
+    A chunk size set on the resource manager class is kept, otherwise
+    it's the largest number of ids the api accepts.
+    """
+    if type(manager).chunk_size != QueryResourceManager.chunk_size:
+        return manager.chunk_size
+    try:
+        operation = client.meta.service_model.operation_model(
+            client.meta.method_to_api_mapping[detail_op])
+        shape = operation.input_shape.members[param_name]
+    except (AttributeError, KeyError):
+        return manager.chunk_size
+    return shape.metadata.get('max') or manager.chunk_size
+
+
+class CallTimer(CallStats):
+    """Counts and times the api calls made while augmenting resources."""
+
+    def report(self, manager):
+        for name in sorted(self.calls):
+            manager.log.debug(
+                "augment %s %s calls:%d time:%0.2f",
+                getattr(manager, 'type', manager.__class__.__name__),
+                name, self.calls[name], self.elapsed[name])
 
 
 class DescribeWithResourceTags(DescribeSource):
 
+    def get_augment_stages(self):
+        return {'tags': {'Tags'}}
+
     def augment(self, resources):
-        return universal_augment(self.manager, super().augment(resources))
+        resources = super().augment(resources)
+        if not self.run_augment_stage('tags'):
+            return resources
+        return universal_augment(self.manager, resources)
+
+    def complete_augment(self, resources, stages):
+        return universal_augment(self.manager, resources)
 
 
 @sources.register('describe-child')
@@ -421,20 +598,22 @@ class ConfigSource:
                     results.extend(f.result())
         return results
 
-    def resources(self, query=None):
-        client = local_session(self.manager.session_factory).client('config')
-        query = self.get_query_params(query)
+    def select(self, client, expr):
         pager = Paginator(
             client.select_resource_config,
             {'input_token': 'NextToken', 'output_token': 'NextToken',
              'result_key': 'Results'},
             client.meta.service_model.operation_model('SelectResourceConfig'))
         pager.PAGE_ITERATOR_CLS = RetryPageIterator
+        for page in pager.paginate(Expression=expr):
+            for r in page['Results']:
+                yield json.loads(r)
 
-        results = []
-        for page in pager.paginate(Expression=query['expr']):
-            results.extend([
-                self.load_resource(json.loads(r)) for r in page['Results']])
+    def resources(self, query=None):
+        client = local_session(self.manager.session_factory).client('config')
+        query = self.get_query_params(query)
+
+        results = [self.load_resource(r) for r in self.select(client, query['expr'])]
 
         # Config arbitrarily breaks which resource types its supports for query/select
         # on any given day, if we don't have a user defined query, then fallback
@@ -443,6 +622,70 @@ class ConfigSource:
             results = self.get_listed_resources(client)
         return results
 
+    def iter_resources(self, query=None):
+        return iter(self.resources(query))
+
+    deleted_status = ('ResourceDeleted', 'ResourceDeletedNotRecorded')
+
+    def is_recording(self, client, since):
+        """Whether config has been recording the resource type since a datetime."""
+        config_type = self.manager.get_model().config_type
+        status = {
+            s['name']: s for s in client.describe_configuration_recorder_status().get(
+                'ConfigurationRecordersStatus', ())}
+        for recorder in client.describe_configuration_recorders().get(
+                'ConfigurationRecorders', ()):
+            recorder_status = status.get(recorder['name'], {})
+            if not recorder_status.get('recording'):
+                continue
+            # a recorder restarted within the window may have missed changes
+            if recorder_status.get('lastStartTime', since) > since:
+                continue
+            group = recorder.get('recordingGroup', {})
+            if group.get('recordingStrategy', {}).get('useOnly') == (
+                    'EXCLUSION_BY_RESOURCE_TYPES'):
+                excluded = group.get('exclusionByResourceTypes', {}).get('resourceTypes', ())
+                if config_type not in excluded:
+                    return True
+            elif config_type in group.get('resourceTypes', ()):
+                return True
+            elif group.get('allSupported', True) and (
+                    # global iam types are only recorded when included
+                    not config_type.startswith('AWS::IAM::') or
+                    group.get('includeGlobalResourceTypes')):
+                return True
+        return False
+
+    def get_changes(self, since):
+        """Return the ids of resources changed and deleted since a datetime.
+
+        Returns None if config can't be queried for changes, or isn't
+        recording the resource type, as no changes would be indistinguishable
+        from nothing having changed.
+        """
+        client = local_session(self.manager.session_factory).client('config')
+        expr = (
+            "select resourceId, configurationItemStatus "
+            "where resourceType = '{}' and configurationItemCaptureTime >= '{}'").format(
+                self.manager.get_model().config_type,
+                since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'))
+        changed, deleted = set(), set()
+        try:
+            if not self.is_recording(client, since):
+                self.manager.log.info(
+                    "config isn't recording %s changes, fully refreshing", self.manager.type)
+                return None
+            for item in self.select(client, expr):
+                if item.get('configurationItemStatus') in self.deleted_status:
+                    deleted.add(item['resourceId'])
+                else:
+                    changed.add(item['resourceId'])
+        except ClientError as e:
+            self.manager.log.warning(
+                "unable to query config for %s changes: %s", self.manager.type, e)
+            return None
+        return changed, deleted - changed
+
     def augment(self, resources):
         return resources
 
@@ -455,17 +698,21 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
     max_workers = 3
     chunk_size = 20
 
+    # number of resources augmented together when streaming
+    stream_chunk_size = 1000
+
+    # seconds after which incremental snapshots are fully refreshed
+    snapshot_max_age = 24 * 60 * 60
+
+    # seconds of overlap between incremental change windows
+    snapshot_overlap = 15 * 60
+
+    # augment stages selected for the current fetch, None for all
+    augment_stages = None
+
     _generate_arn = None
 
-    retry = staticmethod(
-        get_retry((
-            'TooManyRequestsException',
-            'ThrottlingException',
-            'RequestLimitExceeded',
-            'Throttled',
-            'ThrottledException',
-            'Throttling',
-            'Client.RequestLimitExceeded')))
+    retry = staticmethod(get_retry(THROTTLE_ERRORS))
 
     source_mapping = sources
 
@@ -477,6 +724,24 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
     def source_type(self):
         return self.data.get('source', 'describe')
 
+    @property
+    def streaming(self):
+        return bool(getattr(self.config, 'stream', False)) and hasattr(
+            self.source, 'iter_resources')
+
+    @property
+    def incremental(self):
+        """Whether resources are fetched as changes to a stored snapshot.
+
+        Requires a config resource type whose config resource id is the
+        resource's id, so changed resources can be described by id.
+        """
+        if not getattr(self.config, 'incremental', None) or self.source_type != 'describe':
+            return False
+        model = self.get_model()
+        return bool(
+            getattr(model, 'config_type', None) and not getattr(model, 'config_id', None))
+
     def get_source(self, source_type):
         if source_type in self.source_mapping:
             return self.source_mapping.get(source_type)(self)
@@ -521,11 +786,39 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
             'q': query
         }
 
+    def select_augment_stages(self):
+        """Return the augment stages a policy's filters need, or None for all.
+
+        Stages are only deferred when fetching for a pull mode policy
+        without actions, whose filters all report the resource keys
+        they read. Deferred stages run over the matched resources after
+        filtering, so a policy's output is the same either way.
+        """
+        if not hasattr(self.source, 'get_augment_stages'):
+            return None
+        stages = self.source.get_augment_stages()
+        if not stages or self.data != self.ctx.policy.data:
+            return None
+        if self.data.get('actions') or self.data.get('mode', {}).get(
+                'type', 'pull') != 'pull':
+            return None
+        keys = set()
+        for f in self.filters:
+            fkeys = f.get_resource_keys()
+            if fkeys is None:
+                return None
+            keys.update(fkeys)
+        return {name for name, provides in stages.items() if provides & keys}
+
     def resources(self, query=None, augment=True) -> List[dict]:
         query = self.source.get_query_params(query)
         cache_key = self.get_cache_key(query)
         resources = None
 
+        self.augment_stages = self.select_augment_stages() if augment else None
+        if self.augment_stages is not None:
+            cache_key['augment'] = sorted(self.augment_stages)
+
         with self._cache:
             resources = self._cache.get(cache_key)
             if resources is not None:
@@ -533,6 +826,16 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
                     "%s.%s" % (self.__class__.__module__, self.__class__.__name__),
                     len(resources)))
 
+            if resources is None and self.streaming:
+                return self.stream_resources(query or {}, augment)
+
+            # sources may fill in empty query parameters, ie. ec2 filters
+            if resources is None and augment and not any((query or {}).values()) \
+                    and self.incremental:
+                with self.ctx.tracer.subsegment('resource-fetch'):
+                    resources = self.get_incremental_resources(query or {}, cache_key)
+                self._cache.save(cache_key, resources)
+
             if resources is None:
                 if query is None:
                     query = {}
@@ -547,12 +850,88 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
         resource_count = len(resources)
         with self.ctx.tracer.subsegment('filter'):
             resources = self.filter_resources(resources)
+        resources = self.complete_augment(resources)
 
         # Check if we're out of a policies execution limits.
         if self.data == self.ctx.policy.data:
             self.check_resource_limit(len(resources), resource_count)
         return resources
 
+    def complete_augment(self, resources):
+        """Run the augment stages deferred by filtering over matched resources."""
+        stages, self.augment_stages = self.augment_stages, None
+        if stages is None or not resources:
+            return resources
+        deferred = set(self.source.get_augment_stages()).difference(stages)
+        if not deferred:
+            return resources
+        with self.ctx.tracer.subsegment('resource-augment'):
+            return self.source.complete_augment(resources, deferred)
+
+    def get_incremental_resources(self, query, snapshot_key):
+        """Fetch resources by applying changes since the last run to its snapshot.
+
+        Changes are queried from aws config, with the snapshot's watermark
+        backdated by `snapshot_overlap` to pick up changes config recorded
+        late. Snapshots are fully refreshed when missing, older than
+        `snapshot_max_age`, or when config can't be queried.
+        """
+        store = SnapshotStore(self.config.incremental)
+        now = datetime.now(timezone.utc)
+        snapshot = store.get(snapshot_key)
+
+        changes = None
+        if snapshot is not None and (
+                now - snapshot[0]).total_seconds() < self.snapshot_max_age:
+            changes = ConfigSource(self).get_changes(
+                snapshot[0] - timedelta(seconds=self.snapshot_overlap))
+
+        if changes is None:
+            resources = self.augment(self.source.resources(query))
+        else:
+            changed, deleted = changes
+            model = self.get_model()
+            resources = [
+                r for r in snapshot[1]
+                if r[model.id] not in changed and r[model.id] not in deleted]
+            if changed:
+                resources.extend(self.augment(self.source.get_resources(list(changed))))
+            self.log.debug(
+                "Incremental %s: %d changed %d deleted of %d",
+                self.type, len(changed), len(deleted), len(resources))
+
+        store.save(snapshot_key, now, resources)
+        return resources
+
+    def stream_resources(self, query, augment=True):
+        """Fetch, augment and filter resources as a pipeline of iterators.
+
+        Pages of resources flow through augmentation and per resource
+        filters without the full population being held in memory, set
+        based filters (reduce, resource_count, boolean blocks) materialize
+        the stream. Streamed results are not cached.
+        """
+        population = []
+
+        def count(stream):
+            population.append(0)
+            for r in stream:
+                population[0] += 1
+                yield r
+
+        stream = count(self.source.iter_resources(query))
+        if augment:
+            stream = itertools.chain.from_iterable(
+                self.augment(batch) for batch in chunks(stream, self.stream_chunk_size))
+
+        with self.ctx.tracer.subsegment('resource-stream'):
+            resources = self.filter_resource_stream(stream)
+        resources = self.complete_augment(resources)
+
+        if self.data == self.ctx.policy.data:
+            self.check_resource_limit(len(resources), population and population[0] or 0)
+        return resources
+
     def check_resource_limit(self, selection_count, population_count):
         """Check if policy's execution affects more resources then its limit.
 
@@ -707,6 +1086,9 @@ class MaxResourceLimit:
 class ChildResourceManager(QueryResourceManager):
 
     child_source = 'describe-child'
+    # number of parents whose children are enumerated concurrently,
+    # unless set by the parent_workers config option.
+    parent_workers = 1
 
     @property
     def source_type(self):
@@ -719,9 +1101,11 @@ class ChildResourceManager(QueryResourceManager):
         return self.get_resource_manager(self.resource_type.parent_spec[0])
 
 
-def _batch_augment(manager, model, detail_spec, client, resource_set):
+def _batch_augment(manager, model, detail_spec, client, resource_set, timer=None):
     detail_op, param_name, param_key, detail_path, detail_args = detail_spec
     op = getattr(client, detail_op)
+    if timer is not None:
+        op = timer.wrap(detail_op, op)
     if manager.retry:
         args = (op,)
         op = manager.retry
@@ -734,9 +1118,11 @@ def _batch_augment(manager, model, detail_spec, client, resource_set):
     return response[detail_path]
 
 
-def _scalar_augment(manager, model, detail_spec, client, resource_set):
+def _scalar_augment(manager, model, detail_spec, client, resource_set, timer=None):
     detail_op, param_name, param_key, detail_path = detail_spec
     op = getattr(client, detail_op)
+    if timer is not None:
+        op = timer.wrap(detail_op, op)
     if manager.retry:
         args = (op,)
         op = manager.retry
@@ -0,0 +1,147 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""Adaptive client side rate limiting of aws api calls.
+
+Calls are paced by a process wide token bucket per account, region,
+service and operation. Buckets start out unlimited, the first throttling
+error seen on the wire sets a bucket's rate to a fraction of its observed
+call rate, which is then cut on further throttles and raised additively
+as calls succeed (AIMD).
+"""
+import threading
+import time
+
+
+THROTTLE_ERRORS = (
+    'TooManyRequestsException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'Throttled',
+    'ThrottledException',
+    'Throttling',
+    'Client.RequestLimitExceeded')
+
+
+class TokenBucket:
+
+    # multiplicative decrease on throttle
+    decrease = 0.5
+    # bounds for the rate, in calls per second
+    min_rate = 0.5
+    max_rate = 1000.0
+    # only cut the rate once per interval, as throttles arrive in bursts
+    decrease_interval = 1.0
+
+    def __init__(self):
+        self.rate = None
+        self.tokens = 0.0
+        self.lock = threading.Lock()
+        self.last = self.window = self.last_decrease = time.monotonic()
+        self.window_calls = 0
+        self.measured = 0.0
+
+    def acquire(self):
+        """Take a token, sleeping until one is available.
+
+        Tokens are reserved, a caller arriving when the bucket is empty
+        takes a token on credit and sleeps off the deficit.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.window_calls += 1
+            if now - self.window >= 1:
+                self.measured = self.window_calls / (now - self.window)
+                self.window, self.window_calls = now, 0
+            if self.rate is None:
+                return 0
+            self.tokens = min(
+                max(1.0, self.rate), self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            delay = self.tokens < 0 and -self.tokens / self.rate or 0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def throttled(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.rate is not None and now - self.last_decrease < self.decrease_interval:
+                return
+            if self.rate is None:
+                observed = max(
+                    self.measured, self.window_calls / max(now - self.window, 1))
+                self.last = now
+                self.rate = observed
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0)
+            self.last_decrease = now
+
+    def succeeded(self):
+        with self.lock:
+            if self.rate is not None:
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+
+class RateLimiter:
+    """Registry of token buckets, attached to sessions via botocore events."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.setdefault(key, TokenBucket())
+        return bucket
+
+    def reset(self):
+        with self.lock:
+            self.buckets = {}
+
+    @staticmethod
+    def get_account_key(session_factory):
+        return getattr(session_factory, 'assume_role', None) or getattr(
+            session_factory, 'profile', None) or ''
+
+    def get_workers(self, session_factory, region, service, default):
+        """Size a worker pool for calls to a service by its available budget.
+
+        Returns default unless a call to the service has been throttled,
+        in which case the pool is bounded by the lowest operation rate.
+        """
+        prefix = (self.get_account_key(session_factory), region, service)
+        rates = [b.rate for k, b in list(self.buckets.items())
+                 if k[:3] == prefix and b.rate is not None]
+        if not rates:
+            return default
+        return max(1, min(default, int(min(rates))))
+
+    def register(self, session, account):
+        """Pace api calls of clients subsequently created from session."""
+        def get_key(model, context):
+            return (account, context.get('client_region'),
+                    model.service_model.service_name, model.name)
+
+        def before_call(model, context, **kw):
+            self.get_bucket(get_key(model, context)).acquire()
+
+        def after_call(model, parsed, context, **kw):
+            if parsed is not None and 'Error' not in parsed:
+                self.get_bucket(get_key(model, context)).succeeded()
+
+        def needs_retry(operation, response=None, request_dict=None, **kw):
+            if response is None or request_dict is None:
+                return
+            if response[1].get('Error', {}).get('Code') in THROTTLE_ERRORS:
+                self.get_bucket(get_key(operation, request_dict['context'])).throttled()
+
+        events = session.events
+        events.register('before-call', before_call, unique_id='c7n-ratelimit-before')
+        events.register('after-call', after_call, unique_id='c7n-ratelimit-after')
+        events.register_first('needs-retry', needs_retry, unique_id='c7n-ratelimit-retry')
+
+
+limiter = RateLimiter()
@@ -8,7 +8,7 @@ from c7n.provider import clouds
 LOADED = set()
 
 
-def load_resources(resource_types=('*',)):
+def load_resources(resource_types=('*',), element_types=()):
     pmap = {}
     for r in resource_types:
         parts = r.split('.', 1)
@@ -22,12 +22,26 @@ def load_resources(resource_types=('*',)):
     for pname, p in clouds.items():
         if '*' in pmap:
             p.get_resource_types(('*',))
+            p.load_elements(('*',))
         elif pname in pmap:
             _, not_found = p.get_resource_types(pmap[pname])
             missing.extend(not_found)
+            p.load_elements('*' in pmap[pname] and ('*',) or element_types)
     return missing
 
 
+def load_element(element_type):
+    """Load the providers of a shared filter, action or mode on first reference.
+
+    Returns True if any modules were loaded.
+    """
+    loaded = False
+    for pname, p in clouds.items():
+        if element_type in p.element_map and p.load_elements((element_type,)):
+            loaded = True
+    return loaded
+
+
 def should_load_provider(name, provider_types, no_wild=False):
     global LOADED
     if (name not in LOADED and
@@ -62,12 +76,10 @@ def load_available(resources=True):
 def load_providers(provider_types):
     global LOADED
 
-    # Even though we're lazy loading resources we still need to import
-    # those that are making available generic filters/actions
+    # Modules making available generic filters/actions on other resources
+    # are loaded on reference, see Provider.element_map.
     if should_load_provider('aws', provider_types):
-        import c7n.resources.securityhub
-        import c7n.resources.sfn
-        import c7n.resources.ssm # NOQA
+        import c7n.resources.aws # NOQA
 
     if should_load_provider('awscc', provider_types):
         from c7n_awscc.entry import initialize_awscc
@@ -722,6 +722,22 @@ class S3Output(BlobOutput):
                 'ServerSideEncryption': 'AES256'})
 
 
+# Modules registering filters, actions and execution modes across
+# resource types, imported when a policy references one of these names.
+# Keep in sync with the registrations these modules make outside their
+# own resource classes.
+ElementMap = {
+    "finding": "c7n.resources.securityhub",
+    "hub-action": "c7n.resources.securityhub",
+    "hub-finding": "c7n.resources.securityhub",
+    "invoke-sfn": "c7n.resources.sfn",
+    "ops-item": "c7n.resources.ssm",
+    "post-finding": "c7n.resources.securityhub",
+    "post-item": "c7n.resources.ssm",
+    "send-command": "c7n.resources.ssm",
+}
+
+
 @clouds.register('aws')
 class AWS(Provider):
 
@@ -731,6 +747,8 @@ class AWS(Provider):
     resources = PluginRegistry('resources')
     # import paths for resources
     resource_map = ResourceMap
+    # import paths for filters and actions shared across resources
+    element_map = ElementMap
 
     def initialize(self, options):
         """
@@ -36,9 +36,17 @@ ErrAccessDenied = "AccessDeniedException"
 
 class DescribeLambda(query.DescribeSource):
 
+    def get_augment_stages(self):
+        return {'tags': {'Tags'}}
+
     def augment(self, resources):
-        return universal_augment(
-            self.manager, super(DescribeLambda, self).augment(resources))
+        resources = super(DescribeLambda, self).augment(resources)
+        if not self.run_augment_stage('tags'):
+            return resources
+        return universal_augment(self.manager, resources)
+
+    def complete_augment(self, resources, stages):
+        return universal_augment(self.manager, resources)
 
     def get_resources(self, ids):
         client = local_session(self.manager.session_factory).client('lambda')
@@ -32,7 +32,15 @@ filters.register('shield-metrics', ShieldMetrics)
 
 class DescribeELB(DescribeSource):
 
+    def get_augment_stages(self):
+        return {'tags': {'Tags'}}
+
     def augment(self, resources):
+        if not self.run_augment_stage('tags'):
+            return resources
+        return tags.universal_augment(self.manager, resources)
+
+    def complete_augment(self, resources, stages):
         return tags.universal_augment(self.manager, resources)
 
 
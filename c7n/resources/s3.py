@@ -58,6 +58,7 @@ from .aws import shape_validate
 from c7n.filters.policystatement import HasStatementFilter
 from c7n.manager import resources
 from c7n.output import NullBlobOutput
+from c7n.ratelimit import limiter
 from c7n import query
 from c7n.resources.securityhub import PostFinding
 from c7n.tags import RemoveTag, Tag, TagActionFilter, TagDelayedAction
@@ -79,12 +80,28 @@ MAX_COPY_SIZE = 1024 * 1024 * 1024 * 2
 
 class DescribeS3(query.DescribeSource):
 
+    def get_augment_stages(self):
+        # location is always fetched, it determines the bucket's region
+        return {m[1]: {m[1]} for m in S3_AUGMENT_TABLE if m[1] != 'Location'}
+
     def augment(self, buckets):
-        with self.manager.executor_factory(
-                max_workers=min((10, len(buckets) + 1))) as w:
+        return self.assemble_buckets(buckets, [
+            m for m in S3_AUGMENT_TABLE
+            if m[1] == 'Location' or self.run_augment_stage(m[1])])
+
+    def complete_augment(self, buckets, stages):
+        return self.assemble_buckets(
+            buckets, [m for m in S3_AUGMENT_TABLE if m[1] in stages])
+
+    def assemble_buckets(self, buckets, methods):
+        max_workers = limiter.get_workers(
+            self.manager.session_factory, self.manager.config.region, 's3',
+            min((10, len(buckets) + 1)))
+        with self.manager.executor_factory(max_workers=max_workers) as w:
             results = w.map(
                 assemble_bucket,
-                zip(itertools.repeat(self.manager.session_factory), buckets))
+                zip(itertools.repeat(self.manager.session_factory), buckets,
+                    itertools.repeat(methods)))
             results = list(filter(None, results))
             return results
 
@@ -436,12 +453,15 @@ def assemble_bucket(item):
 
     TODO: Refactor this, the logic here feels quite muddled.
     """
-    factory, b = item
+    factory, b = item[:2]
     s = factory()
     c = s.client('s3')
     # Bucket Location, Current Client Location, Default Location
     b_location = c_location = location = "us-east-1"
-    methods = list(S3_AUGMENT_TABLE)
+    methods = list(len(item) > 2 and item[2] or S3_AUGMENT_TABLE)
+    # location already known from an earlier pass
+    if 'Location' in b and all(m[1] != 'Location' for m in methods):
+        c = bucket_client(s, b)
     for minfo in methods:
         m, k, default, select = minfo[:4]
         try:
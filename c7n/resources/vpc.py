@@ -1,5 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import bisect
 import itertools
 import zlib
 import re
@@ -944,6 +945,7 @@ class SecurityGroupPatch:
 class SGUsage(Filter):
 
     nics = ()
+    index = None
 
     def get_permissions(self):
         return list(itertools.chain(
@@ -978,10 +980,19 @@ class SGUsage(Filter):
             ("batch", self.get_batch_sgs),
         )
 
+    def get_population(self, resource_type, augment=True):
+        if self.index is None:
+            self.index = net_filters.SecurityGroupReferenceIndex.get_index(self.manager)
+        return self.index.resources(self.manager, resource_type, augment)
+
     def scan_groups(self):
+        self.index = net_filters.SecurityGroupReferenceIndex.get_index(self.manager)
+        scanners = self.get_scanners()
+        with self.manager.executor_factory(max_workers=max(1, len(scanners))) as w:
+            results = list(w.map(lambda s: s[1](), scanners))
+
         used = set()
-        for kind, scanner in self.get_scanners():
-            sg_ids = scanner()
+        for (kind, scanner), sg_ids in zip(scanners, results):
             new_refs = sg_ids.difference(used)
             used = used.union(sg_ids)
             self.log.debug(
@@ -994,7 +1005,7 @@ class SGUsage(Filter):
         # Note assuming we also have launch config garbage collection
         # enabled.
         sg_ids = set()
-        for cfg in self.manager.get_resource_manager('launch-config').resources():
+        for cfg in self.get_population('launch-config'):
             for g in cfg['SecurityGroups']:
                 sg_ids.add(g)
             for g in cfg['ClassicLinkVPCSecurityGroups']:
@@ -1003,7 +1014,7 @@ class SGUsage(Filter):
 
     def get_lambda_sgs(self):
         sg_ids = set()
-        for func in self.manager.get_resource_manager('lambda').resources(augment=False):
+        for func in self.get_population('lambda', augment=False):
             if 'VpcConfig' not in func:
                 continue
             for g in func['VpcConfig']['SecurityGroupIds']:
@@ -1012,7 +1023,7 @@ class SGUsage(Filter):
 
     def get_eni_sgs(self):
         sg_ids = set()
-        self.nics = self.manager.get_resource_manager('eni').resources()
+        self.nics = self.get_population('eni')
         for nic in self.nics:
             for g in nic['Groups']:
                 sg_ids.add(g['GroupId'])
@@ -1020,13 +1031,13 @@ class SGUsage(Filter):
 
     def get_codebuild_sgs(self):
         sg_ids = set()
-        for cb in self.manager.get_resource_manager('codebuild').resources():
+        for cb in self.get_population('codebuild'):
             sg_ids |= set(cb.get('vpcConfig', {}).get('securityGroupIds', []))
         return sg_ids
 
     def get_sg_refs(self):
         sg_ids = set()
-        for sg in self.manager.get_resource_manager('security-group').resources():
+        for sg in self.get_population('security-group'):
             for perm_type in ('IpPermissions', 'IpPermissionsEgress'):
                 for p in sg.get(perm_type, []):
                     for g in p.get('UserIdGroupPairs', ()):
@@ -1039,8 +1050,7 @@ class SGUsage(Filter):
         sg_ids = set()
         expr = jmespath_compile(
             'EcsParameters.NetworkConfiguration.awsvpcConfiguration.SecurityGroups[]')
-        for rule in self.manager.get_resource_manager(
-                'event-rule-target').resources(augment=False):
+        for rule in self.get_population('event-rule-target', augment=False):
             ids = expr.search(rule)
             if ids:
                 sg_ids.update(ids)
@@ -1048,7 +1058,7 @@ class SGUsage(Filter):
 
     def get_batch_sgs(self):
         expr = jmespath_compile('[].computeResources.securityGroupIds[]')
-        resources = self.manager.get_resource_manager('aws.batch-compute').resources(augment=False)
+        resources = self.get_population('aws.batch-compute', augment=False)
         return set(expr.search(resources) or [])
 
 
@@ -1449,6 +1459,12 @@ class SGPermission(Filter):
         self.ports = 'Ports' in self.data and self.data['Ports'] or ()
         self.only_ports = (
             'OnlyPorts' in self.data and self.data['OnlyPorts'] or ())
+        # rule evaluations are memoized for the run, as rules across a
+        # large set of groups mostly repeat the same port ranges and cidrs.
+        self.port_index = sorted(self.ports)
+        self.port_matches = {}
+        self.cidr_matchers = {}
+        self.description_filter = None
         for f in fattrs:
             fv = self.data.get(f)
             if isinstance(fv, dict):
@@ -1461,32 +1477,33 @@ class SGPermission(Filter):
         return super(SGPermission, self).process(resources, event)
 
     def process_ports(self, perm):
+        if 'FromPort' not in perm or 'ToPort' not in perm:
+            return None
+        key = (perm['FromPort'], perm['ToPort'])
+        if key not in self.port_matches:
+            self.port_matches[key] = self._match_port_range(*key)
+        return self.port_matches[key]
+
+    def _match_port_range(self, from_port, to_port):
         found = None
-        if 'FromPort' in perm and 'ToPort' in perm:
-            for port in self.ports:
-                if port >= perm['FromPort'] and port <= perm['ToPort']:
-                    found = True
-                    break
-                found = False
-            only_found = False
-            for port in self.only_ports:
-                if port == perm['FromPort'] and port == perm['ToPort']:
-                    only_found = True
-            if self.only_ports and not only_found:
-                found = found is None or found and True or False
-            if self.only_ports and only_found:
+        if self.port_index:
+            # any of the ports within the rule's range
+            idx = bisect.bisect_left(self.port_index, from_port)
+            found = idx < len(self.port_index) and self.port_index[idx] <= to_port
+        if self.only_ports:
+            only_found = from_port == to_port and from_port in self.only_ports
+            if only_found:
                 found = False
+            else:
+                found = found is None or found
         return found
 
-    def _process_cidr(self, cidr_key, cidr_type, range_type, perm):
-
-        found = None
-        ip_perms = perm.get(range_type, [])
-        if not ip_perms:
-            return False
+    def get_cidr_matcher(self, cidr_key, cidr_type):
+        matcher = self.cidr_matchers.get(cidr_key)
+        if matcher is not None:
+            return matcher
 
         match_range = self.data[cidr_key]
-
         if isinstance(match_range, dict):
             match_range['key'] = cidr_type
         else:
@@ -1494,14 +1511,24 @@ class SGPermission(Filter):
 
         vf = ValueFilter(match_range, self.manager)
         vf.annotate = False
+        matches = {}
 
-        for ip_range in ip_perms:
-            found = vf(ip_range)
-            if found:
-                break
-            else:
-                found = False
-        return found
+        def matcher(ip_range):
+            cidr = ip_range.get(cidr_type)
+            if cidr not in matches:
+                matches[cidr] = bool(vf(ip_range))
+            return matches[cidr]
+
+        self.cidr_matchers[cidr_key] = matcher
+        return matcher
+
+    def _process_cidr(self, cidr_key, cidr_type, range_type, perm):
+        ip_perms = perm.get(range_type, [])
+        if not ip_perms:
+            return False
+
+        matcher = self.get_cidr_matcher(cidr_key, cidr_type)
+        return any(matcher(ip_range) for ip_range in ip_perms)
 
     def process_cidrs(self, perm):
         found_v6 = found_v4 = None
@@ -1519,11 +1546,12 @@ class SGPermission(Filter):
         if 'Description' not in self.data:
             return None
 
-        d = dict(self.data['Description'])
-        d['key'] = 'Description'
-
-        vf = ValueFilter(d, self.manager)
-        vf.annotate = False
+        vf = self.description_filter
+        if vf is None:
+            d = dict(self.data['Description'])
+            d['key'] = 'Description'
+            vf = self.description_filter = ValueFilter(d, self.manager)
+            vf.annotate = False
 
         for k in ('Ipv6Ranges', 'IpRanges', 'UserIdGroupPairs', 'PrefixListIds'):
             if k not in perm or not perm[k]:
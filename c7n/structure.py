@@ -102,3 +102,26 @@ class StructureParser:
                 rtype = 'aws.%s' % rtype
             resources.add(rtype)
         return resources
+
+    def get_element_types(self, data):
+        """Return the filter, action and mode type names referenced by policies."""
+        elements = set()
+
+        def walk(value):
+            if isinstance(value, dict):
+                if isinstance(value.get('type'), str):
+                    elements.add(value['type'])
+                for v in value.values():
+                    walk(v)
+            elif isinstance(value, list):
+                for v in value:
+                    if isinstance(v, str):
+                        elements.add(v)
+                    else:
+                        walk(v)
+
+        for p in data.get('policies', []):
+            walk(p.get('filters', []))
+            walk(p.get('actions', []))
+            walk(p.get('mode', {}))
+        return elements
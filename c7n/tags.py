@@ -78,16 +78,18 @@ def universal_augment(self, resources):
         self.session_factory).client('resourcegroupstaggingapi', region_name=region)
 
     # Lazy for non circular :-(
-    from c7n.query import RetryPageIterator
+    from c7n.query import RetryPageIterator, CallTimer
+    from c7n.ratelimit import limiter
     paginator = client.get_paginator('get_resources')
     paginator.PAGE_ITERATOR_CLS = RetryPageIterator
 
     rfetch = [r for r in resources if 'Tags' not in r]
+    timer = CallTimer()
+    get_resources = timer.wrap('get_resources', client.get_resources)
 
-    for arn_resource_set in utils.chunks(
-            zip(self.get_arns(rfetch), rfetch), 100):
+    def fetch_tags(arn_resource_set):
         arn_resource_map = dict(arn_resource_set)
-        resource_tag_results = client.get_resources(
+        resource_tag_results = get_resources(
             ResourceARNList=list(arn_resource_map.keys())).get(
                 'ResourceTagMappingList', ())
         resource_tag_map = {
@@ -95,6 +97,12 @@ def universal_augment(self, resources):
         for arn, r in arn_resource_map.items():
             r['Tags'] = resource_tag_map.get(arn, [])
 
+    # the api accepts up to 100 arns per call
+    max_workers = limiter.get_workers(
+        self.session_factory, region, 'resourcegroupstaggingapi', self.max_workers)
+    with self.executor_factory(max_workers=max_workers) as w:
+        list(w.map(fetch_tags, utils.chunks(zip(self.get_arns(rfetch), rfetch), 100)))
+    timer.report(self)
     return resources
 
 
@@ -269,6 +277,9 @@ class TagActionFilter(Filter):
         op={'type': 'string'})
     schema_alias = True
 
+    def get_resource_keys(self):
+        return {'Tags'}
+
     def validate(self):
         op = self.data.get('op')
         if self.manager and op not in self.manager.action_registry.keys():
@@ -289,12 +300,7 @@ class TagActionFilter(Filter):
         skew_hours = self.data.get('skew_hours', 0)
         tz = tzutil.gettz(Time.TZ_ALIASES.get(self.data.get('tz', 'utc')))
 
-        v = None
-        for n in i.get('Tags', ()):
-            if n['Key'] == tag:
-                v = n['Value']
-                break
-
+        v = utils.get_tag_map(i).get(tag)
         if v is None:
             return False
         if ':' not in v or '@' not in v:
@@ -346,13 +352,15 @@ class TagCountFilter(Filter):
         op={'enum': list(OPERATORS.keys())})
     schema_alias = True
 
+    def get_resource_keys(self):
+        return {'Tags'}
+
     def __call__(self, i):
         count = self.data.get('count', 10)
         op_name = self.data.get('op', 'gte')
         op = OPERATORS.get(op_name)
         tag_count = len([
-            t['Key'] for t in i.get('Tags', [])
-            if not t['Key'].startswith('aws:')])
+            k for k in utils.get_tag_map(i) if not k.startswith('aws:')])
         return op(tag_count, count)
 
 
@@ -1,7 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import copy
-from collections import UserString
+from collections import Counter, UserString
 from datetime import datetime, timedelta
 from dateutil.tz import tzutc
 import json
@@ -349,6 +349,69 @@ def annotation(i, k):
     return i.get(k, ())
 
 
+class TagList(list):
+    """A resource's aws style ``Tags`` list with a cached key to value index.
+
+    The index is built on first lookup and discarded whenever the list
+    is modified, so tag actions that update a resource's tags in place
+    are reflected in subsequent lookups.
+    """
+
+    _index = _lower_index = None
+
+    def get_index(self, lower=False):
+        if self._index is None:
+            index = {}
+            lower_index = {}
+            # first occurrence of a key wins, matching a linear scan
+            for t in reversed(self):
+                k = t.get('Key')
+                index[k] = t.get('Value')
+                if isinstance(k, str):
+                    lower_index[k.lower()] = t.get('Value')
+            self._index, self._lower_index = index, lower_index
+        return lower and self._lower_index or self._index
+
+    def invalidate(self):
+        self._index = self._lower_index = None
+
+    def __reduce_ex__(self, protocol):
+        # don't persist the index into caches
+        return (self.__class__, (list(self),))
+
+
+def _invalidating(name):
+    method = getattr(list, name)
+
+    def mutate(self, *args, **kw):
+        self.invalidate()
+        return method(self, *args, **kw)
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort',
+              'reverse', '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(TagList, _name, _invalidating(_name))
+
+
+def get_tag_map(resource, lower=False):
+    """Return a mapping of tag key to value for a resource's ``Tags``.
+
+    The mapping is cached on the resource's tag list, making repeated tag
+    lookups across filters constant time. Keys are lower cased with
+    ``lower=True``, the first tag for a given key takes precedence.
+    """
+    tags = resource.get('Tags')
+    if not tags:
+        return {}
+    if type(tags) is list:
+        tags = resource['Tags'] = TagList(tags)
+    elif not isinstance(tags, TagList):
+        return TagList(tags).get_index(lower)
+    return tags.get_index(lower)
+
+
 def set_annotation(i, k, v):
     """
     >>> x = {}
@@ -483,6 +546,50 @@ def backoff_delays(start, stop, factor=2.0, jitter=False):
         cur = cur * factor
 
 
+class CallStats:
+    """Thread safe call counts, errors and elapsed time by key."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.errors = Counter()
+        self.elapsed = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, key, elapsed, error=False):
+        with self.lock:
+            self.calls[key] += 1
+            self.elapsed[key] += elapsed
+            if error:
+                self.errors[key] += 1
+
+    def wrap(self, key, op):
+        """Return op recording its calls under key, raising counts as an error."""
+        def timed(*args, **kw):
+            t = time.time()
+            error = True
+            try:
+                result = op(*args, **kw)
+                error = False
+                return result
+            finally:
+                self.record(key, time.time() - t, error)
+        return timed
+
+    def report(self, metrics, name, dimension=None):
+        """Put the latency and errors of each key as policy metrics.
+
+        Metrics are named `<name>Latency` and `<name>Errors`, with the key
+        as the value of the dimension if given.
+        """
+        for key in sorted(self.calls):
+            dimensions = dimension and {dimension: key} or {}
+            metrics.put_metric(
+                '%sLatency' % name, self.elapsed[key] / self.calls[key], 'Seconds',
+                Scope='Policy', **dimensions)
+            metrics.put_metric(
+                '%sErrors' % name, self.errors[key], 'Count', Scope='Policy', **dimensions)
+
+
 def parse_cidr(value):
     """Process cidr ranges."""
     if isinstance(value, list) or isinstance(value, set):
@@ -1,6 +1,11 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import io
+import json
+
 from botocore.exceptions import ClientError
+from c7n import utils
+from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
 from c7n.actions import Action, ActionRegistry
 from .common import BaseTest
@@ -51,3 +56,55 @@ class ActionRegistryTest(BaseTest):
         self.assertRaises(
             PolicyValidationError, ActionRegistry("test.actions").factory, "foo", None
         )
+
+
+class LambdaInvokeTest(BaseTest):
+
+    def get_action(self):
+        p = self.load_policy({
+            "name": "invoke",
+            "resource": "ec2",
+            "actions": [{"type": "invoke-lambda", "function": "process",
+                         "batch_size": 3, "concurrency": 2}]})
+        return p, p.resource_manager.actions[0]
+
+    def test_get_batches(self):
+        action = self.get_action()[1]
+        resources = [{"Id": "i-%d" % i, "Data": "x" * (i * 10)} for i in range(6)]
+        sizes = [len(utils.dumps(r).encode('utf8')) + 1 for r in resources]
+        limit = sum(sizes[:3])
+
+        # packed by count and serialized size
+        batches = list(action.get_batches(resources, 3, limit))
+        self.assertEqual([len(b) for b in batches], [3, 1, 1, 1])
+        self.assertTrue(
+            all(sum(len(r.encode('utf8')) + 1 for r in b) <= limit for b in batches))
+
+        # oversized resources are sent on their own
+        batches = list(action.get_batches(resources, 3, sizes[0] - 1))
+        self.assertEqual([len(b) for b in batches], [1] * 6)
+
+    def test_invoke_process(self):
+        p, action = self.get_action()
+        payloads = []
+
+        class Client:
+            def invoke(self, **params):
+                payloads.append(json.loads(params["Payload"]))
+                return {"Payload": io.BytesIO(b"ok")}
+
+        self.patch(utils, "local_session", lambda factory: Bag(client=lambda *a, **kw: Client()))
+        self.patch(utils, "get_account_alias_from_sts", lambda session: "dev")
+        metrics = []
+        self.patch(
+            p.resource_manager.ctx.metrics, "put_metric",
+            lambda key, value, unit, **dims: metrics.append(key))
+
+        results = action.process([{"Id": "i-%d" % i} for i in range(7)])
+        self.assertEqual([r["Payload"] for r in results], ["ok"] * 3)
+        self.assertEqual(
+            sorted(r["Id"] for p in payloads for r in p["resources"]),
+            sorted("i-%d" % i for i in range(7)))
+        self.assertEqual(payloads[0]["account"], "dev")
+        self.assertEqual(payloads[0]["action"]["function"], "process")
+        self.assertEqual(metrics, ["InvokeLatency", "InvokeErrors"])
@@ -99,3 +99,92 @@ def test_sqlkv_convert(tmp_path):
     kv.close()
     with open(cache_path, 'rb') as fh:
         assert fh.read(15) == b"SQLite format 3"
+
+
+def test_shared_factory(tmp_path):
+    test_config = config.Bag(cache="shared:%s" % (tmp_path / "shared.db"), cache_period=5)
+    kv = cache.factory(test_config)
+    assert isinstance(kv, cache.SharedSqlKvCache)
+    assert kv.cache_path == str(tmp_path / "shared.db")
+
+
+def test_shared_get_set(tmp_path):
+    kv = cache.SharedSqlKvCache(
+        config.Bag(cache="shared:%s" % (tmp_path / "cache" / "shared.db"), cache_period=60))
+    with kv:
+        k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+        v1 = [{'id': 'a'}, {'id': 'b'}]
+        assert kv.get(k1) is None
+        kv.save(k1, v1)
+        assert kv.get(k1) == v1
+        assert kv.size() > 0
+
+    # visible to other connections to the same store
+    with cache.SharedSqlKvCache(kv.config) as kv2:
+        assert kv2.get(k1) == v1
+
+
+def test_shared_ttl(tmp_path):
+    kv = cache.SharedSqlKvCache(
+        config.Bag(cache="shared:%s" % (tmp_path / "shared.db"), cache_period=60))
+    kv.load()
+    kv.save('expired', 'a', ttl=-1)
+    kv.save('fresh', 'b', ttl=1)
+    assert kv.get('expired') is None
+    assert kv.get('fresh') == 'b'
+    kv.close()
+
+
+def test_shared_lru_eviction(tmp_path):
+    kv = cache.SharedSqlKvCache(
+        config.Bag(cache="shared:%s" % (tmp_path / "shared.db"), cache_period=60))
+    kv.access_resolution = -1
+    kv.load()
+    kv.save('a', os.urandom(512))
+    kv.save('b', os.urandom(512))
+    assert kv.get('a') is not None
+    kv.max_size = 1200
+    kv.save('c', os.urandom(512))
+    assert kv.get('b') is None
+    assert kv.get('a') is not None
+    assert kv.get('c') is not None
+    kv.close()
+
+
+def test_shared_access_resolution(tmp_path):
+    kv = cache.SharedSqlKvCache(
+        config.Bag(cache="shared:%s" % (tmp_path / "shared.db"), cache_period=60))
+    kv.load()
+    kv.save('a', 'value')
+
+    def accessed():
+        return kv.conn.execute('select accessed from c7n_shared_cache').fetchone()[0]
+
+    saved = accessed()
+    assert kv.get('a') == 'value'
+    assert accessed() == saved
+    kv.access_resolution = -1
+    assert kv.get('a') == 'value'
+    assert accessed() > saved
+    kv.close()
+
+
+def test_shared_max_size(tmp_path):
+    kv = cache.SharedSqlKvCache(config.Bag(
+        cache="shared:%s" % (tmp_path / "shared.db"), cache_period=60, cache_max_size=2))
+    assert kv.max_size == 2 * 1024 * 1024
+    kv = cache.SharedSqlKvCache(config.Bag(
+        cache="shared:%s" % (tmp_path / "shared.db"), cache_period=60))
+    assert kv.max_size == cache.SharedSqlKvCache.max_size
+
+
+def test_shared_reconnect_after_fork(tmp_path):
+    kv = cache.SharedSqlKvCache(
+        config.Bag(cache="shared:%s" % (tmp_path / "shared.db"), cache_period=60))
+    kv.load()
+    conn = kv.conn
+    kv.pid = -1
+    kv.load()
+    assert kv.conn is not conn
+    conn.close()
+    kv.close()
@@ -1,11 +1,15 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import json
+import logging
 import os
 import sys
 import argparse
+import threading
+import time
 
 from argparse import ArgumentTypeError
+from collections import Counter
 from datetime import datetime, timedelta
 
 from c7n import cli, version, commands
@@ -591,6 +595,93 @@ class RunTest(CliTest):
             ["custodian", "run", "-s", temp_dir, "--debug", yaml_file], CustomError
         )
 
+    def test_parallel(self):
+        from c7n.policy import Policy
+
+        lock = threading.Lock()
+        active = Counter()
+        peak = Counter()
+        calls = []
+
+        def run_policy(p):
+            region = p.options.region
+            with lock:
+                calls.append(p.name)
+                active[region] += 1
+                peak[region] = max(peak[region], active[region])
+            time.sleep(0.05)
+            with lock:
+                active[region] -= 1
+            if p.name.startswith('error'):
+                raise ValueError(p.name)
+            return []
+
+        self.patch(Policy, "__call__", run_policy)
+        self.patch(commands, "REGION_CONCURRENCY", 1)
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file({
+            "policies": [
+                {"name": "error-%d" % i if i in (1, 3) else "ok-%d" % i,
+                 "resource": "sqs"} for i in range(5)]})
+
+        output = self.capture_logging("custodian.commands", level=logging.ERROR)
+        self.run_and_expect_failure(
+            ["custodian", "run", "--parallel", "4", "--cache-period", "0",
+             "-r", "us-east-1", "-r", "us-west-2", "-s", temp_dir, yaml_file],
+            2)
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(peak, {"us-east-1": 1, "us-west-2": 1})
+        self.assertIn(
+            "The following policies had errors while executing\n"
+            " - error-1\n - error-3\n - error-1\n - error-3", output.getvalue())
+
+    def test_parallel_regions(self):
+        from c7n.policy import Policy
+
+        lock = threading.Lock()
+        threads = {}
+        calls = []
+
+        def run_policy(p):
+            with lock:
+                calls.append((p.options.region, p.name))
+                threads.setdefault(p.options.region, set()).add(threading.get_ident())
+            time.sleep(0.01)
+            if p.name == 'error':
+                raise ValueError(p.name)
+            return [{}]
+
+        self.patch(Policy, "__call__", run_policy)
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file({
+            "policies": [{"name": name, "resource": "sqs"}
+                         for name in ("ok-1", "error", "ok-2")]})
+
+        output = self.capture_logging("custodian.commands", level=logging.INFO)
+        self.run_and_expect_failure(
+            ["custodian", "run", "--parallel-regions", "2", "--cache-period", "0",
+             "-r", "us-east-1", "-r", "us-west-2", "-s", temp_dir, yaml_file],
+            2)
+        for region in ("us-east-1", "us-west-2"):
+            self.assertEqual(
+                [name for r, name in calls if r == region], ["ok-1", "error", "ok-2"])
+            self.assertEqual(len(threads[region]), 1)
+        self.assertIn(
+            "region:us-west-2 policies:3 errors:1 resources:2", output.getvalue())
+        self.assertIn(
+            "regions:2 policies:6 errors:2 resources:4", output.getvalue())
+
+    def test_parallel_options_exclusive(self):
+        yaml_file = self.write_policy_file(
+            {"policies": [{"name": "ok", "resource": "sqs"}]})
+        _, err = self.run_and_expect_failure(
+            ["custodian", "run", "--parallel", "2", "--parallel-regions", "2",
+             "-s", self.get_temp_dir(), yaml_file],
+            2)
+        self.assertIn("not allowed with argument --parallel", err)
+
     def test_session_policy(self):
         parser = argparse.ArgumentParser()
         parser.add_argument('--session-policy', action=LoadSessionPolicyJson)
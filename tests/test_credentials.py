@@ -1,6 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+from datetime import datetime, timedelta, timezone
 import os
+from unittest import mock
 from botocore.exceptions import ClientError
 import placebo
 
@@ -123,3 +125,76 @@ class Credential(BaseTest):
         client = local_session(factory).client('ec2')
         self.assertTrue(
             'check-ec2' in client._client_config.user_agent)
+
+
+class CredentialCacheTest(BaseTest):
+
+    def get_credentials(self, expiry):
+        return dict(
+            access_key='AKIA', secret_key='secret', token='token',
+            expiry_time=expiry.isoformat())
+
+    def test_credential_cache(self):
+        path = self.get_temp_dir()
+        cache = credentials.CredentialCache(path)
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            return self.get_credentials(
+                datetime.now(timezone.utc) + timedelta(hours=1))
+
+        key = cache.get_key('arn:aws:iam::123456789012:role/c7n', 'c7n', None, None, 'AKIA')
+        self.assertEqual(cache.get(key, refresh)['access_key'], 'AKIA')
+        self.assertEqual(cache.get(key, refresh)['access_key'], 'AKIA')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            os.stat(os.path.join(path, '%s.json' % key)).st_mode & 0o777, 0o600)
+
+        # another process reads the credentials from disk
+        other = credentials.CredentialCache(path)
+        other.get(key, refresh)
+        self.assertEqual(len(calls), 1)
+
+    def test_credential_cache_refresh_ahead(self):
+        cache = credentials.CredentialCache(self.get_temp_dir())
+        expiring = self.get_credentials(
+            datetime.now(timezone.utc) + timedelta(minutes=10))
+        cache.write('key', expiring)
+        fresh = self.get_credentials(
+            datetime.now(timezone.utc) + timedelta(hours=1))
+        self.assertEqual(cache.get('key', lambda: fresh), fresh)
+        self.assertEqual(cache.read('key'), fresh)
+
+    def test_credential_cache_permissions(self):
+        path = self.get_temp_dir()
+        os.chmod(path, 0o755)
+        credentials.CredentialCache(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+
+        with mock.patch.object(credentials.os, 'getuid', return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                credentials.CredentialCache(path)
+
+    def test_credential_cache_clear(self):
+        path = self.get_temp_dir()
+        cache = credentials.CredentialCache(path)
+        now = datetime.now(timezone.utc)
+        cache.write('expired', self.get_credentials(now - timedelta(minutes=1)))
+        cache.write('valid', self.get_credentials(now + timedelta(hours=1)))
+
+        # expired entries are removed when a cache is opened
+        credentials.CredentialCache(path)
+        self.assertIsNone(cache.read('expired'))
+        self.assertIsNotNone(cache.read('valid'))
+
+        cache.clear()
+        self.assertEqual(os.listdir(path), [])
+
+    def test_get_credential_cache(self):
+        self.assertIsNone(credentials.get_credential_cache())
+        path = self.get_temp_dir()
+        self.change_environment(**{credentials.CREDENTIAL_CACHE_ENV: path})
+        cache = credentials.get_credential_cache()
+        self.assertEqual(cache.path, path)
+        self.assertIs(cache, credentials.get_credential_cache())
@@ -13,12 +13,16 @@ import os
 from c7n.exceptions import PolicyValidationError, PolicyExecutionError
 from c7n.executor import MainThreadExecutor
 from c7n import filters as base_filters
+from c7n.cache import RunIndex
 from c7n.resources.ec2 import filters
 from c7n.resources.elb import ELB
 from c7n.testing import mock_datetime_now
 from c7n.utils import annotation
 from .common import instance, event_data, Bag, BaseTest
-from c7n.filters.core import AnnotationSweeper, ValueRegex, parse_date as core_parse_date
+from c7n.filters.core import (
+    AnnotationSweeper, ValueRegex, get_key_root, parse_date as core_parse_date)
+from c7n.filters.related import RelatedResourceIndex
+from c7n.filters.vpc import SecurityGroupReferenceIndex
 
 
 class BaseFilterTest(unittest.TestCase):
@@ -158,6 +162,117 @@ class TestNotFilter(unittest.TestCase):
         self.assertFalse(fake.invoked)
 
 
+class TestFilterResourceKeys(unittest.TestCase):
+
+    def test_key_root(self):
+        self.assertEqual(get_key_root("tag:Owner"), "Tags")
+        self.assertEqual(get_key_root("State.Name"), "State")
+        self.assertEqual(get_key_root("SecurityGroups[].GroupId"), "SecurityGroups")
+        self.assertEqual(get_key_root('"c7n:MatchedFilters"'), "c7n:MatchedFilters")
+        self.assertEqual(get_key_root("length(Tags)"), None)
+        self.assertEqual(get_key_root("[].Name"), None)
+
+    def test_filter_keys(self):
+        f = filters.factory(
+            {"or": [{"tag:Owner": "absent"},
+                    {"not": [{"State.Name": "running"}]}]})
+        self.assertEqual(f.get_resource_keys(), {"Tags", "State"})
+        f = filters.factory(
+            {"and": [{"Architecture": "x86_64"}, {"type": "instance-age"}]})
+        self.assertEqual(f.get_resource_keys(), None)
+        f = filters.factory({"type": "marked-for-op", "op": "stop"})
+        self.assertEqual(f.get_resource_keys(), {"Tags"})
+        # expression values and value paths are read from the resource
+        f = filters.factory(
+            {"type": "value", "key": "FunctionName", "value_type": "expr",
+             "value": "Tags[0].Value"})
+        self.assertEqual(f.get_resource_keys(), {"FunctionName", "Tags"})
+        f = filters.factory(
+            {"type": "value", "key": "FunctionName", "value_path": "Tags[0].Value"})
+        self.assertEqual(f.get_resource_keys(), {"FunctionName", "Tags"})
+        f = filters.factory(
+            {"type": "value", "key": "FunctionName", "value_type": "expr",
+             "value": "length(Tags)"})
+        self.assertEqual(f.get_resource_keys(), None)
+
+    def test_related_filter_keys(self):
+        f = filters.factory({"type": "vpc", "key": "tag:Zone", "value": "dmz"})
+        self.assertEqual(f.get_resource_keys(), {"VpcId"})
+        f = filters.factory(
+            {"type": "vpc", "key": "tag:Zone", "value": "dmz",
+             "match-resource": True})
+        self.assertEqual(f.get_resource_keys(), {"VpcId", "Tags"})
+
+
+class TestCompiledFilter(unittest.TestCase):
+
+    class Manager:
+
+        class resource_type:
+            id = 'InstanceId'
+
+        @classmethod
+        def get_model(cls):
+            return cls.resource_type
+
+        def iter_filters(self, block_end=False):
+            return iter(())
+
+    def get_resources(self):
+        return [
+            instance(InstanceId='i-1', Color='green', PrivateIpAddress='10.0.0.5'),
+            instance(InstanceId='i-2', Color='blue', PrivateIpAddress='10.1.0.5'),
+            instance(InstanceId='i-3', Color='Yellow', PrivateIpAddress='192.168.1.1'),
+        ]
+
+    def assertCompiledEqual(self, data):
+        compiled, baseline = filters.factory(data), filters.factory(data)
+        compiled.manager = baseline.manager = self.Manager()
+        self.assertTrue(compiled.get_predicate())
+        baseline._predicate = None
+
+        compiled_resources = self.get_resources()
+        baseline_resources = self.get_resources()
+        matched = compiled.process(compiled_resources)
+        expected = baseline.process(baseline_resources)
+
+        self.assertEqual(
+            sorted(r['InstanceId'] for r in matched),
+            sorted(r['InstanceId'] for r in expected))
+        self.assertEqual(compiled_resources, baseline_resources)
+
+    def test_compiled_groups(self):
+        self.assertCompiledEqual(
+            {'or': [{'Color': 'green'},
+                    {'type': 'value', 'key': 'Color', 'op': 'regex', 'value': 'yel.*'}]})
+        self.assertCompiledEqual(
+            {'and': [{'type': 'value', 'key': 'Color', 'op': 'in', 'value': ['green', 'blue']},
+                     {'type': 'value', 'key': 'PrivateIpAddress', 'value_type': 'cidr',
+                      'op': 'in', 'value': '10.0.0.0/16'}]})
+        self.assertCompiledEqual(
+            {'not': [{'Color': 'green'},
+                     {'or': [{'InstanceId': 'i-1'}, {'InstanceId': 'i-3'}]}]})
+
+    def test_uncompilable_group(self):
+        f = filters.factory({'or': [{'Color': 'green'}, {'type': 'reduce', 'limit': 1}]})
+        f.manager = self.Manager()
+        self.assertIsNone(f.get_predicate())
+
+    def test_compile_match(self):
+        f = filters.factory({'type': 'value', 'key': 'tag:Env', 'op': 'ni', 'value': ['dev']})
+        self.assertTrue(f(instance(Tags=[{'Key': 'Env', 'Value': 'prod'}])))
+        self.assertFalse(f(instance(Tags=[{'Key': 'Env', 'Value': 'dev'}])))
+        self.assertTrue(f(instance(Tags=[])))
+        self.assertIsNotNone(f._matcher)
+
+        f = filters.factory({'type': 'value', 'key': 'Color', 'op': 'in', 'value': [['a']]})
+        self.assertTrue(f(instance(Color=['a'])))
+
+        # keys which aren't valid expressions can still be matched directly
+        f = filters.factory({'type': 'value', 'key': 'c7n:AliasName', 'value': 'alias/a'})
+        self.assertTrue(f(instance({'c7n:AliasName': 'alias/a'})))
+
+
 class TestValueFilter(unittest.TestCase):
 
     # TODO test_manager needs a valid session_factory object
@@ -1104,6 +1219,76 @@ class TestFilterRegistry(unittest.TestCase):
         self.assertRaises(PolicyValidationError, reg.factory, {"type": ""})
 
 
+class RelatedResourceIndexTest(unittest.TestCase):
+
+    def get_manager(self, resources, calls):
+
+        def get_resources(ids):
+            calls.append(('get', sorted(ids)))
+            return [r for r in resources if r['Id'] in ids]
+
+        def enumerate_resources():
+            calls.append(('resources',))
+            return list(resources)
+
+        return Bag(
+            get_resources=get_resources,
+            resources=enumerate_resources,
+            get_model=lambda: Bag(id='Id'))
+
+    def test_fetch_cost_model(self):
+        calls = []
+        manager = self.get_manager(
+            [{'Id': 'r-%d' % i, 'Parent': 'p-%d' % (i % 2)} for i in range(20)], calls)
+        index = RelatedResourceIndex()
+        related = index.get_related('related', manager, {'r-1', 'r-2', 'r-99'}, 5)
+        self.assertEqual(set(related), {'r-1', 'r-2'})
+        self.assertEqual(calls, [('get', ['r-1', 'r-2', 'r-99'])])
+
+        # already indexed ids are not refetched
+        index.get_related('related', manager, {'r-1'}, 5)
+        self.assertEqual(len(calls), 1)
+
+        # requests across the run reach the threshold, enumerate once
+        related = index.get_related('related', manager, {'r-3', 'r-4'}, 5)
+        self.assertEqual(set(related), {'r-3', 'r-4'})
+        self.assertEqual(calls[-1], ('resources',))
+        index.get_related('related', manager, {'r-5', 'r-100'}, 5)
+        self.assertEqual(len(calls), 2)
+
+        related = index.get_related_by('related', manager, {'p-0', 'p-3'}, 'Parent')
+        self.assertEqual(list(related), ['p-0'])
+        self.assertEqual(len(related['p-0']), 10)
+        self.assertEqual(len(calls), 2)
+
+    def test_bounded_types(self):
+        index = RelatedResourceIndex()
+        for i in range(RelatedResourceIndex.MaxTypes + 2):
+            index.get_population('type-%d' % i)
+        self.assertEqual(len(index.populations), RelatedResourceIndex.MaxTypes)
+        self.assertNotIn('type-0', index.populations)
+
+    def test_shared_index(self):
+        RelatedResourceIndex.indexes.clear()
+        self.addCleanup(RelatedResourceIndex.indexes.clear)
+        config = {'cache_period': 5, 'account_id': '123', 'region': 'us-east-1'}
+        index = RelatedResourceIndex.get_index(Bag(config=config))
+        self.assertIs(index, RelatedResourceIndex.get_index(Bag(config=config)))
+        self.assertIsNot(
+            RelatedResourceIndex.get_index(Bag(config={})),
+            RelatedResourceIndex.get_index(Bag(config={})))
+
+        # index types sharing a key are separate
+        sg_index = SecurityGroupReferenceIndex.get_index(Bag(config=config))
+        self.assertIsInstance(sg_index, SecurityGroupReferenceIndex)
+        self.assertEqual(len(RunIndex.indexes), 2)
+
+        # expired indexes of other keys are purged
+        index.created = sg_index.created = 0
+        RelatedResourceIndex.get_index(Bag(config=dict(config, region='us-west-2')))
+        self.assertEqual(len(RunIndex.indexes), 1)
+
+
 class TestMetricsFilter(BaseTest):
 
     def test_missing_metrics(self):
@@ -1130,6 +1315,55 @@ class TestMetricsFilter(BaseTest):
         resources = p.run()
         self.assertEqual(len(resources), 1)
 
+    def test_metrics_batch(self):
+        self.patch(ELB, "executor_factory", MainThreadExecutor)
+        self.patch(base_filters.MetricsFilter, "batch_threshold", 0)
+        session_factory = self.replay_flight_data("test_metrics_batch")
+
+        p = self.load_policy(
+            {
+                "name": "elb-metrics-batch",
+                "resource": "elb",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "value": 0,
+                        "name": "RequestCount",
+                        "op": "eq",
+                        "statistics": "Sum",
+                        "missing-value": 0.0,
+                    }
+                ],
+            },
+            config={"account_id": "644160558196"},
+            session_factory=session_factory,
+        )
+        resources = p.run()
+        self.assertEqual(
+            sorted(r['LoadBalancerName'] for r in resources),
+            ['test-elb-missing-metrics', 'test-elb-zero-metrics'])
+        details = {
+            r['LoadBalancerName']: r["c7n.metrics"]["AWS/ELB.RequestCount.Sum.14"]
+            for r in resources}
+        self.assertEqual(details['test-elb-zero-metrics'][0]['Sum'], 0.0)
+        self.assertEqual(
+            details['test-elb-missing-metrics'][0]['c7n:detail'],
+            'Fill value for missing data')
+        # results are retained for other metrics filters in the policy
+        self.assertEqual(len(p.resource_manager._metric_data_cache), 3)
+
+    def test_metric_data_batch_sizing(self):
+        start = datetime(2024, 1, 1)
+        batch = base_filters.metrics.MetricDataBatch(
+            start, start + timedelta(days=14), 60, 'Average', {})
+        for i in range(10):
+            batch.add('AWS/EC2', 'CPUUtilization', [{'Name': 'InstanceId', 'Value': str(i)}])
+        key = batch.add('AWS/EC2', 'CPUUtilization', [{'Name': 'InstanceId', 'Value': '1'}])
+        self.assertEqual(len(batch.queries), 10)
+        self.assertIn(key, batch.queries)
+        # 20160 datapoints per query at a 1 minute period over 14 days
+        self.assertEqual([len(s) for s in batch.get_query_sets()], [5, 5])
+
     def test_missing_metrics_with_fillvalue(self):
         self.patch(ELB, "executor_factory", MainThreadExecutor)
         session_factory = self.replay_flight_data("test_missing_metrics")
@@ -50,11 +50,14 @@ class HandleTest(BaseTest):
              'external_id': None,
              'session_policy': None,
              'dryrun': False,
+             'stream': False,
+             'incremental': None,
              'profile': None,
              'authorization_file': None,
              'cache': '',
              'regions': ['us-east-1'],
              'cache_period': 0,
+             'cache_max_size': None,
              'log_group': None,
              'metrics': None})
 
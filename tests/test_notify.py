@@ -1,6 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-from .common import BaseTest, functional
+from .common import BaseTest, Bag, functional
 
 import base64
 import os
@@ -10,7 +10,7 @@ import tempfile
 import zlib
 
 from c7n.exceptions import PolicyValidationError
-from c7n.actions.notify import ResourceMessageBuffer
+from c7n.actions.notify import CompressedMessageBuffer, ResourceMessageBuffer
 
 import pytest
 
@@ -56,8 +56,69 @@ def test_msg_buffer_exceed():
     assert str(mbuffer) in str(e_info.value)
 
 
+def test_compressed_msg_buffer():
+    mbuffer = CompressedMessageBuffer({'env': 'dev', 'region': 'us-east-2'}, 1024)
+    payloads = []
+    for i in range(0, 200):
+        r = {'id': 'x%s' % i, 'a': 1, 'b': 2 + i, 'c': 5 * i}
+        if not mbuffer.add(r):
+            payloads.append((len(mbuffer), mbuffer.consume()))
+            assert mbuffer.add(r)
+    payloads.append((len(mbuffer), mbuffer.consume()))
+
+    resources = []
+    for rcount, payload in payloads:
+        assert len(payload) <= 1024
+        body = json.loads(zlib.decompress(base64.b64decode(payload)))
+        assert body['env'] == 'dev'
+        assert len(body['resources']) == rcount
+        resources.extend(body['resources'])
+    assert [r['id'] for r in resources] == ['x%s' % i for i in range(200)]
+    # buffers are filled using the actual compressed size
+    assert min(mbuffer.fill_sizes[:-1]) > 1024 * 0.9
+
+
+def test_compressed_msg_buffer_exceed():
+    mbuffer = CompressedMessageBuffer({'env': 'dev', 'region': 'us-west-2'}, 100)
+    assert mbuffer.add({'id': 'x', 'values': list(range(100))})
+    with pytest.raises(AssertionError) as e_info:
+        mbuffer.consume()
+    assert str(mbuffer) in str(e_info.value)
+
+
 class NotifyTest(BaseTest):
 
+    def test_notify_sqs_batch(self):
+        policy = self.load_policy(
+            {"name": "notify-sqs",
+             "resource": "ec2",
+             "actions": [
+                 {"type": "notify", "to": ["noone@example.com"],
+                  "transport": {"type": "sqs", "queue": "zebra"}}]})
+        notify = policy.resource_manager.actions[0]
+        payloads = [("a" * 1000, 1)] * 12 + [("b" * 200000, 5), ("c" * 100000, 2)]
+        groups = list(notify.group_payloads({}, iter(payloads)))
+        self.assertEqual([len(g) for g in groups], [10, 3, 1])
+
+        sent = []
+
+        class Client:
+            def send_message_batch(self, QueueUrl, Entries):
+                sent.append([e['Id'] for e in Entries])
+                return {'Successful': [
+                    {'Id': e['Id'], 'MessageId': 'm%s' % e['Id']} for e in Entries[1:]],
+                    'Failed': [{'Id': Entries[0]['Id']}]}
+
+            def send_message(self, QueueUrl, MessageBody, MessageAttributes):
+                sent.append(MessageBody)
+                return {'MessageId': 'retried'}
+
+        self.patch(notify.manager, "session_factory", lambda **kw: Bag(client=lambda s: Client()))
+        self.assertEqual(
+            notify.send_sqs_batch({'region': 'us-east-1'}, ["x", "y", "z"]),
+            ["retried", "m1", "m2"])
+        self.assertEqual(sent, [["0", "1", "2"], "x"])
+
     @functional
     def test_notify_address_from(self):
         session_factory = self.replay_flight_data("test_notify_address_from")
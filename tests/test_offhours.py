@@ -10,6 +10,7 @@ from .common import BaseTest, instance
 
 from c7n.exceptions import PolicyValidationError
 from c7n.filters.offhours import OffHour, OnHour, ScheduleParser, Time
+from c7n.resolver import ValuesFrom
 from c7n.testing import mock_datetime_now
 
 
@@ -656,6 +657,42 @@ class ScheduleParserTest(BaseTest):
             )
             self.assertEqual(OffHour({"skip-days": ["2015-12-02"]})(i), True)
 
+    def test_offhours_skip_from_resolved_once(self):
+        t = datetime.datetime(
+            year=2015,
+            month=12,
+            day=1,
+            hour=19,
+            minute=5,
+            tzinfo=tzutil.gettz("America/New_York"),
+        )
+        calls = []
+        self.patch(
+            ValuesFrom, "get_values", lambda self: calls.append(1) or ["2015-12-01"])
+        p = self.load_policy({
+            "name": "offhours-skip",
+            "resource": "ec2",
+            "filters": [{"type": "offhour", "skip-days-from": {
+                "url": "s3://test-dest/holidays.csv", "format": "csv", "expr": 0}}]})
+        f = p.resource_manager.filters[0]
+        parsed = []
+        parse = f.parser.parse
+        f.parser.parse = lambda value: parsed.append(value) or parse(value)
+
+        instances = [
+            instance(Tags=[{"Key": "maid_offhours", "Value": "off=(m-f,19);tz=est"}])
+            for i in range(20)]
+        with mock_datetime_now(t, datetime):
+            self.assertEqual(f(instances[0]), False)
+            self.assertEqual(len(calls), 1)
+            # skip days resolved by a direct call are refreshed by a run
+            self.assertEqual(f.process(instances), [])
+            self.assertEqual(f.process(instances), [])
+            # once per run
+            self.assertEqual(len(calls), 3)
+        # once per distinct schedule
+        self.assertEqual(parsed, ["off=(m-f,19);tz=est"])
+
     def test_onhour_skip(self):
         t = datetime.datetime(
             year=2015,
@@ -4,6 +4,7 @@ import datetime
 import gzip
 import logging
 import shutil
+import threading
 from unittest import mock
 import os
 
@@ -11,6 +12,7 @@ from dateutil.parser import parse as date_parse
 
 from c7n.ctx import ExecutionContext
 from c7n.config import Config
+from c7n.executor import ThreadPoolExecutor
 from c7n.output import DirectoryOutput, BlobOutput, LogFile, metrics_outputs
 from c7n.resources.aws import S3Output, MetricsOutput, inspect_bucket_region
 from c7n.testing import mock_datetime_now, TestUtils
@@ -121,6 +123,50 @@ class S3OutputTest(TestUtils):
             content = fh.read().strip()
             self.assertTrue(content.endswith("hello world"))
 
+    def test_concurrent_policy_logs(self):
+        dirs = [self.get_temp_dir(), self.get_temp_dir()]
+        outputs = [LogFile(Bag(log_dir=d), {}) for d in dirs]
+        logging.getLogger('custodian').setLevel(logging.INFO)
+        l = logging.getLogger("custodian.s3") # NOQA
+        v = l.manager.disable
+        l.manager.disable = 0
+
+        joined, done = threading.Event(), threading.Event()
+
+        def policy_log(output, msg):
+            output.join_log()
+            joined.set()
+            with ThreadPoolExecutor(max_workers=1) as w:
+                w.submit(l.info, msg).result()
+            done.wait()
+            output.leave_log()
+
+        def log_thread(msg):
+            t = threading.Thread(target=l.info, args=(msg,))
+            t.start()
+            t.join()
+
+        outputs[0].join_log()
+        log_thread("unattributed alone")
+        t = threading.Thread(target=policy_log, args=(outputs[1], "other policy"))
+        t.start()
+        joined.wait()
+        with ThreadPoolExecutor(max_workers=1) as w:
+            w.submit(l.info, "worker").result()
+        log_thread("unattributed")
+        done.set()
+        t.join()
+        l.info("policy")
+        outputs[0].leave_log()
+        l.manager.disable = v
+
+        contents = []
+        for d in dirs:
+            with open(os.path.join(d, "custodian-run.log")) as fh:
+                contents.append([line.rsplit(' - ', 1)[-1] for line in fh.read().splitlines()])
+        self.assertEqual(
+            contents, [["unattributed alone", "worker", "policy"], ["other policy"]])
+
     def test_compress(self):
         output = self.get_s3_output()
 
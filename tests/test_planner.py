@@ -0,0 +1,61 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from c7n.planner import FetchPlan, SharedFetchCache
+
+from .common import BaseTest
+
+
+class FetchPlanTest(BaseTest):
+
+    def load_counted_policy(self, data, session_factory, calls):
+        p = self.load_policy(data, session_factory=session_factory)
+        source = p.resource_manager.source
+        fetch = source.resources
+
+        def resources(query):
+            calls.append(p.name)
+            return fetch(query)
+
+        source.resources = resources
+        return p
+
+    def test_plan_shared_fetch(self):
+        session_factory = self.replay_flight_data("test_query_filter")
+        calls = []
+        p1 = self.load_counted_policy(
+            {"name": "ec2-1", "resource": "ec2",
+             "filters": [{"InstanceId": "i-9432cb49"}]},
+            session_factory, calls)
+        p2 = self.load_counted_policy(
+            {"name": "ec2-2", "resource": "ec2"}, session_factory, calls)
+        p3 = self.load_counted_policy(
+            {"name": "ec2-3", "resource": "ec2",
+             "query": [{"instance-state-name": "running"}]},
+            session_factory, calls)
+
+        plan = FetchPlan([p1, p2, p3])
+        self.assertEqual(len(plan.groups), 1)
+        self.assertIsInstance(p1.resource_manager._cache, SharedFetchCache)
+        self.assertNotIsInstance(p3.resource_manager._cache, SharedFetchCache)
+
+        resources = p1.run()
+        self.assertEqual(len(resources), 1)
+        plan.release(p1)
+        self.assertEqual(len(plan.groups), 1)
+
+        resources = p2.run()
+        plan.release(p2)
+        self.assertEqual(calls, ["ec2-1"])
+        self.assertEqual(len(resources), 1)
+        # annotations from other policies in the group aren't shared
+        self.assertNotIn("c7n:MatchedFilters", resources[0])
+        self.assertEqual(plan.groups, {})
+
+    def test_plan_skip_modes(self):
+        p1 = self.load_policy(
+            {"name": "ec2-1", "resource": "ec2",
+             "mode": {"type": "periodic", "schedule": "rate(1 day)"}})
+        p2 = self.load_policy({"name": "ec2-2", "resource": "ec2"})
+        plan = FetchPlan([p1, p2])
+        self.assertEqual(plan.groups, {})
+        plan.release(p1)
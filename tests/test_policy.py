@@ -1057,6 +1057,7 @@ class PolicyMeta(BaseTest):
                 "ec2:DescribeInstances",
                 "ec2:DescribeTags",
                 "cloudwatch:GetMetricStatistics",
+                "cloudwatch:GetMetricData",
             },
         )
 
@@ -2,10 +2,17 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+from unittest import mock
+
 from .common import BaseTest
 
-from c7n.provider import get_resource_class, import_resource_classes
+from c7n.actions import ActionRegistry
+from c7n.policy import execution
+from c7n.provider import get_resource_class, import_resource_classes, import_element_modules
+from c7n.registry import PluginRegistry
 from c7n.resources import load_resources
+from c7n.resources.aws import AWS
+from c7n.resources.sfn import InvokeStepFunction
 from c7n.resources.resource_map import ResourceMap
 
 
@@ -18,6 +25,40 @@ class ProviderTest(BaseTest):
         self.assertEqual([r.type for r in rtypes], ['ec2', 'app-elb'])
         self.assertEqual(missing, ['aws.foobar'])
 
+    def test_import_element_modules(self):
+        class Resource:
+            action_registry = ActionRegistry('resource.actions')
+
+        registry = PluginRegistry('resources')
+        registry.register('resource', Resource)
+        registry.subscribe(InvokeStepFunction.register_resources)
+        element_map = {'invoke-sfn': 'c7n.resources.sfn'}
+
+        with mock.patch('c7n.provider.LOADED_ELEMENTS', set()):
+            self.assertEqual(
+                import_element_modules(registry, element_map, ('stop',)), [])
+            self.assertNotIn('invoke-sfn', Resource.action_registry)
+            self.assertEqual(
+                import_element_modules(registry, element_map, ('stop', 'invoke-sfn')),
+                ['c7n.resources.sfn'])
+            self.assertIn('invoke-sfn', Resource.action_registry)
+            self.assertEqual(import_element_modules(registry, element_map, ('*',)), [])
+
+    def test_element_map_registrations(self):
+        # every filter, action and mode an element module registers outside
+        # its own resource types must be in the map for lazy loading.
+        load_resources(('aws.*',))
+        modules = set(AWS.element_map.values())
+        for rclass in AWS.resources.values():
+            for registry in (rclass.filter_registry, rclass.action_registry):
+                for name, element in registry.items():
+                    if (element.__module__ in modules and
+                            rclass.__module__ != element.__module__):
+                        self.assertEqual(AWS.element_map.get(name), element.__module__)
+        for name, mode in execution.items():
+            if mode.__module__ in modules:
+                self.assertEqual(AWS.element_map.get(name), mode.__module__)
+
 #    def test_import_resource_classes_wildcard(self):
 #        rtypes = import_resource_classes(ResourceMap, ('*',))
 
@@ -3,13 +3,20 @@
 import json
 import logging
 import os
+from datetime import datetime, timezone
 
+from unittest import mock
 
-from c7n.query import ResourceQuery, RetryPageIterator, TypeInfo
+from c7n import query
+from c7n.exceptions import ClientError
+from c7n.query import (
+    CallTimer, ChildResourceQuery, ConfigSource, ResourceQuery, RetryPageIterator, TypeInfo,
+    get_batch_size)
 from c7n.resources.vpc import InternetGateway
 
+import boto3
 from botocore.config import Config
-from .common import BaseTest, placebo_dir
+from .common import Bag, BaseTest, placebo_dir
 
 
 class ResourceQueryTest(BaseTest):
@@ -95,6 +102,134 @@ class ResourceQueryTest(BaseTest):
         resources = q.get(p.resource_manager, ["igw-3d9e3d56"])
         self.assertEqual(len(resources), 1)
 
+    def test_query_filter_iter(self):
+        session_factory = self.replay_flight_data("test_query_model")
+        p = self.load_policy(
+            {"name": "igw", "resource": "internet-gateway"},
+            session_factory=session_factory,
+        )
+        q = ResourceQuery(p.session_factory)
+        stream = q.filter_iter(p.resource_manager)
+        self.assertFalse(isinstance(stream, list))
+        self.assertEqual(
+            [r['InternetGatewayId'] for r in stream],
+            ['igw-3d9e3d56', 'igw-5bce113e', 'igw-e74b2b82'])
+
+    def test_stream_resources(self):
+        session_factory = self.replay_flight_data("test_query_model")
+        p = self.load_policy(
+            {"name": "igw", "resource": "internet-gateway",
+             "filters": [
+                 {"InternetGatewayId": "igw-3d9e3d56"},
+                 {"type": "value", "value_type": "resource_count",
+                  "op": "eq", "value": 1}]},
+            config={'stream': True},
+            session_factory=session_factory,
+        )
+        self.assertTrue(p.resource_manager.streaming)
+        resources = p.run()
+        self.assertEqual(len(resources), 1)
+        self.assertEqual(resources[0]['InternetGatewayId'], 'igw-3d9e3d56')
+
+    def test_stream_filter_barrier(self):
+        p = self.load_policy(
+            {"name": "igw", "resource": "internet-gateway",
+             "filters": [
+                 {"type": "value", "key": "State", "value": "available"},
+                 {"type": "reduce", "limit": 1}]})
+        value_filter, reduce_filter = p.resource_manager.filters
+        stream = iter([{'State': 'available'}, {'State': 'gone'}, {'State': 'available'}])
+        self.assertFalse(isinstance(value_filter.process_stream(stream), list))
+        self.assertTrue(isinstance(reduce_filter.process_stream(stream), list))
+        self.assertEqual(
+            p.resource_manager.filter_resource_stream(
+                iter([{'State': 'available'}, {'State': 'gone'}, {'State': 'available'}])),
+            [{'State': 'available', 'c7n:MatchedFilters': ['State']}])
+
+    def test_child_query_fanout(self):
+        p = self.load_policy({"name": "mt", "resource": "efs-mount-target"})
+        calls = []
+
+        class Client:
+            throttled = False
+
+            def can_paginate(self, op):
+                return False
+
+            def describe_mount_targets(self, FileSystemId):
+                calls.append(FileSystemId)
+                if FileSystemId == 'fs-2' and not self.throttled:
+                    self.throttled = True
+                    raise ClientError(
+                        {'Error': {'Code': 'ThrottlingException'}}, 'DescribeMountTargets')
+                return {'MountTargets': [
+                    {'MountTargetId': '%s-mt%d' % (FileSystemId, i)} for i in range(2)]}
+
+        q = ChildResourceQuery(p.session_factory, p.resource_manager, capture_parent_id=True)
+        q.max_workers = 2
+        p.resource_manager.get_client = Client
+        with mock.patch('c7n.query.time.sleep') as sleep:
+            resources = q.filter(p.resource_manager, parent_ids=['fs-1', 'fs-2', 'fs-3'])
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(calls.count('fs-2'), 2)
+        self.assertEqual(
+            resources,
+            [(fid, {'MountTargetId': '%s-mt%d' % (fid, i)})
+             for fid in ('fs-1', 'fs-2', 'fs-3') for i in range(2)])
+
+    def test_child_query_fanout_error(self):
+        p = self.load_policy({"name": "mt", "resource": "efs-mount-target"})
+
+        class Client:
+            def can_paginate(self, op):
+                return False
+
+            def describe_mount_targets(self, FileSystemId):
+                raise ClientError(
+                    {'Error': {'Code': 'ThrottlingException'}}, 'DescribeMountTargets')
+
+        q = ChildResourceQuery(p.session_factory, p.resource_manager)
+        q.max_workers, q.max_attempts = 2, 2
+        p.resource_manager.get_client = Client
+        with mock.patch('c7n.query.time.sleep'):
+            with self.assertRaises(ClientError):
+                q.filter(p.resource_manager, parent_ids=['fs-1', 'fs-2'])
+
+    def test_child_query_workers(self):
+        p = self.load_policy({"name": "mt", "resource": "efs-mount-target"})
+        q = ChildResourceQuery(p.session_factory, p.resource_manager)
+        self.assertEqual(q.max_workers, 1)
+        p = self.load_policy(
+            {"name": "mt", "resource": "efs-mount-target"}, config={"parent_workers": 4})
+        q = ChildResourceQuery(p.session_factory, p.resource_manager)
+        self.assertEqual(q.max_workers, 4)
+
+    def test_child_query_fanout_retry(self):
+        p = self.load_policy({"name": "mt", "resource": "efs-mount-target"})
+        retries = []
+
+        class Client:
+            def can_paginate(self, op):
+                return True
+
+            def get_paginator(self, op):
+                return Paginator()
+
+        class Paginator:
+            PAGE_ITERATOR_CLS = None
+
+            def paginate(self, FileSystemId):
+                retries.append(self.PAGE_ITERATOR_CLS)
+                return Bag(build_full_result=lambda: {'MountTargets': [
+                    {'MountTargetId': '%s-mt' % FileSystemId}]})
+
+        q = ChildResourceQuery(p.session_factory, p.resource_manager)
+        q.max_workers = 2
+        p.resource_manager.get_client = Client
+        resources = q.filter(p.resource_manager, parent_ids=['fs-1', 'fs-2'])
+        self.assertEqual(len(resources), 2)
+        self.assertEqual(retries, [RetryPageIterator] * 2)
+
     def test_type_info(self):
         assert repr(TypeInfo) == "<TypeInfo TypeInfo>"
 
@@ -165,6 +300,181 @@ class QueryResourceManagerTest(BaseTest):
         resources = p.resource_manager.get_resources(["igw-5bce113f"])
         self.assertEqual(resources, [])
 
+    def test_incremental_resources(self):
+        snapshot_dir = self.get_temp_dir()
+        p = self.load_policy(
+            {"name": "igw-check", "resource": "internet-gateway"},
+            config={"incremental": snapshot_dir})
+        manager = p.resource_manager
+        self.assertTrue(manager.incremental)
+        calls = []
+
+        def resources(query):
+            calls.append("resources")
+            return [{"InternetGatewayId": "igw-%d" % i} for i in range(3)]
+
+        def get_resources(ids):
+            calls.append(sorted(ids))
+            return [{"InternetGatewayId": i, "Changed": True} for i in ids]
+
+        self.patch(manager.source, "resources", resources)
+        self.patch(manager.source, "get_resources", get_resources)
+        self.patch(
+            ConfigSource, "get_changes", lambda self, since: ({"igw-1", "igw-9"}, {"igw-2"}))
+
+        self.assertEqual(len(manager.resources()), 3)
+        self.assertEqual(calls, ["resources"])
+
+        resources = manager.resources()
+        self.assertEqual(calls, ["resources", ["igw-1", "igw-9"]])
+        self.assertEqual(
+            {r["InternetGatewayId"]: r.get("Changed", False) for r in resources},
+            {"igw-0": False, "igw-1": True, "igw-9": True})
+
+        # config unavailable, fully refresh
+        self.patch(ConfigSource, "get_changes", lambda self, since: None)
+        self.assertEqual(len(manager.resources()), 3)
+        self.assertEqual(calls[-1], "resources")
+
+        # sources filling in empty query parameters are still incremental
+        p = self.load_policy(
+            {"name": "ec2", "resource": "ec2"}, config={"incremental": snapshot_dir})
+        calls = []
+        self.patch(p.resource_manager, "get_incremental_resources",
+                   lambda query, key: calls.append(query) or [])
+        p.resource_manager.resources()
+        self.assertEqual(calls, [{"Filters": []}])
+
+        # resource types without a describable config id aren't incremental
+        p = self.load_policy(
+            {"name": "asg", "resource": "asg"}, config={"incremental": snapshot_dir})
+        self.assertFalse(p.resource_manager.incremental)
+
+    def test_config_source_changes(self):
+        p = self.load_policy({"name": "igw-check", "resource": "internet-gateway"})
+        since = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        recorder = {"name": "default", "recordingGroup": {"allSupported": True}}
+        status = {"name": "default", "recording": True,
+                  "lastStartTime": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+        class Client:
+            def describe_configuration_recorders(self):
+                return {"ConfigurationRecorders": [recorder]}
+
+            def describe_configuration_recorder_status(self):
+                return {"ConfigurationRecordersStatus": [status]}
+
+        self.patch(query, "local_session", lambda factory: Bag(client=lambda name: Client()))
+        self.patch(ConfigSource, "select", lambda self, client, expr: iter([
+            {"resourceId": "igw-1", "configurationItemStatus": "OK"},
+            {"resourceId": "igw-2", "configurationItemStatus": "ResourceDeleted"}]))
+        source = ConfigSource(p.resource_manager)
+        self.assertEqual(source.get_changes(since), ({"igw-1"}, {"igw-2"}))
+
+        # resource type not recorded, no results can't be trusted
+        recorder["recordingGroup"] = {
+            "allSupported": False, "resourceTypes": ["AWS::EC2::Instance"]}
+        self.assertIsNone(source.get_changes(since))
+        recorder["recordingGroup"]["resourceTypes"].append("AWS::EC2::InternetGateway")
+        self.assertIsNotNone(source.get_changes(since))
+
+        # recorder stopped, or restarted within the change window
+        status["recording"] = False
+        self.assertIsNone(source.get_changes(since))
+        status.update(recording=True, lastStartTime=datetime(2024, 1, 3, tzinfo=timezone.utc))
+        self.assertIsNone(source.get_changes(since))
+
+    def test_augment_stages(self):
+        p = self.load_policy(
+            {"name": "buckets", "resource": "s3",
+             "filters": [{"Versioning.Status": "Enabled"}]})
+        self.assertEqual(p.resource_manager.select_augment_stages(), {"Versioning"})
+
+        p = self.load_policy(
+            {"name": "buckets", "resource": "s3",
+             "filters": [{"Name": "abc"}]})
+        manager = p.resource_manager
+        self.assertEqual(manager.select_augment_stages(), set())
+        self.patch(
+            manager.source, "resources", lambda query: [{"Name": "abc"}, {"Name": "xyz"}])
+        augmented = []
+
+        def augment(buckets):
+            self.assertFalse(manager.source.run_augment_stage("Tags"))
+            augmented.extend(buckets)
+            return buckets
+
+        completed = []
+
+        def complete_augment(buckets, stages):
+            completed.append(([b["Name"] for b in buckets], stages))
+            return buckets
+
+        self.patch(manager.source, "augment", augment)
+        self.patch(manager.source, "complete_augment", complete_augment)
+        resources = manager.resources()
+        self.assertEqual(len(augmented), 2)
+        self.assertEqual([b["Name"] for b in resources], ["abc"])
+        # skipped stages run over the matched buckets, output is unchanged
+        self.assertEqual(
+            completed, [(["abc"], set(manager.source.get_augment_stages()))])
+        self.assertEqual(manager.augment_stages, None)
+
+        # unknown filter keys, actions and event modes need all stages
+        p = self.load_policy(
+            {"name": "buckets", "resource": "s3",
+             "filters": [{"type": "global-grants"}]})
+        self.assertEqual(p.resource_manager.select_augment_stages(), None)
+        p = self.load_policy(
+            {"name": "functions", "resource": "lambda",
+             "filters": [{"tag:App": "present"}],
+             "actions": [{"type": "mark-for-op", "op": "delete"}]})
+        self.assertEqual(p.resource_manager.select_augment_stages(), None)
+        p = self.load_policy(
+            {"name": "functions", "resource": "lambda",
+             "filters": [{"tag:App": "present"}]})
+        self.assertEqual(p.resource_manager.select_augment_stages(), {"tags"})
+        # expression values and value paths read tags too
+        for f in ({"type": "value", "key": "FunctionName",
+                   "value_type": "expr", "value": "Tags[0].Value"},
+                  {"type": "value", "key": "FunctionName", "value_path": "Tags[0].Value"}):
+            p = self.load_policy(
+                {"name": "functions", "resource": "lambda", "filters": [f]})
+            self.assertEqual(p.resource_manager.select_augment_stages(), {"tags"})
+
+        # sources without optional stages
+        p = self.load_policy({"name": "igw", "resource": "internet-gateway"})
+        self.assertEqual(p.resource_manager.select_augment_stages(), None)
+
+    def test_augment_batch_size(self):
+        p = self.load_policy({"name": "queries", "resource": "athena-named-query"})
+        client = boto3.Session(region_name="us-east-1").client("athena")
+        # largest batch the api accepts
+        self.assertEqual(
+            get_batch_size(
+                p.resource_manager, client, "batch_get_named_query", "NamedQueryIds"),
+            50)
+        self.assertEqual(
+            get_batch_size(p.resource_manager, client, "batch_get_named_query", "Missing"),
+            p.resource_manager.chunk_size)
+
+        p = self.load_policy({"name": "services", "resource": "ecs-service"})
+        self.assertEqual(
+            get_batch_size(p.resource_manager, client, "batch_get_named_query", "NamedQueryIds"),
+            10)
+
+    def test_augment_call_timing(self):
+        p = self.load_policy({"name": "queries", "resource": "athena-named-query"})
+        output = self.capture_logging(
+            name=p.resource_manager.log.name, level=logging.DEBUG)
+        timer = CallTimer()
+        op = timer.wrap("batch_get_named_query", lambda **kw: kw)
+        self.assertEqual(op(NamedQueryIds=["a"]), {"NamedQueryIds": ["a"]})
+        op(NamedQueryIds=["b"])
+        timer.report(p.resource_manager)
+        self.assertIn(
+            "augment athena-named-query batch_get_named_query calls:2", output.getvalue())
+
     def test_detail_spec_resource_not_found(self):
         # Test the case where List* API returns a resource that
         # is not found with the Get* API.
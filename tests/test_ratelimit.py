@@ -0,0 +1,70 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from unittest import mock
+
+from c7n.credentials import SessionFactory
+from c7n.ratelimit import TokenBucket, limiter
+
+from .common import BaseTest
+
+
+class TokenBucketTest(BaseTest):
+
+    def test_unlimited_until_throttled(self):
+        bucket = TokenBucket()
+        with mock.patch('c7n.ratelimit.time.sleep') as sleep:
+            for i in range(10):
+                bucket.acquire()
+        self.assertIsNone(bucket.rate)
+        sleep.assert_not_called()
+
+    def test_aimd(self):
+        clock = mock.MagicMock(return_value=100.0)
+        with mock.patch('c7n.ratelimit.time.monotonic', clock):
+            bucket = TokenBucket()
+            clock.return_value = 101.0
+            for i in range(10):
+                bucket.acquire()
+            clock.return_value = 102.0
+            for i in range(10):
+                bucket.acquire()
+            bucket.throttled()
+            self.assertEqual(bucket.rate, 5.0)
+
+            # throttles within the decrease interval are a single event
+            bucket.throttled()
+            self.assertEqual(bucket.rate, 5.0)
+
+            with mock.patch('c7n.ratelimit.time.sleep') as sleep:
+                bucket.acquire()
+                bucket.acquire()
+            self.assertEqual(
+                [c[0][0] for c in sleep.call_args_list], [0.2, 0.4])
+
+            bucket.succeeded()
+            self.assertEqual(bucket.rate, 5.2)
+
+            clock.return_value = 104.0
+            bucket.throttled()
+            self.assertEqual(bucket.rate, 2.6)
+
+
+class RateLimiterTest(BaseTest):
+
+    def test_session_throttle_sizes_workers(self):
+        self.addCleanup(limiter.reset)
+        factory = SessionFactory('us-east-1')
+        self.assertEqual(limiter.get_workers(factory, 'us-east-1', 'ec2', 5), 5)
+
+        client = factory().client('ec2')
+        client.meta.events.emit(
+            'needs-retry.ec2.DescribeInstances',
+            operation=client.meta.service_model.operation_model('DescribeInstances'),
+            response=(
+                mock.MagicMock(status_code=503, headers={}),
+                {'Error': {'Code': 'RequestLimitExceeded'}}),
+            request_dict={'context': {'client_region': 'us-east-1'}},
+            endpoint=None, attempts=1, caught_exception=None)
+        self.assertEqual(limiter.get_workers(factory, 'us-east-1', 'ec2', 5), 1)
+        self.assertEqual(limiter.get_workers(factory, 'us-west-2', 'ec2', 5), 5)
+        self.assertEqual(limiter.get_workers(factory, 'us-east-1', 'sqs', 5), 5)
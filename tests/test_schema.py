@@ -77,6 +77,18 @@ class StructureParserTest(BaseTest):
         p = StructureParser()
         p.validate({'policies': [{'name': 'foo', 'resource': 'ec2', 'actions': None}]})
 
+    def test_get_element_types(self):
+        p = StructureParser()
+        self.assertEqual(
+            p.get_element_types({'policies': [
+                {'name': 'x', 'resource': 'ec2',
+                 'filters': [
+                     {'or': [{'type': 'finding'}, {'tag:Name': 'absent'}]},
+                     'marked-for-op'],
+                 'actions': ['stop', {'type': 'invoke-sfn', 'state-machine': 'abc'}]},
+                {'name': 'y', 'resource': 'sqs', 'mode': {'type': 'hub-finding'}}]}),
+            {'finding', 'marked-for-op', 'stop', 'invoke-sfn', 'hub-finding'})
+
     def test_null_filters(self):
         p = StructureParser()
         p.validate({'policies': [{'name': 'foo', 'resource': 'ec2', 'filters': None}]})
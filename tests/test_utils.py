@@ -68,6 +68,31 @@ class Backoff(BaseTest):
                 self.assertTrue(i < maxv)
 
 
+class CallStatsTest(BaseTest):
+
+    def test_call_stats(self):
+        stats = utils.CallStats()
+
+        def op(fail=False):
+            if fail:
+                raise ValueError("failed")
+            return "ok"
+
+        op = stats.wrap("a", op)
+        self.assertEqual(op(), "ok")
+        self.assertRaises(ValueError, op, True)
+        stats.record("b", 2.0, error=True)
+        self.assertEqual(stats.calls, {"a": 2, "b": 1})
+        self.assertEqual(stats.errors, {"a": 1, "b": 1})
+
+        metrics = mock.MagicMock()
+        stats.report(metrics, "Call", "Key")
+        self.assertEqual(
+            metrics.put_metric.call_args_list[2:],
+            [mock.call("CallLatency", 2.0, "Seconds", Scope="Policy", Key="b"),
+             mock.call("CallErrors", 1, "Count", Scope="Policy", Key="b")])
+
+
 class UrlConfTest(BaseTest):
 
     def test_parse_url(self):
@@ -761,3 +786,35 @@ def test_jmespath_parse_to_json():
         {'foo': '{"]}'}
     )
     assert result is None
+
+
+def test_tag_map():
+    r = {'Tags': [
+        {'Key': 'Env', 'Value': 'prod'},
+        {'Key': 'env', 'Value': 'dev'},
+        {'Key': 'Env', 'Value': 'stage'}]}
+    assert utils.get_tag_map(r) == {'Env': 'prod', 'env': 'dev'}
+    assert utils.get_tag_map(r, lower=True) == {'env': 'prod'}
+    assert isinstance(r['Tags'], utils.TagList)
+    assert utils.get_tag_map({}) == {}
+
+    # mutations invalidate the index
+    r['Tags'].append({'Key': 'App', 'Value': 'web'})
+    assert utils.get_tag_map(r)['App'] == 'web'
+    r['Tags'][0] = {'Key': 'Owner', 'Value': 'ops'}
+    assert utils.get_tag_map(r) == {'Owner': 'ops', 'env': 'dev', 'Env': 'stage', 'App': 'web'}
+    del r['Tags'][:]
+    assert utils.get_tag_map(r) == {}
+
+
+def test_tag_list_serialization():
+    import copy
+    import pickle
+
+    r = {'Tags': [{'Key': 'Env', 'Value': 'prod'}]}
+    utils.get_tag_map(r)
+    assert json.loads(utils.dumps(r)) == {'Tags': [{'Key': 'Env', 'Value': 'prod'}]}
+    for clone in (pickle.loads(pickle.dumps(r)), copy.deepcopy(r)):
+        assert isinstance(clone['Tags'], utils.TagList)
+        assert clone['Tags']._index is None
+        assert clone == r
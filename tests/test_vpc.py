@@ -1,5 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import copy
+import itertools
 import logging
 import time
 from .common import BaseTest, functional, event_data, load_data
@@ -7,6 +9,7 @@ from unittest.mock import MagicMock
 
 from botocore.exceptions import ClientError as BotoClientError
 from c7n.exceptions import PolicyValidationError
+from c7n.filters.vpc import SecurityGroupReferenceIndex
 from c7n.resources.aws import shape_validate
 from pytest_terraform import terraform
 
@@ -2055,6 +2058,31 @@ class SecurityGroupTest(BaseTest):
         self.assertIn("vpc_endpoint", resources[0]["c7n:InterfaceTypes"])
         self.assertIn("ec2", resources[0]["c7n:InterfaceResourceTypes"])
 
+    def test_used_unused_shared_index(self):
+        SecurityGroupReferenceIndex.indexes.clear()
+        self.addCleanup(SecurityGroupReferenceIndex.indexes.clear)
+        factory = self.replay_flight_data("test_security_group_used")
+        config = {'cache_period': 5, 'account_id': ACCOUNT_ID}
+        p = self.load_policy(
+            {"name": "sg-unused", "resource": "security-group", "filters": ["unused"]},
+            config=config, session_factory=factory)
+        unused = {r['GroupId'] for r in p.run()}
+
+        p = self.load_policy(
+            {"name": "sg-used", "resource": "security-group", "filters": ["used"]},
+            config=config, session_factory=factory)
+
+        def get_resource_manager(resource_type, data=None):
+            self.fail("refetched %s" % resource_type)
+
+        self.patch(p.resource_manager, 'get_resource_manager', get_resource_manager)
+        resources = p.run()
+        self.assertEqual(
+            {r["GroupId"] for r in resources},
+            {"sg-f9cc4d9f", "sg-0a2cb503a229c31c1", "sg-1c8a186c"})
+        self.assertFalse(unused.intersection(r['GroupId'] for r in resources))
+        self.assertIn("ec2", resources[0]["c7n:InterfaceResourceTypes"])
+
     def test_unused_ecs(self):
         factory = self.replay_flight_data("test_security_group_ecs_unused")
         p = self.load_policy(
@@ -2469,6 +2497,49 @@ class SecurityGroupTest(BaseTest):
         self.assertEqual(len(resources), 1)
         self.assertEqual(resources[0]['GroupId'], 'sg-6c7fa917')
 
+    def test_permission_port_cidr_index(self):
+        def perm(from_port, to_port, *cidrs):
+            return {'IpProtocol': 'tcp', 'FromPort': from_port, 'ToPort': to_port,
+                    'IpRanges': [{'CidrIp': c} for c in cidrs], 'Ipv6Ranges': [],
+                    'PrefixListIds': [], 'UserIdGroupPairs': []}
+
+        groups = [
+            {'GroupId': 'sg-1', 'OwnerId': '123', 'IpPermissions': [
+                perm(22, 22, '10.0.0.0/8'), perm(80, 80, '0.0.0.0/0')]},
+            {'GroupId': 'sg-2', 'OwnerId': '123', 'IpPermissions': [
+                perm(20, 25, '10.1.0.0/16', '0.0.0.0/0'), perm(8000, 9000, '0.0.0.0/0')]},
+            {'GroupId': 'sg-3', 'OwnerId': '123', 'IpPermissions': [
+                perm(443, 443, '0.0.0.0/0'), perm(22, 22, '0.0.0.0/0')]},
+        ]
+        p = self.load_policy({
+            'name': 'sg-ports',
+            'resource': 'security-group',
+            'filters': [{
+                'type': 'ingress',
+                'Ports': [22, 8443],
+                'OnlyPorts': [443],
+                'Cidr': {'value': '10.0.0.0/8', 'op': 'not-in', 'value_type': 'cidr'}}]})
+        f = p.resource_manager.filters[0]
+        resources = f.process(copy.deepcopy(groups))
+        self.assertEqual([r['GroupId'] for r in resources], ['sg-2', 'sg-3'])
+        self.assertEqual(
+            resources[0]['MatchedIpPermissions'],
+            [perm(20, 25, '0.0.0.0/0'), perm(8000, 9000, '0.0.0.0/0')])
+        self.assertEqual(
+            resources[1]['MatchedIpPermissions'], [perm(22, 22, '0.0.0.0/0')])
+
+        # indexed port matching agrees with a scan of the filter's ports
+        for from_port, to_port in itertools.product((0, 21, 22, 443, 8443), repeat=2):
+            expected = None
+            if f.ports:
+                expected = any(from_port <= port <= to_port for port in f.ports)
+            if from_port == to_port and from_port in f.only_ports:
+                expected = False
+            elif expected is None:
+                expected = True
+            self.assertEqual(
+                f.process_ports({'FromPort': from_port, 'ToPort': to_port}), expected)
+
     def test_default_vpc(self):
         # preconditions, more than one vpc, each with at least one
         # security group
@@ -5,6 +5,8 @@ import datetime
 import json
 from unittest import mock
 
+import urllib3
+
 from c7n.actions.webhook import Webhook
 from c7n.exceptions import PolicyValidationError
 from .common import BaseTest
@@ -75,7 +77,8 @@ class WebhookTest(BaseTest):
         with self.assertRaises(PolicyValidationError):
             self.load_policy(data=policy, validate=True)
 
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_batch(self, request_mock):
         resources = [
             {
@@ -121,7 +124,8 @@ class WebhookTest(BaseTest):
         self.assertEqual("POST", req['method'])
         self.assertEqual({}, req['headers'])
 
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_batch_body(self, request_mock):
         resources = [
             {
@@ -154,7 +158,8 @@ class WebhookTest(BaseTest):
             {"test": "header", "Content-Type": "application/json"},
             req['headers'])
 
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_date_serializer(self, request_mock):
         current = datetime.datetime.utcnow()
         resources = [
@@ -177,7 +182,8 @@ class WebhookTest(BaseTest):
             json.loads(req1['body'])[0]['value'],
             current.isoformat())
 
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_no_batch(self, request_mock):
         resources = [
             {
@@ -205,7 +211,8 @@ class WebhookTest(BaseTest):
         self.assertEqual("http://foo.com?foo=test1", req1['url'])
         self.assertEqual("http://foo.com?foo=test2", req2['url'])
 
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_existing_query_string(self, request_mock):
         resources = [
             {
@@ -236,7 +243,8 @@ class WebhookTest(BaseTest):
         self.assertIn("existing=test", req2['url'])
         self.assertIn("foo=test2", req2['url'])
 
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_policy_metadata(self, request_mock):
         resources = [
             {
@@ -264,8 +272,10 @@ class WebhookTest(BaseTest):
         self.assertEqual("http://foo.com?policy=webhook_policy", req1['url'])
         self.assertEqual("http://foo.com?policy=webhook_policy", req2['url'])
 
-    @mock.patch('c7n.actions.webhook.urllib3.ProxyManager.request')
-    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request')
+    @mock.patch('c7n.actions.webhook.urllib3.ProxyManager.request',
+                return_value=mock.MagicMock(status=200))
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
     def test_process_with_http_proxy(self, pool_request_mock, proxy_request_mock):
         with mock.patch.dict(os.environ,
                              {'HTTP_PROXY': 'http://mock.http.proxy.server:8000'},
@@ -291,6 +301,58 @@ class WebhookTest(BaseTest):
             self.assertEqual(1, proxy_request_mock.call_count)
             self.assertEqual(0, pool_request_mock.call_count)
 
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
+    def test_process_concurrent(self, request_mock):
+        resources = [{"name": "test%d" % i} for i in range(5)]
+        data = {
+            "url": "http://foo.com",
+            "concurrency": 3,
+            "query-params": {
+                "foo": "resource.name"
+            }
+        }
+
+        manager = self._get_manager()
+        wh = Webhook(data=data, manager=manager)
+        wh.process(resources)
+        self.assertEqual(
+            {c[1]['url'] for c in request_mock.call_args_list},
+            {"http://foo.com?foo=test%d" % i for i in range(5)})
+
+        pool = wh._build_http_manager()
+        self.assertEqual(pool.connection_pool_kw['maxsize'], 3)
+        retries = pool.connection_pool_kw['retries']
+        self.assertEqual(retries.total, 3)
+        # only responses asking to be retried later are resent
+        self.assertTrue(retries.is_retry('POST', 429, True))
+        self.assertTrue(retries.is_retry('POST', 503, True))
+        self.assertFalse(retries.is_retry('POST', 503, False))
+        self.assertFalse(retries.is_retry('POST', 500, True))
+        self.assertNotIn('POST', retries.allowed_methods)
+
+    @mock.patch('c7n.actions.webhook.urllib3.PoolManager.request',
+                return_value=mock.MagicMock(status=200))
+    def test_process_metrics(self, request_mock):
+        request_mock.side_effect = [
+            mock.MagicMock(status=200),
+            mock.MagicMock(status=500),
+            urllib3.exceptions.MaxRetryError(None, "http://foo.com", "too many 503s")]
+        manager = self._get_manager()
+        metrics = []
+        self.patch(
+            manager.ctx.metrics, "put_metric",
+            lambda key, value, unit, **dims: metrics.append((key, value, dims)))
+
+        wh = Webhook(data={"url": "http://foo.com"}, manager=manager)
+        wh.process([{"name": "test1"}, {"name": "test2"}, {"name": "test3"}])
+
+        self.assertEqual(
+            [(k, v) for k, v, d in metrics if k == 'WebhookErrors'],
+            [('WebhookErrors', 2)])
+        self.assertEqual(
+            {d['Endpoint'] for k, v, d in metrics}, {'foo.com'})
+
     def _get_manager(self):
         """The tests don't require real resource data
         or recordings, but they do need a valid manager with
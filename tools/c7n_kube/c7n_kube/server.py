@@ -1,10 +1,14 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import base64
+import bisect
 import http.server
+import itertools
 import json
 import os
 import tempfile
+import threading
+import time
 
 from c7n.config import Config
 from c7n.loader import DirectoryLoader
@@ -18,11 +22,108 @@ log = logging.getLogger("c7n_kube.server")
 log.setLevel(logging.DEBUG)
 
 
-class AdmissionControllerServer(http.server.HTTPServer):
+class PolicyIndex:
+    """
+    Index of admission policies by the group, version, resource and
+    operation of the requests they can match.
+
+    The index only narrows the set of policies evaluated for a request,
+    policies still match requests in full when pushed. Policies whose
+    match values can't be determined are evaluated for every request.
+    """
+
+    def __init__(self, policies):
+        self.policies = policies
+        self.size = len(policies)
+        self.index = {}
+        self.unindexed = []
+        for idx, p in enumerate(policies):
+            keys = self.get_policy_keys(p)
+            if keys is None:
+                self.unindexed.append(idx)
+                continue
+            for k in keys:
+                self.index.setdefault(k, []).append(idx)
+
+    @staticmethod
+    def get_policy_keys(policy):
+        try:
+            match = policy.get_execution_mode().get_match_values()
+        except Exception:
+            return None
+        # empty values match any request, see ValidatingControllerMode._filter_event
+        operations = match.get("operations") or ["*"]
+        resources = match.get("resources") or [None]
+        values = (
+            match.get("group") or None,
+            match.get("apiVersions") or None,
+            resources[0] or None,
+        )
+        if not isinstance(operations, (list, tuple)) or not all(
+            isinstance(v, str) for v in itertools.chain(operations, filter(None, values))
+        ):
+            return None
+        return [(*values, op) for op in operations]
+
+    def get_policies(self, request):
+        try:
+            resource = request["resource"]
+            group, version, name = resource["group"], resource["version"], resource["resource"]
+            operation = request["operation"]
+        except (KeyError, TypeError):
+            return list(self.policies)
+        matched = set(self.unindexed)
+        for key in itertools.product(
+            (group, None), (version, None), (name, None), (operation, "*")
+        ):
+            matched.update(self.index.get(key, ()))
+        return [self.policies[idx] for idx in sorted(matched)]
+
+
+class LatencyHistogram:
+    """
+    Request latency histogram, rendered in prometheus text format
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name="c7n_kube_admission_request_duration_seconds"):
+        self.name = name
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.sum += seconds
+
+    def render(self):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        lines = [
+            f"# HELP {self.name} Admission request latency in seconds",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class AdmissionControllerServer(http.server.ThreadingHTTPServer):
     """
     Admission Controller Server
+
+    Requests are handled concurrently, with each request only evaluating
+    the policies indexed as applicable to it.
     """
 
+    daemon_threads = True
+
     def __init__(self, policy_dir, on_exception="warn", *args, **kwargs):
         self.policy_dir = policy_dir
         self.on_exception = on_exception
@@ -30,22 +131,41 @@ class AdmissionControllerServer(http.server.HTTPServer):
         self.directory_loader = DirectoryLoader(Config.empty(output_dir=temp_dir.name))
         policy_collection = self.directory_loader.load_directory(os.path.abspath(self.policy_dir))
         self.policy_collection = policy_collection.filter(modes=["k8s-admission"])
+        self.policy_index = PolicyIndex(self.policy_collection.policies)
+        self.policy_locks = {}
+        self.lock = threading.Lock()
+        self.latency = LatencyHistogram()
         log.info(f"Loaded {len(self.policy_collection)} policies")
         super().__init__(*args, **kwargs)
 
+    def get_policies(self, request):
+        """Return the policies applicable to an admission request"""
+        policies = self.policy_collection.policies
+        index = self.policy_index
+        if index.policies is not policies or index.size != len(policies):
+            index = self.policy_index = PolicyIndex(policies)
+        return index.get_policies(request)
+
+    def get_policy_lock(self, policy):
+        # a policy's execution context isn't reentrant, so serialize
+        # concurrent requests evaluating the same policy.
+        with self.lock:
+            return self.policy_locks.setdefault(id(policy), threading.Lock())
+
 
 class AdmissionControllerHandler(http.server.BaseHTTPRequestHandler):
     def run_policies(self, req):
         failed_policies = []
         warn_policies = []
         patches = []
-        for p in self.server.policy_collection.policies:
+        for p in self.server.get_policies(req.get("request", {})):
             # fail_message and warning_message are set on exception
             warning_message = None
             deny_message = None
             resources = None
             try:
-                resources = p.push(req)
+                with self.server.get_policy_lock(p):
+                    resources = p.push(req)
                 action = p.data["mode"].get("on-match", "deny")
                 result = evaluate_result(action, resources)
                 if result in (
@@ -96,8 +216,15 @@ class AdmissionControllerHandler(http.server.BaseHTTPRequestHandler):
 
     def do_GET(self):
         """
-        Returns application/json list of your policies
+        Returns application/json list of your policies, or request latency
+        metrics at /metrics
         """
+        if self.path == "/metrics":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.end_headers()
+            self.wfile.write(self.server.latency.render().encode("utf-8"))
+            return
         self.send_response(200)
         self.end_headers()
         result = []
@@ -109,6 +236,13 @@ class AdmissionControllerHandler(http.server.BaseHTTPRequestHandler):
         """
         Entrypoint for kubernetes webhook
         """
+        start = time.monotonic()
+        try:
+            self.handle_admission()
+        finally:
+            self.server.latency.observe(time.monotonic() - start)
+
+    def handle_admission(self):
         req = self.get_request_body()
         log.info(req)
         try:
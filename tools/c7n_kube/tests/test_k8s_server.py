@@ -460,3 +460,50 @@ class TestServer(KubeTest):
                     },
                 ],
             )
+
+    def test_server_policy_index(self):
+        policies = {
+            "policies": [
+                {
+                    "name": "pod-create",
+                    "resource": "k8s.pod",
+                    "mode": {"type": "k8s-admission", "operations": ["CREATE"]},
+                },
+                {
+                    "name": "deployment-create",
+                    "resource": "k8s.deployment",
+                    "mode": {"type": "k8s-admission", "operations": ["CREATE"]},
+                },
+                {
+                    "name": "pod-any",
+                    "resource": "k8s.pod",
+                    "mode": {"type": "k8s-admission", "operations": ["CREATE", "DELETE"]},
+                },
+                {
+                    "name": "pod-delete",
+                    "resource": "k8s.pod",
+                    "mode": {"type": "k8s-admission", "operations": ["DELETE"]},
+                },
+            ]
+        }
+        with self._server(policies, timeout=0.1) as (server, _):
+            self.assertEqual(
+                [p.name for p in server.get_policies(self.get_event("create_pod")["request"])],
+                ["pod-create", "pod-any"],
+            )
+            self.assertEqual(
+                [p.name for p in server.get_policies(self.get_event("delete_pod")["request"])],
+                ["pod-any", "pod-delete"],
+            )
+            self.assertEqual(len(server.get_policies({})), 4)
+
+    def test_server_metrics(self):
+        policies = {"policies": []}
+        with self._server(policies, timeout=0.1) as (_, port):
+            for i in range(3):
+                requests.post(f"http://localhost:{port}", json=self.get_event("create_pod"))
+            res = requests.get(f"http://localhost:{port}/metrics")
+            self.assertEqual(res.status_code, 200)
+            lines = res.text.splitlines()
+            self.assertIn('c7n_kube_admission_request_duration_seconds_bucket{le="+Inf"} 3', lines)
+            self.assertIn("c7n_kube_admission_request_duration_seconds_count 3", lines)
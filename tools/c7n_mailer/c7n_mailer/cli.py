@@ -199,7 +199,9 @@ def get_c7n_mailer_parser():
     parser.add_argument("-c", "--config", required=True, help="mailer.yml config file")
     debug_help_msg = "sets c7n_mailer logger to debug, for maximum output (the default is INFO)"
     parser.add_argument("--debug", action="store_true", help=debug_help_msg)
-    max_num_processes_help_msg = "will run the mailer in parallel, integer of max processes allowed"
+    max_num_processes_help_msg = (
+        "will run the mailer in parallel, integer of max concurrent deliveries"
+    )
     parser.add_argument("--max-num-processes", type=int, help=max_num_processes_help_msg)
     templates_folder_help_msg = "message templates folder location"
     parser.add_argument("-t", "--templates", help=templates_folder_help_msg)
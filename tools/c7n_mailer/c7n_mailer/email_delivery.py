@@ -228,6 +228,7 @@ class EmailDelivery:
         return emails_to_mimetext_map
 
     def send_c7n_email(self, sqs_message):
+        """Send the message's emails, returning False if sending failed."""
         emails_to_mimetext_map = self.get_emails_to_mimetext_map(sqs_message)
         email_to_addrs = list(emails_to_mimetext_map.keys())
         try:
@@ -257,8 +258,7 @@ class EmailDelivery:
                     self.config,
                 )
             )
-            # TODO shall we raise the exception and interrupt the entire notify process?
-            return
+            return False
         self.logger.info(
             "Sent account:%s policy:%s %s:%s email:%s to %s"
             % (
@@ -270,3 +270,4 @@ class EmailDelivery:
                 email_to_addrs,
             )
         )
+        return True
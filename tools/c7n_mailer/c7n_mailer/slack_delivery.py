@@ -135,6 +135,7 @@ class SlackDelivery:
         return slack_messages
 
     def slack_handler(self, sqs_message, slack_messages):
+        failed = 0
         for key, payload in slack_messages.items():
             self.logger.info(
                 "Sending account:%s policy:%s %s:%s slack:%s to %s"
@@ -148,7 +149,14 @@ class SlackDelivery:
                 )
             )
 
-            self.send_slack_msg(key, payload.encode("utf-8"))
+            if not self.send_slack_msg(key, payload.encode("utf-8")):
+                failed += 1
+        if failed:
+            raise RuntimeError(
+                "{failed} of {count} Slack messages failed to deliver.".format(
+                    failed=failed, count=len(slack_messages)
+                )
+            )
 
     def retrieve_user_im(self, email_addresses):
         list = {}
@@ -226,7 +234,7 @@ class SlackDelivery:
                 "Slack API rate limiting. Waiting %d seconds", int(response.headers["Retry-After"])
             )
             time.sleep(int(response.headers["Retry-After"]))
-            return
+            return False
 
         elif response.status_code != 200:
             self.logger.info(
@@ -234,7 +242,7 @@ class SlackDelivery:
                 response.status_code,
                 response.text,
             )
-            return
+            return False
 
         if "text/html" in response.headers["content-type"]:
             if response.text != "ok":
@@ -243,7 +251,7 @@ class SlackDelivery:
                     response.status_code,
                     response.text,
                 )
-                return
+                return False
 
         else:
             response_json = response.json()
@@ -253,4 +261,5 @@ class SlackDelivery:
                     response.status_code,
                     response_json["error"],
                 )
-                return
+                return False
+        return True
@@ -14,11 +14,15 @@ class SnsDelivery:
         self.sns_cache = {}
 
     def deliver_sns_messages(self, packaged_sns_messages, sqs_message):
+        """Publish the packaged messages, returning False if any failed."""
+        delivered = True
         for packaged_sns_message in packaged_sns_messages:
             topic = packaged_sns_message["topic"]
             subject = packaged_sns_message["subject"]
             sns_message = packaged_sns_message["sns_message"]
-            self.deliver_sns_message(topic, subject, sns_message, sqs_message)
+            if not self.deliver_sns_message(topic, subject, sns_message, sqs_message):
+                delivered = False
+        return delivered
 
     def get_valid_sns_from_list(self, possible_sns_values):
         sns_addresses = []
@@ -117,3 +121,5 @@ class SnsDelivery:
                 "Error policy:%s account:%s sending sns to %s \n %s"
                 % (sqs_message["policy"], sqs_message.get("account", "na"), topic, e)
             )
+            return False
+        return True
@@ -8,7 +8,13 @@ SQS Message Processing
 import base64
 import json
 import logging
+import threading
+import time
 import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import boto3
+import botocore.session
 
 from c7n_mailer.target import MessageTargetMixin
 
@@ -34,33 +40,82 @@ class MailerSqsQueueIterator:
     def __next__(self):
         if self.messages:
             return self.messages.pop(0)
-        response = self.aws_sqs.receive_message(
-            QueueUrl=self.queue_url,
-            WaitTimeSeconds=self.timeout,
-            MaxNumberOfMessages=3,
-            MessageAttributeNames=self.msg_attributes,
-            AttributeNames=["SentTimestamp"],
-        )
-
-        msgs = response.get("Messages", [])
-        self.logger.debug("Messages received %d", len(msgs))
-        for m in msgs:
-            self.messages.append(m)
+        self.messages.extend(self.receive(3, self.timeout))
         if self.messages:
             return self.messages.pop(0)
         raise StopIteration()
 
     next = __next__  # python2.7
 
+    def receive(self, count=10, wait_time=None, visibility_timeout=None):
+        """Receive up to count messages, long polling for up to wait_time seconds."""
+        params = dict(
+            QueueUrl=self.queue_url,
+            WaitTimeSeconds=self.timeout if wait_time is None else wait_time,
+            MaxNumberOfMessages=count,
+            MessageAttributeNames=self.msg_attributes,
+            AttributeNames=["SentTimestamp"],
+        )
+        if visibility_timeout:
+            params["VisibilityTimeout"] = visibility_timeout
+        msgs = self.aws_sqs.receive_message(**params).get("Messages", [])
+        self.logger.debug("Messages received %d", len(msgs))
+        return msgs
+
     def ack(self, m):
         self.aws_sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=m["ReceiptHandle"])
 
+    def ack_batch(self, messages):
+        """Delete messages, ten per call, returning those which failed."""
+        failed = []
+        for idx in range(0, len(messages), 10):
+            batch = messages[idx : idx + 10]
+            response = self.aws_sqs.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(i), "ReceiptHandle": m["ReceiptHandle"]} for i, m in enumerate(batch)
+                ],
+            )
+            for f in response.get("Failed", ()):
+                self.logger.warning(
+                    "Failed to delete message id:%s error:%s",
+                    batch[int(f["Id"])]["MessageId"],
+                    f.get("Message", f.get("Code")),
+                )
+                failed.append(batch[int(f["Id"])])
+        return failed
+
+    def extend_visibility(self, messages, timeout):
+        """Keep messages still being processed hidden for another timeout seconds."""
+        for idx in range(0, len(messages), 10):
+            batch = messages[idx : idx + 10]
+            self.aws_sqs.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {
+                        "Id": str(i),
+                        "ReceiptHandle": m["ReceiptHandle"],
+                        "VisibilityTimeout": timeout,
+                    }
+                    for i, m in enumerate(batch)
+                ],
+            )
+
 
 class MailerSqsQueueProcessor(MessageTargetMixin):
+
+    # seconds messages stay hidden from other consumers while processed,
+    # extended for messages still in flight at half that
+    visibility_timeout = 300
+
+    # seconds between checks on in flight messages
+    heartbeat = 10
+
     def __init__(self, config, session, logger, max_num_processes=16):
         self.config = config
         self.logger = logger
-        self.session = session
+        self.base_session = session
+        self.local = threading.local()
         self.max_num_processes = max_num_processes
         self.receive_queue = self.config["queue_url"]
         self.endpoint_url = self.config.get("endpoint_url", None)
@@ -68,6 +123,19 @@ class MailerSqsQueueProcessor(MessageTargetMixin):
             self.logger.debug("debug logging is turned on from mailer config file.")
             logger.setLevel(logging.DEBUG)
 
+    @property
+    def session(self):
+        # worker threads each have their own session, as boto3 sessions
+        # aren't safe to create clients from concurrently.
+        return getattr(self.local, "session", None) or self.base_session
+
+    def init_worker(self, credentials):
+        s = botocore.session.get_session()
+        s._credentials = credentials
+        self.local.session = boto3.Session(
+            botocore_session=s, region_name=self.base_session.region_name
+        )
+
     """
     Cases
     - aws resource is tagged CreatorName: 'milton', ldap_tag_uids has CreatorName,
@@ -86,44 +154,107 @@ class MailerSqsQueueProcessor(MessageTargetMixin):
     """
 
     def run(self, parallel=False):
+        """Process messages until the queue is empty.
+
+        Messages are received in batches and processed on a pool of
+        max_num_processes threads when parallel, else one at a time. A
+        message is only deleted once it's been delivered to all its
+        targets, failed messages are left for redelivery by the queue. Messages
+        still being processed have their visibility timeout extended.
+        """
         self.logger.info("Downloading messages from the SQS queue.")
         aws_sqs = self.session.client("sqs", endpoint_url=self.endpoint_url)
         sqs_messages = MailerSqsQueueIterator(aws_sqs, self.receive_queue, self.logger)
-
         sqs_messages.msg_attributes = ["mtype", "recipient"]
-        # lambda doesn't support multiprocessing, so we don't instantiate any mp stuff
-        # unless it's being run from CLI on a normal system with SHM
-        if parallel:
-            import multiprocessing
-
-            process_pool = multiprocessing.Pool(processes=self.max_num_processes)
-        for sqs_message in sqs_messages:
-            self.logger.debug(
-                "Message id: %s received %s"
-                % (sqs_message["MessageId"], sqs_message.get("MessageAttributes", ""))
-            )
-            msg_kind = sqs_message.get("MessageAttributes", {}).get("mtype")
-            if msg_kind:
-                msg_kind = msg_kind["StringValue"]
-            if not msg_kind == DATA_MESSAGE:
-                warning_msg = "Unknown sqs_message or sns format %s" % (sqs_message["Body"][:50])
-                self.logger.warning(warning_msg)
-            if parallel:
-                process_pool.apply_async(self.process_sqs_message, args=sqs_message)
-            else:
-                self.process_sqs_message(sqs_message)
-            self.logger.debug("Processed sqs_message")
-            sqs_messages.ack(sqs_message)
-        if parallel:
-            process_pool.close()
-            process_pool.join()
+
+        workers = parallel and self.max_num_processes or 1
+        # resolve credentials once, worker sessions share them
+        credentials = self.session.get_credentials()
+
+        # messages received ahead of the workers, at least a full batch
+        capacity = max(workers, 10)
+        in_flight = {}
+        acks = []
+        failed = set()
+        with ThreadPoolExecutor(
+            max_workers=workers, initializer=self.init_worker, initargs=(credentials,)
+        ) as pool:
+            while True:
+                if len(in_flight) < capacity:
+                    # only long poll when there's nothing else to wait on
+                    msgs = sqs_messages.receive(
+                        min(10, capacity - len(in_flight)),
+                        0 if in_flight else None,
+                        self.visibility_timeout,
+                    )
+                    # skip redelivered messages which failed or are still in flight
+                    seen = failed.union(m["MessageId"] for m, _ in in_flight.values())
+                    new = [m for m in msgs if m["MessageId"] not in seen]
+                    if not new and not in_flight:
+                        break
+                    for m in new:
+                        self.check_message_kind(m)
+                        future = pool.submit(self.process_sqs_message, m)
+                        in_flight[future] = [m, time.time()]
+
+                done, _ = wait(in_flight, timeout=self.heartbeat, return_when=FIRST_COMPLETED)
+                for future in done:
+                    m, _ = in_flight.pop(future)
+                    if future.exception() is not None:
+                        self.logger.error(
+                            "Error processing message id:%s error:%s",
+                            m["MessageId"],
+                            future.exception(),
+                        )
+                        failed.add(m["MessageId"])
+                        continue
+                    if future.result() is False:
+                        self.logger.error("Failed delivery for message id:%s", m["MessageId"])
+                        failed.add(m["MessageId"])
+                        continue
+                    self.logger.debug("Processed sqs_message")
+                    acks.append(m)
+
+                if len(acks) >= 10 or (acks and not in_flight):
+                    sqs_messages.ack_batch(acks)
+                    acks = []
+                self.extend_in_flight(sqs_messages, in_flight)
+
+        if acks:
+            sqs_messages.ack_batch(acks)
+        if failed:
+            self.logger.warning("%d sqs_messages failed processing", len(failed))
         self.logger.info("No sqs_messages left on the queue, exiting c7n_mailer.")
         return
 
+    def check_message_kind(self, sqs_message):
+        self.logger.debug(
+            "Message id: %s received %s"
+            % (sqs_message["MessageId"], sqs_message.get("MessageAttributes", ""))
+        )
+        msg_kind = sqs_message.get("MessageAttributes", {}).get("mtype")
+        if msg_kind:
+            msg_kind = msg_kind["StringValue"]
+        if not msg_kind == DATA_MESSAGE:
+            warning_msg = "Unknown sqs_message or sns format %s" % (sqs_message["Body"][:50])
+            self.logger.warning(warning_msg)
+
+    def extend_in_flight(self, sqs_messages, in_flight):
+        now = time.time()
+        expiring = [
+            info for info in in_flight.values() if now - info[1] > self.visibility_timeout / 2
+        ]
+        if not expiring:
+            return
+        sqs_messages.extend_visibility([m for m, _ in expiring], self.visibility_timeout)
+        for info in expiring:
+            info[1] = now
+
     # This function when processing sqs messages will only deliver messages over email or sns
     # If you explicitly declare which tags are aws_usernames (synonymous with ldap uids)
     # in the ldap_uid_tags section of your mailer.yml, we'll do a lookup of those emails
     # (and their manager if that option is on) and also send emails there.
+    # Returns False if any delivery failed.
     def process_sqs_message(self, encoded_sqs_message):
         body = encoded_sqs_message["Body"]
         try:
@@ -144,7 +275,7 @@ class MailerSqsQueueProcessor(MessageTargetMixin):
             )
         )
 
-        self.handle_targets(
+        return self.handle_targets(
             sqs_message,
             encoded_sqs_message["Attributes"]["SentTimestamp"],
             email_delivery=True,
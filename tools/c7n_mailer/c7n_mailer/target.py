@@ -9,11 +9,14 @@ from .utils import decrypt
 
 class MessageTargetMixin(object):
     def handle_targets(self, message, sent_timestamp, email_delivery=True, sns_delivery=False):
+        """Deliver message to its targets, returning False if any delivery failed."""
+        delivered = True
         # get the map of email_to_addresses to mimetext messages (with resources baked in)
         # and send any emails (to SES or SMTP) if there are email addresses found
         if email_delivery:
             email_delivery = EmailDelivery(self.config, self.session, self.logger)
-            email_delivery.send_c7n_email(message)
+            if email_delivery.send_c7n_email(message) is False:
+                delivered = False
 
         # this sections gets the map of sns_to_addresses to rendered_jinja messages
         # (with resources baked in) and delivers the message to each sns topic
@@ -22,7 +25,8 @@ class MessageTargetMixin(object):
 
             sns_delivery = SnsDelivery(self.config, self.session, self.logger)
             sns_message_packages = sns_delivery.get_sns_message_packages(message)
-            sns_delivery.deliver_sns_messages(sns_message_packages, message)
+            if not sns_delivery.deliver_sns_messages(sns_message_packages, message):
+                delivered = False
 
         # this section sends a notification to the resource owner via Slack
         if any(
@@ -43,7 +47,7 @@ class MessageTargetMixin(object):
                 slack_delivery.slack_handler(message, slack_messages)
             except Exception:
                 traceback.print_exc()
-                pass
+                delivered = False
 
         # this section gets the map of metrics to send to datadog and delivers it
         if any(e.startswith("datadog") for e in message.get("action", ()).get("to")):
@@ -56,7 +60,7 @@ class MessageTargetMixin(object):
                 datadog_delivery.deliver_datadog_messages(datadog_message_packages, message)
             except Exception:
                 traceback.print_exc()
-                pass
+                delivered = False
 
         # this section sends the full event to a Splunk HTTP Event Collector (HEC)
         if any(e.startswith("splunkhec://") for e in message.get("action", ()).get("to")):
@@ -69,4 +73,6 @@ class MessageTargetMixin(object):
                 splunk_delivery.deliver_splunk_messages(splunk_messages)
             except Exception:
                 traceback.print_exc()
-                pass
+                delivered = False
+
+        return delivered
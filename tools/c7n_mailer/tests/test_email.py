@@ -161,7 +161,7 @@ class EmailTest(unittest.TestCase):
         SQS_MESSAGE = copy.deepcopy(SQS_MESSAGE_1)
         to_addrs_to_email_messages_map = self.email_delivery.get_emails_to_mimetext_map(SQS_MESSAGE)
         with patch("smtplib.SMTP") as mock_smtp:
-            self.email_delivery.send_c7n_email(SQS_MESSAGE)
+            self.assertTrue(self.email_delivery.send_c7n_email(SQS_MESSAGE))
             for mimetext_msg in to_addrs_to_email_messages_map.values():
                 self.assertEqual(mimetext_msg["X-Priority"], "1 (Highest)")
 
@@ -179,6 +179,11 @@ class EmailTest(unittest.TestCase):
                 [call(MAILER_CONFIG["from_address"], to_addrs, mimetext_msg.as_string())],
             )
 
+    def test_smtp_send_failed(self):
+        SQS_MESSAGE = copy.deepcopy(SQS_MESSAGE_1)
+        with patch("smtplib.SMTP", side_effect=OSError("connection refused")):
+            self.assertFalse(self.email_delivery.send_c7n_email(SQS_MESSAGE))
+
     def test_smtp_called_multiple_times(self):
         SQS_MESSAGE = copy.deepcopy(SQS_MESSAGE_1)
         SQS_MESSAGE["action"].pop("priority_header", None)
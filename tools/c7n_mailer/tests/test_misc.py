@@ -51,6 +51,57 @@ class AWSMailerTests(unittest.TestCase):
         mailer_sqs_queue_processor.process_sqs_message(SQS_MESSAGE_1_ENCODED)
         assert mock_sns_delivery.called
 
+    def test_sqs_queue_processor_run(self):
+        messages = [
+            {
+                "MessageId": "m%d" % i,
+                "ReceiptHandle": "r%d" % i,
+                "Body": "",
+                "MessageAttributes": {"mtype": {"StringValue": sqs_queue_processor.DATA_MESSAGE}},
+            }
+            for i in range(4)
+        ]
+        # m2 fails and is redelivered later in the run, m3 fails delivery
+        responses = [messages[:3], messages[3:], [messages[2]]]
+        receives = []
+        deleted = []
+
+        class Client:
+            def receive_message(self, **params):
+                receives.append(params)
+                return {"Messages": responses and responses.pop(0) or []}
+
+            def delete_message_batch(self, QueueUrl, Entries):
+                deleted.extend(e["ReceiptHandle"] for e in Entries)
+                return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+        session = boto3.Session(region_name="us-east-1")
+        processor = sqs_queue_processor.MailerSqsQueueProcessor(
+            MAILER_CONFIG, session, logging.getLogger("c7n_mailer")
+        )
+        processed = []
+        sessions = set()
+
+        def process(m):
+            processed.append(m["MessageId"])
+            sessions.add(processor.session)
+            if m["MessageId"] == "m2":
+                raise ValueError("delivery failed")
+            return m["MessageId"] != "m3"
+
+        with patch.object(session, "client", return_value=Client()), patch.object(
+            session, "get_credentials"
+        ), patch.object(processor, "process_sqs_message", side_effect=process):
+            processor.run(parallel=True)
+
+        self.assertEqual(sorted(processed), ["m0", "m1", "m2", "m3"])
+        self.assertEqual(sorted(deleted), ["r0", "r1"])
+        # workers use their own sessions
+        self.assertNotIn(session, sessions)
+        self.assertIs(processor.session, session)
+        self.assertEqual(receives[0]["MaxNumberOfMessages"], 10)
+        self.assertEqual(receives[0]["VisibilityTimeout"], processor.visibility_timeout)
+
     def test_azure_queue_processor(self):
         processor = azure_queue_processor.MailerAzureQueueProcessor(
             MAILER_CONFIG_AZURE, logging.getLogger("c7n_mailer")
@@ -3,9 +3,11 @@
 """Run a custodian policy across an organization's accounts
 """
 
+import contextlib
 import csv
 from collections import Counter
 from datetime import timedelta, datetime
+import json
 import logging
 import os
 import time
@@ -24,7 +26,7 @@ from botocore.exceptions import ClientError
 import click
 import jsonschema
 
-from c7n.credentials import assumed_session, SessionFactory
+from c7n.credentials import CREDENTIAL_CACHE_ENV, assumed_session, SessionFactory
 from c7n.executor import MainThreadExecutor
 from c7n.exceptions import InvalidOutputConfig
 from c7n.config import Config
@@ -33,9 +35,10 @@ from c7n.provider import get_resource_class, clouds as cloud_providers
 from c7n.reports.csvout import Formatter, fs_record_set, record_set, strip_output_path
 from c7n.resources import load_available
 from c7n.utils import (
-    CONN_CACHE, dumps, filter_empty, format_string_values, get_policy_provider, join_output_path)
+    dumps, filter_empty, format_string_values, get_policy_provider, join_output_path,
+    reset_session_cache)
 
-from c7n_org.utils import environ, account_tags
+from c7n_org.utils import account_tags, set_environ, shared_credentials
 
 log = logging.getLogger('c7n_org')
 
@@ -50,6 +53,17 @@ if sys.platform == 'darwin' and (
 WORKER_COUNT = int(
     os.environ.get('C7N_ORG_PARALLEL', multiprocessing.cpu_count() * 4))
 
+# Providers are loaded once per worker process and reused across the
+# units of work it runs.
+WORKER_LOADED = False
+
+# Account and region of the last unit of work a worker process ran, its
+# sessions are kept for further units on the same account and region.
+WORKER_SESSION = {}
+
+# Seconds a worker keeps a session, matching the session cache.
+WORKER_SESSION_TTL = 45 * 60
+
 
 CONFIG_SCHEMA = {
     '$schema': 'http://json-schema.org/draft-07/schema',
@@ -608,22 +622,118 @@ def _update(old, new):
     return old
 
 
+def load_worker():
+    global WORKER_LOADED
+    if not WORKER_LOADED:
+        load_available()
+        WORKER_LOADED = True
+
+
+def get_run_units(accounts, regions, policies_config):
+    """Split a run into (account, region, policies) units of work.
+
+    Policies on the same resource type are kept in one unit, so they
+    share a single fetch of their resources through the cache.
+    """
+    groups = {}
+    for p in policies_config.get('policies', ()):
+        resource = p.get('resource', '')
+        groups.setdefault('.' in resource and resource or 'aws.%s' % resource, []).append(p)
+
+    for a in accounts:
+        for r in resolve_regions(regions or a.get('regions', ()), a):
+            for resource, policies in groups.items():
+                yield a, r, resource, dict(policies_config, policies=policies)
+
+
+class RunHistory:
+    """Runtimes of units of work from previous runs.
+
+    Used to schedule the longest running units first, units without a
+    recorded runtime are scheduled ahead of all others.
+    """
+
+    file_name = 'runtimes.json'
+
+    def __init__(self, cache_path):
+        self.path = os.path.join(cache_path, self.file_name)
+        self.runtimes = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as fh:
+                    self.runtimes = json.load(fh)
+            except ValueError:
+                log.warning("Ignoring invalid run history %s", self.path)
+
+    @staticmethod
+    def get_key(account, region, resource):
+        return "%s:%s:%s" % (account['account_id'], region, resource)
+
+    def order(self, units):
+        return sorted(
+            units, key=lambda u: -self.runtimes.get(
+                self.get_key(*u[:3]), float('inf')))
+
+    def record(self, account, region, resource, duration):
+        self.runtimes[self.get_key(account, region, resource)] = round(duration, 3)
+
+    def save(self):
+        tmp_path = "%s.tmp" % self.path
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.runtimes, fh, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def run_unit(*args, **kw):
+    """Execute a unit of work, returning its results and runtime."""
+    st = time.time()
+    policy_counts, success = run_account(*args, **kw)
+    return policy_counts, success, time.time() - st
+
+
+def get_worker_session(account, region):
+    """Return the worker's session state for an account region.
+
+    Sessions and assumed credentials are kept across a worker's units of
+    work on the same account and region, and reset on moving to another.
+    """
+    key = (account['account_id'], region)
+    if WORKER_SESSION.get('key') != key or (
+            time.time() - WORKER_SESSION['time'] > WORKER_SESSION_TTL):
+        reset_session_cache()
+        WORKER_SESSION.clear()
+        WORKER_SESSION.update(key=key, time=time.time())
+    return WORKER_SESSION
+
+
 def run_account(account, region, policies_config, output_path,
-                cache_period, cache_path, metrics, dryrun, debug):
+                cache_period, cache_path, metrics, dryrun, debug, shared_cache=False,
+                concurrent=True, cache_max_size=None):
     """Execute a set of policies on an account.
+
+    concurrent is whether other units of work on the same account region
+    may run at the same time.
     """
     logging.getLogger('custodian.output').setLevel(logging.ERROR + 1)
-    CONN_CACHE.session = None
-    CONN_CACHE.time = None
-    load_available()
+    load_worker()
+    worker_session = get_worker_session(account, region)
 
     output_path = join_output_path(output_path, account['name'], region)
 
-    cache_path = os.path.join(cache_path, "%s-%s.cache" % (account['account_id'], region))
+    # units of work on an account region running concurrently need the
+    # multi-process safe cache.
+    if shared_cache:
+        cache_path = "shared:%s" % os.path.join(cache_path, "shared.cache")
+    elif concurrent:
+        cache_path = "shared:%s" % os.path.join(
+            cache_path, "%s-%s.cache" % (account['account_id'], region))
+    else:
+        cache_path = os.path.join(cache_path, "%s-%s.cache" % (account['account_id'], region))
 
     config = Config.empty(
         region=region, cache=cache_path,
-        cache_period=cache_period, dryrun=dryrun, output_dir=output_path,
+        cache_period=cache_period, cache_max_size=cache_max_size,
+        dryrun=dryrun, output_dir=output_path,
         account_id=account['account_id'], metrics_enabled=metrics,
         log_group=None, profile=None, external_id=None)
 
@@ -634,8 +744,10 @@ def run_account(account, region, policies_config, output_path,
             config['assume_role'] = account['role']
             config['external_id'] = account.get('external_id')
         else:
-            env_vars.update(
-                _get_env_creds(account, get_session(account, 'custodian', region), region))
+            if 'env' not in worker_session:
+                worker_session['env'] = _get_env_creds(
+                    account, get_session(account, 'custodian', region), region)
+            env_vars.update(worker_session['env'])
 
     elif account.get('profile'):
         config['profile'] = account['profile']
@@ -648,7 +760,7 @@ def run_account(account, region, policies_config, output_path,
     success = True
     st = time.time()
 
-    with environ(**env_vars):
+    with set_environ(**env_vars):
         for p in policies:
             # Extend policy execution conditions with account information
             p.conditions.env_vars['account'] = account
@@ -727,20 +839,27 @@ def initialize_provider_output(policies_config, output_dir, regions):
 @click.option('-l', '--policytags', 'policy_tags',
               multiple=True, default=None, help="Policy tag filter")
 @click.option('--cache-period', default=15, type=int)
+@click.option('--cache-max-size', default=None, type=int,
+              help="Size limit in megabytes of the shared caches (default 512)")
 @click.option('--cache-path', required=False,
               type=click.Path(
                   writable=True, readable=True, exists=True,
                   resolve_path=True, allow_dash=False,
                   file_okay=False, dir_okay=True),
               default=None)
+@click.option('--shared-cache', default=False, is_flag=True,
+              help="Use a single cache shared by all account/region workers")
+@click.option('--credential-cache/--no-credential-cache', default=False,
+              help="Share assumed role credentials across workers via the cache path, "
+              "credentials are stored on disk until the run ends")
 @click.option("--metrics", default=False, is_flag=True)
 @click.option("--metrics-uri", default=None, help="Configure provider metrics target")
 @click.option("--dryrun", default=False, is_flag=True)
 @click.option('--debug', default=False, is_flag=True)
 @click.option('-v', '--verbose', default=False, help="Verbose", is_flag=True)
 def run(config, use, output_dir, accounts, not_accounts, tags, region,
-        policy, policy_tags, cache_period, cache_path, metrics,
-        dryrun, debug, verbose, metrics_uri):
+        policy, policy_tags, cache_period, cache_max_size, cache_path, shared_cache,
+        credential_cache, metrics, dryrun, debug, verbose, metrics_uri):
     """run a custodian policy across accounts"""
     accounts_config, custodian_config, executor = init(
         config, use, debug, verbose, accounts, tags, policy, policy_tags=policy_tags,
@@ -765,38 +884,58 @@ def run(config, use, output_dir, accounts, not_accounts, tags, region,
 
     output_dir = initialize_provider_output(custodian_config, output_dir, region)
 
-    with executor(max_workers=WORKER_COUNT) as w:
-        futures = {}
-        for a in accounts_config['accounts']:
-            for r in resolve_regions(region or a.get('regions', ()), a):
+    # Assumed role credentials can be shared by workers through the cache
+    # path, so each role is assumed once per run rather than per unit.
+    credentials = contextlib.nullcontext()
+    if credential_cache and CREDENTIAL_CACHE_ENV not in os.environ:
+        credentials = shared_credentials(os.path.join(cache_path, 'credentials'))
+
+    with credentials:
+        # Work is scheduled longest first by runtime in previous runs, so
+        # large accounts start early rather than holding up the end of a run.
+        history = RunHistory(cache_path)
+        units = history.order(
+            get_run_units(accounts_config['accounts'], region, custodian_config))
+        # units of an account region only run concurrently when split across workers
+        region_units = Counter((a['account_id'], r) for a, r, _, _ in units)
+        parallel = not debug and WORKER_COUNT > 1
+
+        with executor(max_workers=WORKER_COUNT, initializer=load_worker) as w:
+            futures = {}
+            for a, r, resource, unit_config in units:
                 futures[w.submit(
-                    run_account,
+                    run_unit,
                     a, r,
-                    custodian_config,
+                    unit_config,
                     output_dir,
                     cache_period,
                     cache_path,
                     metrics,
                     dryrun,
-                    debug)] = (a, r)
-
-        for f in as_completed(futures):
-            a, r = futures[f]
-            if f.exception():
-                if debug:
-                    raise
-                log.warning(
-                    "Error running policy in %s @ %s exception: %s",
-                    a['name'], r, f.exception())
-                continue
+                    debug,
+                    shared_cache,
+                    parallel and region_units[(a['account_id'], r)] > 1,
+                    cache_max_size)] = (a, r, resource)
+
+            for f in as_completed(futures):
+                a, r, resource = futures[f]
+                if f.exception():
+                    if debug:
+                        raise
+                    log.warning(
+                        "Error running policy in %s @ %s exception: %s",
+                        a['name'], r, f.exception())
+                    continue
 
-            account_region_pcounts, account_region_success = f.result()
-            for p in account_region_pcounts:
-                policy_counts[p] += account_region_pcounts[p]
+                unit_pcounts, unit_success, duration = f.result()
+                history.record(a, r, resource, duration)
+                for p in unit_pcounts:
+                    policy_counts[p] += unit_pcounts[p]
 
-            if not account_region_success:
-                success = False
+                if not unit_success:
+                    success = False
 
+        history.save()
     log.info("Policy resource counts %s" % policy_counts)
 
     if not success:
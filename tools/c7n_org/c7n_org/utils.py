@@ -1,6 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import os
+from c7n.credentials import CREDENTIAL_CACHE_ENV, CredentialCache
 from c7n.utils import reset_session_cache
 from contextlib import contextmanager
 
@@ -18,6 +19,16 @@ def account_tags(account):
 
 @contextmanager
 def environ(**kw):
+    with set_environ(**kw) as env:
+        try:
+            yield env
+        finally:
+            reset_session_cache()
+
+
+@contextmanager
+def set_environ(**kw):
+    """Set environment variables, keeping sessions created with them on exit."""
     current_env = dict(os.environ)
     for k, v in kw.items():
         os.environ[k] = v
@@ -28,4 +39,13 @@ def environ(**kw):
         for k in kw.keys():
             del os.environ[k]
         os.environ.update(current_env)
-        reset_session_cache()
+
+
+@contextmanager
+def shared_credentials(path):
+    """Share assumed role credentials through path, removing them on exit."""
+    with environ(**{CREDENTIAL_CACHE_ENV: path}):
+        try:
+            yield
+        finally:
+            CredentialCache(path).clear()
@@ -1,12 +1,14 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import copy
+import json
 from unittest import mock
 import os
 
 import pytest
 import yaml
 
+from c7n.credentials import CREDENTIAL_CACHE_ENV, get_credential_cache
 from c7n.testing import TestUtils
 from click.testing import CliRunner
 
@@ -71,6 +73,11 @@ POLICIES_AWS_DEFAULT = yaml.safe_dump({
 
 class OrgTest(TestUtils):
 
+    def get_policy_counts(self, counts):
+        def run_account(account, region, policies_config, *args):
+            return {p['name']: counts[p['name']] for p in policies_config['policies']}, True
+        return run_account
+
     def setup_run_dir(self, accounts=None, policies=None):
         root = self.get_temp_dir()
 
@@ -165,8 +172,8 @@ class OrgTest(TestUtils):
         run_dir = self.setup_run_dir()
         logger = mock.MagicMock()
         run_account = mock.MagicMock()
-        run_account.return_value = (
-            {'compute': 24, 'serverless': 12}, True)
+        run_account.side_effect = self.get_policy_counts(
+            {'compute': 24, 'serverless': 12})
         self.patch(org, 'logging', logger)
         self.patch(org, 'run_account', run_account)
         self.change_cwd(run_dir)
@@ -184,6 +191,101 @@ class OrgTest(TestUtils):
             log_output.getvalue().strip(),
             "Policy resource counts Counter({'compute': 96, 'serverless': 48})")
 
+    def test_cli_run_credential_cache(self):
+        run_dir = self.setup_run_dir()
+        self.patch(org, 'logging', mock.MagicMock())
+        paths = []
+
+        def run_account(account, region, policies_config, *args):
+            cache = get_credential_cache()
+            paths.append(cache.path)
+            cache.write(account['account_id'], {'expiry_time': '2099-01-01T00:00:00+00:00'})
+            return {}, True
+
+        self.patch(org, 'run_account', run_account)
+        self.change_cwd(run_dir)
+        runner = CliRunner()
+        result = runner.invoke(
+            org.cli,
+            ['run', '-c', 'accounts.yml', '-u', 'policies.yml',
+             '--debug', '-s', 'output', '--cache-path', 'cache', '--credential-cache'],
+            catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(set(paths)), 1)
+        # credentials are removed when the run ends
+        self.assertEqual(os.listdir(paths[0]), [])
+        self.assertNotIn(CREDENTIAL_CACHE_ENV, os.environ)
+
+    def test_cli_run_schedule(self):
+        run_dir = self.setup_run_dir()
+        logger = mock.MagicMock()
+        calls = []
+
+        def run_account(account, region, policies_config, *args):
+            calls.append((account['name'], region, policies_config['policies'][0]['name']))
+            return {}, True
+
+        self.patch(org, 'logging', logger)
+        self.patch(org, 'run_account', run_account)
+        self.change_cwd(run_dir)
+        with open(os.path.join('cache', org.RunHistory.file_name), 'w') as fh:
+            json.dump({
+                '112233445566:us-east-1:aws.ec2': 1,
+                '002244668899:us-west-2:aws.lambda': 60,
+                '002244668899:us-west-2:aws.ec2': 30}, fh)
+
+        runner = CliRunner()
+        result = runner.invoke(
+            org.cli,
+            ['run', '-c', 'accounts.yml', '-u', 'policies.yml', '-r', 'us-west-2',
+             '-r', 'us-east-1', '--debug', '-s', 'output', '--cache-path', 'cache'],
+            catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        # one unit per account, region and resource type, longest first
+        # after those without a recorded runtime.
+        self.assertEqual(len(calls), 8)
+        self.assertEqual(
+            calls[-3:],
+            [('qa', 'us-west-2', 'serverless'),
+             ('qa', 'us-west-2', 'compute'),
+             ('dev', 'us-east-1', 'compute')])
+
+        with open(os.path.join('cache', org.RunHistory.file_name)) as fh:
+            runtimes = json.load(fh)
+        self.assertEqual(len(runtimes), 8)
+        self.assertLess(runtimes['002244668899:us-west-2:aws.lambda'], 60)
+
+    def test_run_account_worker_session(self):
+        self.patch(org, 'WORKER_SESSION', {})
+        resets, creds, caches = [], [], []
+        self.patch(org, 'reset_session_cache', lambda: resets.append(1))
+        self.patch(org, 'get_session', mock.MagicMock())
+        self.patch(org, '_get_env_creds', lambda *args: creds.append(1) or {'AWS_REGION': 'x'})
+        self.patch(
+            org.PolicyCollection, 'from_data',
+            lambda data, config: caches.append(config.cache) or [])
+        account = {'name': 'dev', 'account_id': '112233445566', 'provider': 'aws',
+                   'role': ['arn:aws:iam::112233445566:role/a', 'arn:aws:iam::role/b']}
+        cache_path = self.get_temp_dir()
+
+        def run(region, concurrent):
+            org.run_account(
+                account, region, {'policies': []}, 'output', 5, cache_path,
+                False, True, False, concurrent=concurrent)
+
+        # sessions and credentials are kept across units of an account region
+        run('us-east-1', True)
+        run('us-east-1', False)
+        self.assertEqual((len(resets), len(creds)), (1, 1))
+        run('us-west-2', False)
+        self.assertEqual((len(resets), len(creds)), (2, 2))
+
+        # the multi-process safe cache is only used for concurrent units
+        self.assertEqual(
+            caches[:2],
+            ["shared:%s" % os.path.join(cache_path, "112233445566-us-east-1.cache"),
+             os.path.join(cache_path, "112233445566-us-east-1.cache")])
+
     def test_filter_policies(self):
         d = {'policies': [
             {'name': 'find-ml',
@@ -306,8 +408,8 @@ class OrgTest(TestUtils):
         run_dir = self.setup_run_dir()
         logger = mock.MagicMock()
         run_account = mock.MagicMock()
-        run_account.return_value = (
-            {'compute': 24, 'serverless': 12}, True)
+        run_account.side_effect = self.get_policy_counts(
+            {'compute': 24, 'serverless': 12})
         self.patch(org, 'logging', logger)
         self.patch(org, 'run_account', run_account)
         self.change_cwd(run_dir)